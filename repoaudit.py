@@ -38,6 +38,8 @@ def main():
     parser.add_argument("--is-reachable", action='store_true', help="Enable reachability analysis for dfbscan")
     parser.add_argument("--call-depth", type=int, default=5, help="Call depth for dfbscan")
     parser.add_argument("--max-neural-workers", type=int, default=30, help="Max neural workers for dfbscan")
+    parser.add_argument("--max-symbolic-workers", type=int, default=30, help="Max workers of the parsing-based analysis")
+    parser.add_argument("--symbolic-backend", choices=['thread', 'process'], default='thread', help="Run the parsing-based analysis in worker threads or worker processes")
     parser.add_argument("--tag", default="default", help="A tag for the run")
     parser.add_argument("--model-name", type=str, default="gemini-1.5-pro-latest", help="Name of the model to use.")
     parser.add_argument("--temperature", type=float, default=0.0, help="Temperature for LLM")
@@ -60,13 +62,20 @@ def main():
     }
 
     if args.scan_type == 'concolic':
-        agent = ConcolicAgent(agent_kwargs)
-        
         target_file = args.project_path
         if not os.path.isfile(target_file):
             logger.print_console(f"Error: For concolic scan, --project-path must be a file. Path given: '{target_file}'", "error")
             return
-            
+
+        # Parse the target file once and share the analyzer with the agent
+        with open(target_file, 'r', encoding='utf-8') as f:
+            agent_kwargs['ts_analyzer'] = JavaTSAnalyzer(
+                code_in_files={target_file: f.read()},
+                max_symbolic_workers_num=args.max_symbolic_workers,
+                symbolic_backend=args.symbolic_backend,
+            )
+        agent = ConcolicAgent(agent_kwargs)
+
         # Create a minimal state object to pass the file path
         state = DFBScanState(
             target_path=target_file,
@@ -25,7 +25,8 @@ class ConcolicAgent(Agent):
             api_key=props.get('api_key')
         )
         self.bug_type = props.get("bug_type", "CWE20")
-        self.ts_analyzer = JavaTSAnalyzer(code_in_files={})
+        # Reuse the analyzer (and its parse trees) of the caller if provided
+        self.ts_analyzer = props.get("ts_analyzer") or JavaTSAnalyzer(code_in_files={})
 
     def _find_ast_nodes(self, root_node, node_info_list):
         """Finds AST nodes based on the type and name information from LLM."""
@@ -187,13 +188,17 @@ class ConcolicAgent(Agent):
 
         self.ts_analyzer.extract_function_info_from_code(file_path=target_file_path, source_code=source_code)
         
-        if not self.ts_analyzer.functionRawDataDic:
+        # The analyzer may be shared, so only the functions in the target file are analyzed
+        func_ids = self.ts_analyzer.get_function_ids_in_file(target_file_path)
+        if not func_ids:
             self.logger.print_console(f"No methods found in {target_file_path}. Skipping.", "info")
             return
         
-        self.logger.print_console(f"Found {len(self.ts_analyzer.functionRawDataDic)} methods to analyze.", "info")
+        self.logger.print_console(f"Found {len(func_ids)} methods to analyze.", "info")
 
-        for func_id, (func_name, start_line, end_line, ast_node) in self.ts_analyzer.functionRawDataDic.items():
+        for func_id in func_ids:
+            func_name, start_line, end_line, _ = self.ts_analyzer.functionRawDataDic[func_id]
+            ast_node = self.ts_analyzer.get_function_node(func_id)
             self.logger.print_console(f"Analyzing method: {func_name}", "info")
 
             function_code = ast_node.text.decode('utf8', 'ignore')
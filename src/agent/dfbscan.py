@@ -4,16 +4,16 @@ from pathlib import Path
 import copy
 import threading
 import concurrent.futures
-from typing import List, Tuple, Dict, Set
+from typing import List, Tuple, Dict, Set, FrozenSet, NamedTuple, Optional
 from tqdm import tqdm
 import json
 import time
 import os
-import networkx as nx
 
 sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
 
 from src.agent.agent import *
+from src.agent.summary_scheduler import SummaryScheduler
 from src.memory.semantic.dfbscan_state import *
 from src.tstool.dfbscan_extractor.dfbscan_extractor import *
 from src.tstool.dfbscan_extractor.Cpp.Cpp_MLK_extractor import *
@@ -24,6 +24,7 @@ from src.tstool.dfbscan_extractor.Java.Java_CWE20_extractor import *
 from src.tstool.dfbscan_extractor.Python.Python_NPD_extractor import *
 from src.tstool.dfbscan_extractor.Go.Go_NPD_extractor import *
 from src.tstool.dfbscan_extractor.Java.Java_ImproperValidation_extractor import Java_ImproperValidation_extractor
+from src.tstool.dfbscan_extractor.spec_extractor import SpecExtractor
 
 from src.llmtool.LLM_tool import *
 from src.llmtool.dfbscan.intra_dataflow_analyzer import IntraDataFlowAnalyzer
@@ -34,6 +35,17 @@ from src.memory.report.bug_report import BugReport
 
 BASE_PATH = Path(__file__).resolve().parents[2]
 
+
+class ParameterSummary(NamedTuple):
+    """
+    The flows of a parameter of a summarized function.
+    """
+
+    sinks: FrozenSet[Value]  # the sinks reached in the function or its callees
+    returns: FrozenSet[Value]  # the return values of the function reached by the parameter
+    is_exact: bool  # False if a callee returns the parameter back, which the summary does not follow
+
+
 class DFBScanAgent(Agent):
     def __init__(
         self,
@@ -47,7 +59,20 @@ class DFBScanAgent(Agent):
         call_depth: int = 5,
         max_neural_workers: int = 30,
         agent_id: int = 0,
+        use_function_summaries: bool = False,
+        extracted_values: Optional[Tuple[List[Value], List[Value]]] = None,
+        spec_path: Optional[str] = None,
+        max_extraction_workers: Optional[int] = None,
     ) -> None:
+        """
+        :param extracted_values: the sources and sinks of the bug type if they have been extracted,
+                                 e.g., by DFBScanMultiExtractor together with other bug types
+        :param spec_path: the path of a source/sink spec (see SpecExtractor), which takes precedence
+                          over the extractor registered for the language and the bug type
+        :param max_extraction_workers: the number of the worker processes extracting the sources and sinks,
+                                       which only applies to the process backend of the analyzer,
+                                       its symbolic workers if None
+        """
         super().__init__()
         self.bug_type = bug_type
         self.is_reachable = is_reachable
@@ -83,14 +108,25 @@ class DFBScanAgent(Agent):
         self.path_validator = PathValidator(self.model_name, self.language, **llm_kwargs)
         
         self.ts_analyzer.analyze_call_graph()
-        extractor = self.__obtain_extractor()
-        self.src_values, self.sink_values = extractor.extract_all()
+        self.extractor = self.__obtain_extractor(spec_path)
+        if extracted_values is None:
+            extracted_values = self.extractor.extract_all(max_extraction_workers)
+        self.src_values, self.sink_values = extracted_values
+        self.src_values = self.__prune_src_values(self.src_values, self.sink_values)
         self.state = DFBScanState(self.src_values, self.sink_values)
         self.worklist = list(self.src_values)
         self.generated_report = []
+
+        # Per-function summaries (parameter index --> parameter summary), computed bottom-up
+        self.use_function_summaries = use_function_summaries
+        self.summary_scheduler: SummaryScheduler[Dict[int, ParameterSummary]] = SummaryScheduler(
+            self.ts_analyzer, self.__summarize_function, max_workers=self.max_neural_workers
+        )
         return
 
-    def __obtain_extractor(self) -> DFBScanExtractor:
+    def __obtain_extractor(self, spec_path: Optional[str] = None) -> DFBScanExtractor:
+        if spec_path is not None:
+            return SpecExtractor.from_file(self.ts_analyzer, spec_path)
         if self.language == "Cpp":
             if self.bug_type == "MLK": return Cpp_MLK_Extractor(self.ts_analyzer)
             if self.bug_type == "NPD": return Cpp_NPD_Extractor(self.ts_analyzer)
@@ -102,8 +138,39 @@ class DFBScanAgent(Agent):
             if self.bug_type == "NPD": return Python_NPD_Extractor(self.ts_analyzer)
         elif self.language == "Go":
             if self.bug_type == "NPD": return Go_NPD_Extractor(self.ts_analyzer)
+        # Fall back to the declarative spec of the checker, if any
+        shipped_spec_path = SpecExtractor.find_spec_path(self.language, self.bug_type)
+        if shipped_spec_path is not None:
+            return SpecExtractor.from_file(self.ts_analyzer, str(shipped_spec_path))
         raise ValueError(f"Unsupported language/bug type combination: {self.language}/{self.bug_type}")
 
+    def __prune_src_values(self, src_values: List[Value], sink_values: List[Value]) -> List[Value]:
+        """
+        Drop the sources that cannot reach any sink within call_depth returns and calls,
+        so that no LLM query is issued for them.
+        :param src_values: the extracted sources
+        :param sink_values: the extracted sinks
+        :return: the sources whose functions can reach a function containing a sink
+        """
+        sink_function_ids = set()
+        for sink_value in sink_values:
+            function = self.ts_analyzer.get_function_from_localvalue(sink_value)
+            if function is not None:
+                sink_function_ids.add(function.function_id)
+        reachable_function_ids = self.ts_analyzer.get_sink_reachable_function_ids(
+            sink_function_ids, self.call_depth
+        )
+
+        pruned_src_values = []
+        for src_value in src_values:
+            function = self.ts_analyzer.get_function_from_localvalue(src_value)
+            if function is not None and function.function_id in reachable_function_ids:
+                pruned_src_values.append(src_value)
+        self.logger.print_log(
+            f"{len(src_values) - len(pruned_src_values)} of {len(src_values)} source(s) cannot reach any sink and are pruned."
+        )
+        return pruned_src_values
+
     def __process_src_value(self, src_value: Value) -> None:
         worklist = []
         call_context = CallContext()
@@ -114,14 +181,23 @@ class DFBScanAgent(Agent):
         if not start_function:
             return
 
+        # A source parameter of a summarized function is answered by the summary without a query
+        if self.use_function_summaries and self.__apply_function_summary(start_function, src_value):
+            return
+
         # --- Start of Modification for Improvement #2 ---
-        # Extract structural hints for the LLM
-        local_vars = self.ts_analyzer.get_local_variable_declarations(start_function)
-        assignments = self.ts_analyzer.get_assignment_expressions(start_function)
+        # Extract structural hints for the LLM, restricted to the def-use slice of the
+        # variables defined or used at the source line if there are any
+        slice_names = {
+            record.name
+            for record in start_function.def_use_index.get_records_at_line(src_value.line_number)
+        } or None
+        local_vars = self.ts_analyzer.get_local_variable_declarations(start_function, slice_names)
+        assignments = self.ts_analyzer.get_assignment_expressions(start_function, slice_names)
 
         # Construct the input for intra-procedural data-flow analysis
         # This part might need adjustment based on how sinks, calls, etc., are gathered
-        sinks_in_function = self.__obtain_extractor().extract_sinks(start_function)
+        sinks_in_function = self.extractor.extract_sinks(start_function)
         sink_values = [
             (sink.name, sink.start_line) for sink in sinks_in_function
         ]
@@ -149,11 +225,136 @@ class DFBScanAgent(Agent):
         if output is None:
             return
         
+        # Propagate the source into the callees via their summaries
+        if self.use_function_summaries:
+            self.__apply_callee_summaries(start_function, src_value)
+
         # ... (process the output and generate reports)
-        
+
+    def __summarize_function(
+        self, function: Function, callee_summaries: Dict[int, Dict[int, ParameterSummary]]
+    ) -> Dict[int, ParameterSummary]:
+        """
+        Summarize the sinks and the return values reached by each parameter of a function.
+        The parameters whose queries fail are not summarized.
+        :param function: the function to be summarized
+        :param callee_summaries: the summaries of the callees of the function
+        :return: the mapping from the parameter index to the summary of the parameter
+        """
+        sinks = self.extractor.extract_sinks(function)
+        retvals = sorted(function.retvals, key=lambda retval: (retval.line_number, retval.name))
+        summary: Dict[int, ParameterSummary] = {}
+        for para in self.ts_analyzer.get_parameters_in_single_function(function):
+            reached_sinks: Set[Value] = set()
+            reached_retvals: Set[Value] = set()
+            if len(sinks) > 0 or len(retvals) > 0:
+                input_data = IntraDataFlowAnalyzerInput(
+                    function=function,
+                    src_value=para,
+                    sink_values=[(sink.name, sink.line_number) for sink in sinks],
+                    call_statements=[],
+                    ret_values=[(retval.name, retval.line_number) for retval in retvals],
+                    local_vars=self.ts_analyzer.get_local_variable_declarations(function, [para.name]),
+                    assignments=self.ts_analyzer.get_assignment_expressions(function, [para.name]),
+                )
+                output = self.intra_dfa.invoke(input_data)
+                if output is None:
+                    continue
+                # Sinks sharing a name on different lines are told apart by the line number
+                reached_locations = {
+                    (value.name, value.line_number)
+                    for path in output.reachable_values
+                    for value in path
+                }
+                reached_sinks.update(
+                    sink for sink in sinks if (sink.name, sink.line_number) in reached_locations
+                )
+                reached_retvals.update(
+                    retval
+                    for retval in retvals
+                    if (retval.name, retval.line_number) in reached_locations
+                )
+
+            # A parameter passed to a callee as it is reaches the sinks of the callee parameter
+            is_exact = True
+            for call_site_fact in self.ts_analyzer.call_site_facts.get(function.function_id, {}).values():
+                for arg in call_site_fact.arguments:
+                    if arg.name != para.name:
+                        continue
+                    for callee_id in call_site_fact.callee_ids:
+                        callee_para_summary = callee_summaries.get(callee_id, {}).get(arg.index, None)
+                        if callee_para_summary is None:
+                            is_exact = False
+                            continue
+                        reached_sinks.update(callee_para_summary.sinks)
+                        is_exact &= (
+                            callee_para_summary.is_exact and len(callee_para_summary.returns) == 0
+                        )
+            summary[para.index] = ParameterSummary(
+                frozenset(reached_sinks), frozenset(reached_retvals), is_exact
+            )
+        return summary
+
+    def __apply_function_summary(self, function: Function, src_value: Value) -> bool:
+        """
+        Record the sinks reached by a source parameter from the summary of its function.
+        The summary only answers the source if the parameter does not leave the function,
+        i.e., it reaches no return value, whose callers are left to the query.
+        :return: whether the summary fully answers the source
+        """
+        summary = self.summary_scheduler.get_summary(function.function_id)
+        if summary is None or src_value.label != ValueLabel.PARA:
+            return False
+        for para in self.ts_analyzer.get_parameters_in_single_function(function):
+            if para.name != src_value.name or para.index not in summary:
+                continue
+            para_summary = summary[para.index]
+            if not para_summary.is_exact or len(para_summary.returns) > 0:
+                return False
+            context = CallContext(False)
+            self.state.update_external_value_match(
+                (src_value, context), {(sink, context) for sink in para_summary.sinks}
+            )
+            return True
+        return False
+
+    def __apply_callee_summaries(self, function: Function, src_value: Value) -> None:
+        """
+        Record the sinks reached by the source via the callees that receive it as an argument.
+        """
+        for call_site_fact in self.ts_analyzer.call_site_facts.get(function.function_id, {}).values():
+            for arg in call_site_fact.arguments:
+                if arg.name != src_value.name:
+                    continue
+                for callee_id in call_site_fact.callee_ids:
+                    summary = self.summary_scheduler.get_summary(callee_id)
+                    if summary is None or arg.index not in summary or len(summary[arg.index].sinks) == 0:
+                        continue
+                    _, context = CallContext(False).add_and_check_context(
+                        ContextLabel(function.file_path, call_site_fact.line_number, callee_id, Parenthesis.LEFT_PAR)
+                    )
+                    self.state.update_external_value_match(
+                        (arg, context), {(sink, context) for sink in summary[arg.index].sinks}
+                    )
+        return
+
     def run(self) -> None:
         self.logger.print_console("Start data-flow bug scanning in parallel...")
         self.logger.print_console(f"Max number of workers: {self.max_neural_workers}")
+
+        if self.use_function_summaries:
+            # Summarize the callees of the source functions within call_depth calls before the
+            # sources are processed, so that the callees are not queried for each source
+            callee_ids = set()
+            for src_value in self.worklist:
+                function = self.ts_analyzer.get_function_from_localvalue(src_value)
+                if function is None:
+                    continue
+                callee_ids.update(
+                    callee.function_id
+                    for callee in self.ts_analyzer.get_all_transitive_callee_functions(function, self.call_depth)
+                )
+            self.summary_scheduler.run(callee_ids, max_depth=0)
         
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_neural_workers) as executor:
             pbar = tqdm(total=len(self.worklist), desc="Processing Source Values", leave=False)
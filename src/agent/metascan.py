@@ -2,7 +2,7 @@ import json
 import os
 
 from src.agent.agent import *
-from src.tstool.analyzer.TS_analyzer import *
+from src.tstool.analyzer.ts_analyzer import *
 from src.tstool.analyzer.Cpp_TS_analyzer import *
 from src.tstool.analyzer.Go_TS_analyzer import *
 from src.tstool.analyzer.Java_TS_analyzer import *
@@ -52,22 +52,11 @@ class MetaScanAgent(Agent):
 
             function_meta_data["call_sites"] = []
             for call_site in function.function_call_site_nodes:
+                call_site_fact = self.ts_analyzer.get_call_site_fact(function, call_site)
                 call_site_info = {}
-                file_content = self.ts_analyzer.fileContentDic[function.file_path]
-                call_site_info["callee_id"] = (
-                    self.ts_analyzer.get_callee_function_ids_at_callsite(
-                        function, call_site
-                    )
-                )
-                call_site_info["args"] = [
-                    str(arg)
-                    for arg in self.ts_analyzer.get_arguments_at_callsite(
-                        function, call_site
-                    )
-                ]
-                call_site_info["call_site_start_line"] = (
-                    file_content[: call_site.start_byte].count("\n") + 1
-                )
+                call_site_info["callee_id"] = list(call_site_fact.callee_ids)
+                call_site_info["args"] = [str(arg) for arg in call_site_fact.arguments]
+                call_site_info["call_site_start_line"] = call_site_fact.line_number
                 function_meta_data["call_sites"].append(call_site_info)
 
             # function call
@@ -0,0 +1,168 @@
+import concurrent.futures
+import threading
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from src.memory.syntactic.function import Function
+from src.tstool.analyzer.ts_analyzer import TSAnalyzer
+
+S = TypeVar("S")
+
+
+class SummaryScheduler(Generic[S]):
+    """
+    Compute per-function summaries bottom-up over the SCC DAG of the call graph.
+    An SCC is scheduled once the SCCs of all its callees have been summarized, so that
+    a function is always summarized with the summaries of its callees, and the SCCs
+    that do not depend on each other are summarized in parallel.
+    The functions in a recursive SCC are summarized repeatedly, in the order of their ids,
+    until their summaries no longer change or max_iterations is reached.
+    Summaries are cached, so each function is summarized once across runs.
+    """
+
+    def __init__(
+        self,
+        ts_analyzer: TSAnalyzer,
+        summarize: Callable[[Function, Dict[int, S]], S],
+        max_workers: int = 1,
+        max_iterations: int = 3,
+    ) -> None:
+        """
+        :param ts_analyzer: the analyzer providing the call graph
+        :param summarize: the function computing the summary of a function from the
+                          summaries of its (already summarized) direct callees
+        :param max_workers: the number of the SCCs summarized in parallel
+        :param max_iterations: the maximal number of rounds for a recursive SCC
+        """
+        self.ts_analyzer = ts_analyzer
+        self.summarize = summarize
+        self.max_workers = max_workers
+        self.max_iterations = max_iterations
+        self.summaries: Dict[int, S] = {}  # function id --> summary
+        self._lock = threading.Lock()
+
+    def get_summary(self, function_id: int) -> Optional[S]:
+        return self.summaries.get(function_id, None)
+
+    def invalidate(self, function_ids: Iterable[int]) -> None:
+        """
+        Drop the summaries of some functions and their transitive callers.
+        """
+        stale_ids: Set[int] = set()
+        for function_id in function_ids:
+            stale_ids.add(function_id)
+            if function_id in self.ts_analyzer.function_env:
+                stale_ids.update(
+                    caller.function_id
+                    for caller in self.ts_analyzer.get_all_transitive_caller_functions(
+                        self.ts_analyzer.function_env[function_id], None
+                    )
+                )
+        with self._lock:
+            for function_id in stale_ids:
+                self.summaries.pop(function_id, None)
+        return
+
+    def run(
+        self, function_ids: Optional[Iterable[int]] = None, max_depth: Optional[int] = None
+    ) -> Dict[int, S]:
+        """
+        Summarize some functions together with their transitive callees.
+        The callees beyond max_depth calls are not summarized, so the summaries only
+        cover the call chains within the depth.
+        :param function_ids: the ids of the functions, all the functions if None
+        :param max_depth: the maximal length of the call chains to the summarized callees, unbounded if None
+        :return: the summaries of the requested functions
+        """
+        if function_ids is None:
+            requested_ids = set(self.ts_analyzer.function_env)
+        else:
+            requested_ids = set(function_ids)
+        target_ids = set(requested_ids)
+        if max_depth is None or max_depth > 0:
+            for function_id in requested_ids:
+                target_ids.update(
+                    callee.function_id
+                    for callee in self.ts_analyzer.get_all_transitive_callee_functions(
+                        self.ts_analyzer.function_env[function_id], max_depth
+                    )
+                )
+
+        # The functions of an SCC are summarized together for the fixed point
+        sccs = [
+            scc
+            for scc in self.ts_analyzer.get_call_graph_sccs()
+            if any(function_id in target_ids for function_id in scc)
+            and any(function_id not in self.summaries for function_id in scc)
+        ]
+        scc_indexes = {
+            function_id: index for index, scc in enumerate(sccs) for function_id in scc
+        }
+        # The SCCs waiting for each SCC, and the number of the SCCs each SCC waits for
+        dependents: List[Set[int]] = [set() for _ in sccs]
+        pending_nums = [0] * len(sccs)
+        for index, scc in enumerate(sccs):
+            callee_indexes = set()
+            for function_id in scc:
+                for callee_id in self.ts_analyzer.function_caller_callee_map.get(
+                    function_id, ()
+                ):
+                    callee_index = scc_indexes.get(callee_id, index)
+                    if callee_index != index:
+                        callee_indexes.add(callee_index)
+            pending_nums[index] = len(callee_indexes)
+            for callee_index in callee_indexes:
+                dependents[callee_index].add(index)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.__summarize_scc, sccs[index]): index
+                for index in range(len(sccs))
+                if pending_nums[index] == 0
+            }
+            while futures:
+                done, _ = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    index = futures.pop(future)
+                    future.result()
+                    for dependent_index in sorted(dependents[index]):
+                        pending_nums[dependent_index] -= 1
+                        if pending_nums[dependent_index] == 0:
+                            futures[
+                                executor.submit(self.__summarize_scc, sccs[dependent_index])
+                            ] = dependent_index
+
+        return {
+            function_id: self.summaries[function_id]
+            for function_id in sorted(requested_ids)
+            if function_id in self.summaries
+        }
+
+    def __summarize_scc(self, scc: Tuple[int, ...]) -> None:
+        is_recursive = len(scc) > 1 or scc[0] in self.ts_analyzer.function_caller_callee_map.get(
+            scc[0], ()
+        )
+        iteration_num = self.max_iterations if is_recursive else 1
+        scc_summaries: Dict[int, S] = {}
+        for _ in range(iteration_num):
+            is_changed = False
+            for function_id in scc:
+                function = self.ts_analyzer.function_env[function_id]
+                callee_summaries = {}
+                for callee_id in self.ts_analyzer.function_caller_callee_map.get(
+                    function_id, ()
+                ):
+                    if callee_id in scc_summaries:
+                        callee_summaries[callee_id] = scc_summaries[callee_id]
+                    elif callee_id in self.summaries:
+                        callee_summaries[callee_id] = self.summaries[callee_id]
+                summary = self.summarize(function, callee_summaries)
+                if function_id not in scc_summaries or scc_summaries[function_id] != summary:
+                    is_changed = True
+                scc_summaries[function_id] = summary
+            if not is_changed:
+                break
+        with self._lock:
+            self.summaries.update(scc_summaries)
+        return
@@ -1,3 +1,6 @@
+import threading
+from typing import Dict, Optional, Tuple
+
 import tree_sitter
 
 
@@ -28,3 +31,39 @@ class API:
 
     def __hash__(self) -> int:
         return hash((self.api_name, self.api_para_num))
+
+
+class APIRegistry:
+    """
+    Interned library APIs indexed by (name, number of parameters).
+    Each distinct API is registered once and receives the next id atomically.
+    """
+
+    def __init__(self) -> None:
+        self.api_env: Dict[int, API] = {}  # api id --> API
+        self._api_ids: Dict[Tuple[str, int], int] = {}  # (name, para num) --> api id
+        self._lock = threading.Lock()
+
+    def get_api_id(self, api_name: str, api_para_num: int) -> Optional[int]:
+        """
+        Get the id of a registered API, or None if the API has not been registered.
+        """
+        return self._api_ids.get((api_name, api_para_num), None)
+
+    def intern(self, api_name: str, api_para_num: int) -> int:
+        """
+        Get the id of an API, registering the API if it does not exist previously.
+        """
+        key = (api_name, api_para_num)
+        api_id = self._api_ids.get(key, None)
+        if api_id is not None:
+            return api_id
+        with self._lock:
+            if key not in self._api_ids:
+                api_id = len(self.api_env)
+                self.api_env[api_id] = API(api_id, api_name, api_para_num)
+                self._api_ids[key] = api_id
+            return self._api_ids[key]
+
+    def __len__(self) -> int:
+        return len(self.api_env)
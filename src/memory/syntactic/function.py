@@ -1,5 +1,25 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
 import tree_sitter
 
+# (start byte, end byte, node type) of a node in the parse tree of a file
+NodeRange = Tuple[int, int, str]
+
+
+def walk_nodes(root_node: tree_sitter.Node) -> Iterator[tree_sitter.Node]:
+    """
+    Iterate over the nodes of a subtree in pre-order with a tree cursor.
+    Unlike a recursive traversal, the depth of the subtree is not limited.
+    """
+    cursor = root_node.walk()
+    while True:
+        yield cursor.node
+        if cursor.goto_first_child():
+            continue
+        while not cursor.goto_next_sibling():
+            if not cursor.goto_parent():
+                return
+
 
 class Function:
     def __init__(
@@ -11,11 +31,16 @@ class Function:
         end_line_number: int,
         function_node: tree_sitter.Node,
         file_path: str,
+        node_loader: Optional[Callable[[str, int, int, str], tree_sitter.Node]] = None,
+        node_range: Optional[NodeRange] = None,
     ) -> None:
         """
         Record basic facts of the function.
         Here, the function indicates a user-defined function or method.
         The implementation is provided in the project.
+        :param node_loader: the callback locating a node by (file path, start byte, end byte, node type),
+            which re-parses the file if its tree has been released
+        :param node_range: the range of the function node, only needed if function_node is None
         """
         self.function_id = function_id
         self.function_name = function_name
@@ -23,11 +48,13 @@ class Function:
         self.start_line_number = start_line_number
         self.end_line_number = end_line_number
         self.file_path = file_path
-        self.lined_code = (
-            self.attach_relative_line_number()
-        )  # code with line number attached
+        self._code_lines = None  # lines of the function code, split on demand
+        self._lined_code = None  # code with relative line numbers attached, rendered on demand
+        self._absolute_lined_code = None  # code with absolute line numbers attached
 
         # Attention: the parse tree is in the context of the whole file
+        self.node_loader = node_loader
+        self.node_range = node_range
         self.parse_tree_root_node = (
             function_node  # root node of the parse tree of the current function
         )
@@ -37,10 +64,13 @@ class Function:
         ## Results of AST node type analysis
         self.paras = None  # A set of parameters
         self.retvals = None  # A set of returned values
+        self.def_use_index = None  # definitions and uses of the variables
 
         ## Results of intraprocedural control flow analysis
         self.if_statements = {}  # if statement info
         self.loop_statements = {}  # loop statement info
+        self.control_order_index = None  # index of the statements, built on demand
+        self.control_flow_graph = None  # control flow graph, built on demand
 
     def __hash__(self) -> int:
         return hash(
@@ -53,40 +83,206 @@ class Function:
             )
         )
 
+    @property
+    def parse_tree_root_node(self) -> tree_sitter.Node:
+        if (
+            self._parse_tree_root_node is None
+            and self.node_loader is not None
+            and self.node_range is not None
+        ):
+            self._parse_tree_root_node = self.node_loader(
+                self.file_path, *self.node_range
+            )
+        return self._parse_tree_root_node
+
+    @parse_tree_root_node.setter
+    def parse_tree_root_node(self, node: tree_sitter.Node) -> None:
+        self._parse_tree_root_node = node
+        self._all_nodes = None
+        self._node_type_index = None
+        self._line_node_index = None
+        if node is not None:
+            self.node_range = (node.start_byte, node.end_byte, node.type)
+
+    @property
+    def if_statements(self) -> Dict[Tuple, Tuple]:
+        return self._if_statements
+
+    @if_statements.setter
+    def if_statements(self, if_statements: Dict[Tuple, Tuple]) -> None:
+        self._if_statements = if_statements
+        self.control_order_index = None
+
+    @property
+    def loop_statements(self) -> Dict[Tuple, Tuple]:
+        return self._loop_statements
+
+    @loop_statements.setter
+    def loop_statements(self, loop_statements: Dict[Tuple, Tuple]) -> None:
+        self._loop_statements = loop_statements
+        self.control_order_index = None
+
+    @property
+    def function_call_site_nodes(self) -> List[tree_sitter.Node]:
+        if self._function_call_site_nodes is None:
+            self._function_call_site_nodes = self.__load_nodes(
+                self._function_call_site_ranges
+            )
+        return self._function_call_site_nodes
+
+    @function_call_site_nodes.setter
+    def function_call_site_nodes(self, nodes: List[tree_sitter.Node]) -> None:
+        self._function_call_site_nodes = nodes
+        self._function_call_site_ranges = [
+            (node.start_byte, node.end_byte, node.type) for node in nodes
+        ]
+
+    @property
+    def api_call_site_nodes(self) -> List[tree_sitter.Node]:
+        if self._api_call_site_nodes is None:
+            self._api_call_site_nodes = self.__load_nodes(self._api_call_site_ranges)
+        return self._api_call_site_nodes
+
+    @api_call_site_nodes.setter
+    def api_call_site_nodes(self, nodes: List[tree_sitter.Node]) -> None:
+        self._api_call_site_nodes = nodes
+        self._api_call_site_ranges = [
+            (node.start_byte, node.end_byte, node.type) for node in nodes
+        ]
+
+    def __load_nodes(self, node_ranges: List[NodeRange]) -> List[tree_sitter.Node]:
+        return [self.node_loader(self.file_path, *node_range) for node_range in node_ranges]
+
+    def __build_node_type_index(self) -> None:
+        all_nodes = []
+        node_type_index: Dict[str, List[tree_sitter.Node]] = {}
+        for node in walk_nodes(self.parse_tree_root_node):
+            all_nodes.append(node)
+            if node.type not in node_type_index:
+                node_type_index[node.type] = []
+            node_type_index[node.type].append(node)
+        self._node_type_index = node_type_index
+        self._all_nodes = all_nodes
+
+    def find_nodes_by_type(self, node_type: str) -> List[tree_sitter.Node]:
+        """
+        Find all nodes of a given type in the function in pre-order.
+        The nodes are bucketed by type in a single pass on the first query.
+        :param node_type: the type of the nodes
+        :return: a new list of the nodes, which can be modified by the caller
+        """
+        if self._node_type_index is None:
+            self.__build_node_type_index()
+        return list(self._node_type_index.get(node_type, []))
+
+    def get_all_nodes(self) -> List[tree_sitter.Node]:
+        """
+        Get all nodes in the function in pre-order.
+        """
+        if self._all_nodes is None:
+            self.__build_node_type_index()
+        return list(self._all_nodes)
+
+    def get_nodes_at_line(self, line_number: int) -> List[tree_sitter.Node]:
+        """
+        Get the nodes in the function starting and ending at a line in the file.
+        The nodes are bucketed by line on the first query.
+        :param line_number: the (1-based) line number in the file
+        """
+        if self._line_node_index is None:
+            line_node_index: Dict[int, List[tree_sitter.Node]] = {}
+            for node in self.get_all_nodes():
+                if node.start_point[0] != node.end_point[0]:
+                    continue
+                if node.start_point[0] + 1 not in line_node_index:
+                    line_node_index[node.start_point[0] + 1] = []
+                line_node_index[node.start_point[0] + 1].append(node)
+            self._line_node_index = line_node_index
+        return list(self._line_node_index.get(line_number, []))
+
+    def release_parse_tree(self) -> None:
+        """
+        Drop the references to the nodes, which pin the parse tree of the whole file.
+        The nodes are located again on demand by the node loader.
+        """
+        if self.node_loader is None or self.node_range is None:
+            return
+        self._parse_tree_root_node = None
+        self._all_nodes = None
+        self._node_type_index = None
+        self._line_node_index = None
+        self._function_call_site_nodes = None
+        self._api_call_site_nodes = None
+        return
+
     def file_line2function_line(self, file_line: int) -> int:
         """
         Convert the line number in the file to the line number in the function
         """
         return file_line - self.start_line_number + 1
 
-    def attach_relative_line_number(self) -> str:
+    @property
+    def lined_code(self) -> str:
+        """
+        The code with relative line numbers attached, which is rendered on the first access.
+        """
+        if self._lined_code is None:
+            self._lined_code = self.attach_relative_line_number()
+        return self._lined_code
+
+    @lined_code.setter
+    def lined_code(self, lined_code: str) -> None:
+        self._lined_code = lined_code
+
+    @property
+    def absolute_lined_code(self) -> str:
+        """
+        The code with absolute line numbers attached, which is rendered on the first access.
+        """
+        if self._absolute_lined_code is None:
+            self._absolute_lined_code = self.attach_absolute_line_number()
+        return self._absolute_lined_code
+
+    def __render_lines(
+        self, first_line_number: int, start_index: int, end_index: Optional[int]
+    ) -> str:
+        """
+        Render the lines [start_index, end_index) of the code with line numbers in linear time.
+        """
+        if self._code_lines is None:
+            self._code_lines = self.function_code.split("\n")
+        start_index = max(start_index, 0)
+        end_index = (
+            len(self._code_lines)
+            if end_index is None
+            else min(end_index, len(self._code_lines))
+        )
+        return "\n".join(
+            f"{first_line_number + index}. {self._code_lines[index]}"
+            for index in range(start_index, end_index)
+        )
+
+    def attach_relative_line_number(
+        self, start_line: Optional[int] = None, end_line: Optional[int] = None
+    ) -> str:
         """
         Attach line numbers to the function code.
         Line numbers start from 1.
+        :param start_line: the first rendered line (relative to the function), the first line if None
+        :param end_line: the last rendered line (relative to the function), the last line if None
         """
-        lined_code = ""
-        function_content = "1. " + self.function_code
-        line_no = 2
-        for ch in function_content:
-            if ch == "\n":
-                lined_code += "\n" + str(line_no) + ". "
-                line_no += 1
-            else:
-                lined_code += ch
-        return lined_code
+        start_index = 0 if start_line is None else start_line - 1
+        return self.__render_lines(1, start_index, end_line)
 
-    def attach_absolute_line_number(self) -> str:
+    def attach_absolute_line_number(
+        self, start_line: Optional[int] = None, end_line: Optional[int] = None
+    ) -> str:
         """
         Attach line numbers to the function code
         Line numbers start from self.start_line_number
+        :param start_line: the first rendered line (in the file), the first line if None
+        :param end_line: the last rendered line (in the file), the last line if None
         """
-        lined_code = ""
-        function_content = str(self.start_line_number) + ". " + self.function_code
-        line_no = self.start_line_number + 1
-        for ch in function_content:
-            if ch == "\n":
-                lined_code += "\n" + str(line_no) + ". "
-                line_no += 1
-            else:
-                lined_code += ch
-        return lined_code
+        start_index = 0 if start_line is None else self.file_line2function_line(start_line) - 1
+        end_index = None if end_line is None else self.file_line2function_line(end_line)
+        return self.__render_lines(self.start_line_number, start_index, end_index)
@@ -1,4 +1,5 @@
 import re
+import sys
 from typing import Set
 from enum import Enum
 
@@ -53,6 +54,14 @@ class ValueLabel(Enum):
 
 
 class Value:
+    """
+    An immutable value identified by the tuple key (name, file, line number, index, label).
+    The key and its hash are computed once, and the file paths are interned,
+    so that values are cheap to hash and compare in the dictionaries and sets of the states.
+    """
+
+    __slots__ = ("name", "line_number", "label", "file", "index", "_key", "_hash")
+
     def __init__(
         self, name: str, line_number: int, label: ValueLabel, file: str, index: int = -1
     ) -> None:
@@ -63,11 +72,22 @@ class Value:
         :param file: the file path of the value
         :param index: the index of the value. For PARA, RET, ARG, it start from 0. Otherwise, it is -1.
         """
-        self.name = name
-        self.line_number = line_number
-        self.label = label
-        self.file = file
-        self.index = index
+        if isinstance(file, str):
+            file = sys.intern(file)
+        key = (name, file, line_number, index, label)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "line_number", line_number)
+        object.__setattr__(self, "label", label)
+        object.__setattr__(self, "file", file)
+        object.__setattr__(self, "index", index)
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_hash", hash(key))
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"Value is immutable: cannot set {name}")
+
+    def __reduce__(self):
+        return (Value, (self.name, self.line_number, self.label, self.file, self.index))
 
     def __str__(self) -> str:
         return (
@@ -87,13 +107,17 @@ class Value:
         )
 
     def __eq__(self, other: "Value") -> bool:
-        return self.__str__() == other.__str__()
+        if self is other:
+            return True
+        if not isinstance(other, Value):
+            return NotImplemented
+        return self._hash == other._hash and self._key == other._key
 
     def __repr__(self) -> str:
         return self.__str__()
 
     def __hash__(self) -> int:
-        return hash(self.__str__())
+        return self._hash
 
     @classmethod
     def from_str_to_value(cls, s: str) -> "Value":
@@ -0,0 +1,34 @@
+import unittest
+import sys
+import concurrent.futures
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+
+from src.memory.syntactic.api import *
+
+
+class TestAPIRegistry(unittest.TestCase):
+    def test_intern(self):
+        registry = APIRegistry()
+        self.assertEqual(registry.intern("read", 1), 0)
+        self.assertEqual(registry.intern("read", 2), 1)
+        self.assertEqual(registry.intern("read", 1), 0)
+        self.assertEqual(registry.get_api_id("read", 2), 1)
+        self.assertIsNone(registry.get_api_id("write", 1))
+        self.assertEqual(registry.api_env[1], API(-1, "read", 2))
+
+    def test_concurrent_intern(self):
+        registry = APIRegistry()
+        keys = [(f"api{index % 50}", index % 3) for index in range(3000)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            api_ids = list(executor.map(lambda key: registry.intern(*key), keys))
+        self.assertEqual(len(registry), len(set(keys)))
+        self.assertEqual(sorted(registry.api_env), list(range(len(registry))))
+        for key, api_id in zip(keys, api_ids):
+            api = registry.api_env[api_id]
+            self.assertEqual((api.api_name, api.api_para_num), key)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+
+from src.tstool.analyzer.Java_TS_analyzer import JavaTSAnalyzer
+from src.tstool.dfbscan_extractor.dfbscan_extractor import *
+from src.tstool.dfbscan_extractor.Java.Java_NPD_extractor import Java_NPD_Extractor
+from src.tstool.dfbscan_extractor.Java.Java_ImproperValidation_extractor import Java_ImproperValidation_extractor
+from src.tstool.dfbscan_extractor.spec_extractor import SpecExtractor
+
+
+class Java_Call_Extractor(DFBScanExtractor):
+    def extract_sources(self, function: Function) -> List[Value]:
+        return [
+            Value(node.text.decode("utf8"), node.start_point[0] + 1, ValueLabel.SRC, function.file_path)
+            for node in function.find_nodes_by_type("method_invocation")
+        ]
+
+    def extract_sinks(self, function: Function) -> List[Value]:
+        return []
+
+
+class TestDFBScanMultiExtractor(unittest.TestCase):
+    def test_single_pass(self):
+        code_in_files = {
+            "A.java": "class A {\n"
+            "  void f(B b) { String s = null; s.length(); b.g(); }\n"
+            "  void g() { h(null); }\n"
+            "}\n",
+            "test/T.java": "class T { void t() { String s = null; s.trim(); } }\n",
+        }
+        analyzer = JavaTSAnalyzer(code_in_files, max_symbolic_workers_num=1)
+        expected = {
+            "NPD": Java_NPD_Extractor(analyzer).extract_all(),
+            "CALL": Java_Call_Extractor(analyzer).extract_all(),
+        }
+        results = DFBScanMultiExtractor(
+            {"NPD": Java_NPD_Extractor(analyzer), "CALL": Java_Call_Extractor(analyzer)}
+        ).extract_all()
+        self.assertEqual(results, expected)
+        self.assertEqual(len(results["NPD"][0]), 2)
+        self.assertEqual([value.name for value in results["CALL"][0]], ["s.length()", "b.g()", "h(null)"])
+
+    def test_parallel_extraction(self):
+        code_in_files = {
+            f"p/A{i}.java": f"class A{i} {{\n  void f(B b) {{ b.g(null); }}\n  void g() {{ h(null).k(); }}\n}}\n"
+            for i in range(8)
+        }
+        analyzer = JavaTSAnalyzer(code_in_files, max_symbolic_workers_num=2)
+        sequential = Java_NPD_Extractor(analyzer).extract_all()
+        self.assertEqual([value.file for value in sequential[0]], sorted(value.file for value in sequential[0]))
+        spec_path = str(SpecExtractor.find_spec_path("Java", "NPD"))
+        spec_sequential = SpecExtractor.from_file(analyzer, spec_path).extract_all()
+        # The worker processes only apply to the process backend
+        with self.assertRaises(ValueError):
+            Java_NPD_Extractor(analyzer).extract_all(max_workers=2)
+
+        # The process backend shards the files over worker processes
+        process_analyzer = JavaTSAnalyzer(code_in_files, max_symbolic_workers_num=2, symbolic_backend="process")
+        results = DFBScanMultiExtractor(
+            {
+                "NPD": Java_NPD_Extractor(process_analyzer),
+                "SPEC": SpecExtractor.from_file(process_analyzer, spec_path),
+            }
+        ).extract_all()
+        self.assertEqual(results["NPD"], sequential)
+        self.assertEqual(results["SPEC"], spec_sequential)
+
+    def test_project_level_extractor(self):
+        code_in_files = {
+            "D.java": "class D {\n"
+            "  Object deserialze(Parser parser, Type type) {\n"
+            "    return parser.parseArray(type, null);\n"
+            "  }\n"
+            "}\n",
+        }
+        analyzer = JavaTSAnalyzer(code_in_files, max_symbolic_workers_num=1)
+        expected = Java_ImproperValidation_extractor(analyzer).extract_all()
+        self.assertEqual((len(expected[0]), len(expected[1])), (1, 1))
+        results = DFBScanMultiExtractor(
+            {"CWE-20": Java_ImproperValidation_extractor(analyzer), "NPD": Java_NPD_Extractor(analyzer)}
+        ).extract_all()
+        self.assertEqual(results["CWE-20"], expected)
+        self.assertEqual(results["NPD"], Java_NPD_Extractor(analyzer).extract_all())
+
+    def test_shared_analyzer(self):
+        analyzers = [JavaTSAnalyzer({"A.java": "class A {}\n"}, max_symbolic_workers_num=1) for _ in range(2)]
+        with self.assertRaises(ValueError):
+            DFBScanMultiExtractor({"NPD": Java_NPD_Extractor(analyzers[0]), "CALL": Java_Call_Extractor(analyzers[1])})
+
+
+if __name__ == "__main__":
+    unittest.main()
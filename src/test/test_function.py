@@ -0,0 +1,27 @@
+import unittest
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+
+from src.memory.syntactic.function import *
+
+
+class TestLinedCode(unittest.TestCase):
+    def setUp(self):
+        self.function = Function(0, "f", "void f() {\n  g();\n}", 10, 12, None, "A.java")
+
+    def test_full_rendering(self):
+        self.assertEqual(self.function.lined_code, "1. void f() {\n2.   g();\n3. }")
+        self.assertEqual(
+            self.function.absolute_lined_code, "10. void f() {\n11.   g();\n12. }"
+        )
+
+    def test_line_range(self):
+        self.assertEqual(self.function.attach_relative_line_number(2, 2), "2.   g();")
+        self.assertEqual(self.function.attach_absolute_line_number(11), "11.   g();\n12. }")
+        self.assertEqual(self.function.attach_absolute_line_number(1, 10), "10. void f() {")
+
+
+if __name__ == "__main__":
+    unittest.main()
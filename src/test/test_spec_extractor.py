@@ -0,0 +1,65 @@
+import unittest
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+
+from src.tstool.analyzer.ts_analyzer import load_query
+from src.tstool.analyzer.Java_TS_analyzer import JavaTSAnalyzer
+from src.tstool.dfbscan_extractor.Java.Java_NPD_extractor import Java_NPD_Extractor
+from src.tstool.dfbscan_extractor.spec_extractor import *
+
+
+def to_keys(values):
+    return sorted((value.file, value.line_number, value.name, str(value.label)) for value in values)
+
+
+class TestSpecExtractor(unittest.TestCase):
+    def test_java_npd_spec(self):
+        code_in_files = {
+            "A.java": "class A {\n"
+            "  String s;\n"
+            "  void f(B b) {\n"
+            "    String t = null;\n"
+            "    t.length();\n"
+            "    this.s = b.g(null).h;\n"
+            "  }\n"
+            "}\n",
+        }
+        analyzer = JavaTSAnalyzer(code_in_files, max_symbolic_workers_num=1)
+        spec_path = SpecExtractor.find_spec_path("Java", "NPD")
+        self.assertIsNotNone(spec_path)
+        expected_sources, expected_sinks = Java_NPD_Extractor(analyzer).extract_all()
+        sources, sinks = SpecExtractor.from_file(analyzer, str(spec_path)).extract_all()
+        self.assertEqual(to_keys(sources), to_keys(expected_sources))
+        self.assertEqual(to_keys(sinks), to_keys(expected_sinks))
+        self.assertEqual(len(sources), 2)
+        self.assertEqual(len(sinks), 4)
+
+    def test_compile_rules(self):
+        rules = [
+            {
+                "pattern": "(call_expression function: (identifier) @name) @value",
+                "names": {"capture": "name", "in": "$frees"},
+            }
+        ]
+        self.assertEqual(
+            compile_rules(rules, {"frees": ["free", "g_free"]}),
+            '((call_expression function: (identifier) @name) @value '
+            '(#match? @name "^(free|g_free)$"))',
+        )
+        with self.assertRaises(ValueError):
+            compile_rules([{"pattern": "(null_literal) @node"}], {})
+        with self.assertRaises(ValueError):
+            compile_rules(rules, {})
+
+    def test_cpp_mlk_spec(self):
+        with open(SpecExtractor.find_spec_path("Cpp", "MLK"), "r") as spec_file:
+            spec = json.load(spec_file)
+        name_sets = spec["name_sets"]
+        self.assertIsNotNone(load_query("Cpp", compile_rules(spec["sources"], name_sets)))
+        self.assertIsNotNone(load_query("Cpp", compile_rules(spec["sinks"], name_sets)))
+
+
+if __name__ == "__main__":
+    unittest.main()
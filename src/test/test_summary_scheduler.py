@@ -0,0 +1,89 @@
+import unittest
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+
+from src.tstool.analyzer.Java_TS_analyzer import JavaTSAnalyzer
+from src.agent.summary_scheduler import SummaryScheduler
+
+
+class TestSummaryScheduler(unittest.TestCase):
+    def setUp(self):
+        # main -> even <-> odd -> leaf, main -> leaf
+        code_in_files = {
+            "A.java": "class A {\n"
+            "  void main() { even(1); leaf(); }\n"
+            "  void even(int n) { odd(n); }\n"
+            "  void odd(int n) { even(n); leaf(); }\n"
+            "  void leaf() {}\n"
+            "}\n",
+        }
+        self.analyzer = JavaTSAnalyzer(code_in_files, max_symbolic_workers_num=1)
+        self.ids = {
+            function.function_name: function_id
+            for function_id, function in self.analyzer.function_env.items()
+        }
+
+    def test_bottom_up_order(self):
+        sccs = self.analyzer.get_call_graph_sccs()
+        positions = {function_id: i for i, scc in enumerate(sccs) for function_id in scc}
+        self.assertEqual(positions[self.ids["even"]], positions[self.ids["odd"]])
+        self.assertLess(positions[self.ids["leaf"]], positions[self.ids["odd"]])
+        self.assertLess(positions[self.ids["odd"]], positions[self.ids["main"]])
+
+    def test_summaries(self):
+        calls = []
+
+        def summarize(function, callee_summaries):
+            # The names of the transitive callees, which converge in recursive SCCs
+            calls.append(function.function_name)
+            names = set()
+            for callee_id, callee_names in callee_summaries.items():
+                names.add(self.analyzer.function_env[callee_id].function_name)
+                names.update(callee_names)
+            return frozenset(names)
+
+        scheduler = SummaryScheduler(self.analyzer, summarize, max_workers=2)
+        summaries = scheduler.run([self.ids["main"]])
+        self.assertEqual(summaries, {self.ids["main"]: {"even", "odd", "leaf"}})
+        self.assertEqual(scheduler.get_summary(self.ids["even"]), {"even", "odd", "leaf"})
+        self.assertEqual(calls.count("leaf"), 1)
+        self.assertEqual(calls[0], "leaf")
+        self.assertEqual(calls[-1], "main")
+
+        calls.clear()
+        scheduler.run([self.ids["main"]])
+        self.assertEqual(calls, [])
+        scheduler.invalidate([self.ids["odd"]])
+        scheduler.run()
+        self.assertEqual(set(calls), {"even", "odd", "main"})
+        self.assertEqual(calls.count("main"), 1)
+
+    def test_max_depth(self):
+        calls = []
+
+        def summarize(function, callee_summaries):
+            calls.append(function.function_name)
+            return frozenset(
+                self.analyzer.function_env[callee_id].function_name for callee_id in callee_summaries
+            )
+
+        scheduler = SummaryScheduler(self.analyzer, summarize)
+        summaries = scheduler.run([self.ids["odd"]], max_depth=0)
+        # The SCC of odd is summarized as a whole, without its callee leaf
+        self.assertEqual(summaries, {self.ids["odd"]: {"even"}})
+        self.assertEqual(set(calls), {"even", "odd"})
+        self.assertIsNone(scheduler.get_summary(self.ids["leaf"]))
+
+        calls.clear()
+        scheduler = SummaryScheduler(self.analyzer, summarize)
+        scheduler.run([self.ids["even"]], max_depth=1)
+        # leaf is two calls away from even
+        self.assertEqual(set(calls), {"even", "odd"})
+        scheduler.run([self.ids["even"]], max_depth=2)
+        self.assertEqual(calls.count("leaf"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
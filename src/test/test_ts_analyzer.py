@@ -0,0 +1,327 @@
+import unittest
+import sys
+import tempfile
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+
+from src.tstool.analyzer.ts_analyzer import *
+from src.tstool.analyzer.Java_TS_analyzer import JavaTSAnalyzer
+from src.tstool.analyzer.ts_store import SourceFileStore
+
+
+class TestTreeEdit(unittest.TestCase):
+    def test_insertion(self):
+        old_source = b"int f() {\n  return 0;\n}\n"
+        new_source = b"int f() {\n  g();\n  return 0;\n}\n"
+        self.assertEqual(
+            compute_tree_edit(old_source, new_source),
+            (12, 12, 19, (1, 2), (1, 2), (2, 2)),
+        )
+
+    def test_replacement(self):
+        old_source = b"a\nbcd\ne"
+        new_source = b"a\nbXd\ne"
+        self.assertEqual(
+            compute_tree_edit(old_source, new_source),
+            (3, 4, 4, (1, 1), (1, 2), (1, 2)),
+        )
+
+    def test_identical(self):
+        source = b"abc"
+        self.assertEqual(
+            compute_tree_edit(source, source), (3, 3, 3, (0, 3), (0, 3), (0, 3))
+        )
+
+
+@unittest.skipUnless(TS_LANGUAGE_PATH.exists(), "the grammar library is not built")
+class TestNodeTypeIndex(unittest.TestCase):
+    def setUp(self):
+        self.parser = Parser()
+        self.parser.set_language(load_language("Java"))
+
+    def test_deep_nodes(self):
+        expression = "(" * 150 + "a" + ")" * 150
+        source_code = f"class A {{ int f() {{ if (x) {{ return {expression}; }} return 0; }} }}"
+        tree = self.parser.parse(bytes(source_code, "utf8"))
+        method_node = find_nodes_by_type(tree.root_node, "method_declaration")[0]
+        function = Function(0, "f", method_node.text.decode("utf8"), 1, 1, method_node, "A.java")
+        self.assertEqual(len(function.find_nodes_by_type("identifier")), 3)
+        self.assertEqual(len(function.find_nodes_by_type("return_statement")), 2)
+        self.assertEqual(function.get_all_nodes(), find_all_nodes(method_node))
+        # The returned lists are copies
+        function.find_nodes_by_type("if_statement").clear()
+        self.assertEqual(len(function.find_nodes_by_type("if_statement")), 1)
+
+    def test_query_registry(self):
+        query_text = "(method_declaration name: (identifier) @name)"
+        self.assertIs(load_query("Java", query_text), load_query("Java", query_text))
+        self.assertIsNot(load_query("Java", query_text), load_query("Java", query_text + " "))
+
+    def test_function_nodes(self):
+        source_code = "class A {\n  void f(int x) {}\n  int g() { return 1; }\n}\n"
+        analyzer = TSAnalyzer.__new__(JavaTSAnalyzer)
+        TSAnalyzer._init_analysis_state(analyzer, {"A.java": source_code}, "Java", 1)
+        analyzer._parse_single_file("A.java", source_code)
+        functions = sorted(analyzer.functionRawDataDic.values())
+        self.assertEqual([function[:3] for function in functions], [("f", 2, 2), ("g", 3, 3)])
+        self.assertEqual(functions[1][3].text, b"int g() { return 1; }")
+
+
+@unittest.skipUnless(TS_LANGUAGE_PATH.exists(), "the grammar library is not built")
+class TestCalleeResolution(unittest.TestCase):
+    def test_receiver_types(self):
+        code_in_files = {
+            "p/A.java": "package p;\nimport q.Helper;\nimport java.util.List;\n"
+            "class A extends Base {\n"
+            "  Helper h; List<String> xs;\n"
+            "  void close() {}\n"
+            "  void m(B b) { b.close(); h.close(); xs.get(0); close(); super.close(); }\n"
+            "}\n",
+            "p/Base.java": "package p;\nclass Base { void close() {} }\n",
+            "p/B.java": "package p;\nclass B { void close() {} }\n",
+            "q/Helper.java": "package q;\npublic class Helper { void close() {} int get(int i) { return i; } }\n",
+        }
+        analyzer = JavaTSAnalyzer(code_in_files, max_symbolic_workers_num=1)
+        caller = [
+            function for function in analyzer.function_env.values() if function.function_name == "m"
+        ][0]
+        callees = sorted(
+            analyzer.get_declaring_class_name(function) + "." + function.function_name
+            for function in analyzer.get_all_callee_functions(caller)
+        )
+        self.assertEqual(callees, ["p.A.close", "p.B.close", "p.Base.close", "q.Helper.close"])
+        self.assertEqual(analyzer.get_call_edge_precision()["name_matched_edges"], 17)
+        self.assertEqual(analyzer.get_call_edge_precision()["resolved_edges"], 5)
+
+        call_site_nodes = caller.find_nodes_by_type("method_invocation")
+        call_site_fact = analyzer.get_call_site_fact(caller, call_site_nodes[2])
+        self.assertEqual(call_site_fact.callee_name, "get")
+        self.assertEqual([str(argument.name) for argument in call_site_fact.arguments], ["0"])
+        self.assertEqual(call_site_fact.callee_ids, ())
+        self.assertEqual(call_site_fact.line_number, 7)
+        self.assertEqual(
+            analyzer.get_callee_api_ids_at_callsite(caller, call_site_nodes[2]),
+            list(call_site_fact.api_ids),
+        )
+        self.assertEqual(
+            analyzer.api_env[call_site_fact.api_ids[0]].api_name, "get"
+        )
+        self.assertEqual(
+            len(analyzer.get_callee_function_ids_at_callsite(caller, call_site_nodes[0])), 1
+        )
+
+
+class TestSinkReachability(unittest.TestCase):
+    def test_returns_then_calls(self):
+        # main -> src, main -> mid -> sink, other -> src
+        code_in_files = {
+            "A.java": "class A {\n"
+            "  void main() { int x = src(); mid(x); }\n"
+            "  int src() { return 0; }\n"
+            "  void mid(int x) { sink(x); }\n"
+            "  void sink(int x) {}\n"
+            "  void other() { src(); }\n"
+            "  void alone() {}\n"
+            "}\n",
+        }
+        analyzer = JavaTSAnalyzer(code_in_files, max_symbolic_workers_num=1)
+        ids = {
+            function.function_name: function_id
+            for function_id, function in analyzer.function_env.items()
+        }
+        distances = analyzer.get_sink_reachable_function_ids({ids["sink"]})
+        self.assertEqual(
+            distances,
+            {ids["sink"]: 0, ids["mid"]: 1, ids["main"]: 2, ids["src"]: 3},
+        )
+        self.assertEqual(
+            set(analyzer.get_sink_reachable_function_ids({ids["sink"]}, 2)),
+            {ids["sink"], ids["mid"], ids["main"]},
+        )
+
+
+class TestDefUseIndex(unittest.TestCase):
+    def test_hints_and_slices(self):
+        code_in_files = {
+            "A.java": "class A {\n"
+            "  int f(String s, int n) {\n"
+            "    String t = s.trim(), u = \"a\";\n"
+            "    int k = n;\n"
+            "    for (String p : t.split(\",\")) { u += p; }\n"
+            "    k++;\n"
+            "    return k;\n"
+            "  }\n"
+            "}\n",
+        }
+        analyzer = JavaTSAnalyzer(code_in_files, max_symbolic_workers_num=1)
+        function = list(analyzer.function_env.values())[0]
+        self.assertEqual(
+            analyzer.get_local_variable_declarations(function),
+            ['String t = s.trim()', 'String u = "a"', "int k = n", 'String p : t.split(",")'],
+        )
+        self.assertEqual(analyzer.get_assignment_expressions(function), ["u += p", "k++"])
+        self.assertEqual(
+            analyzer.get_local_variable_declarations(function, ["n"]), ["int k = n"]
+        )
+        self.assertEqual(analyzer.get_assignment_expressions(function, ["s"]), ["u += p"])
+        self.assertEqual(
+            [(record.kind, record.line_number) for record in analyzer.get_def_use_slice(function, ["k"])],
+            [("declaration", 4), ("assignment", 6), ("use", 6), ("use", 7)],
+        )
+
+
+class TestExtractFunctionInfoFromCode(unittest.TestCase):
+    def test_changed_content(self):
+        analyzer = JavaTSAnalyzer({"A.java": "class A {\n  void f() {}\n}\n"}, max_symbolic_workers_num=1)
+        old_function_ids = analyzer.get_function_ids_in_file("A.java")
+        old_tree = analyzer.parse_trees["A.java"]
+        analyzer.extract_function_info_from_code("A.java", "class A {\n  void f() {}\n}\n")
+        self.assertEqual(analyzer.get_function_ids_in_file("A.java"), old_function_ids)
+        self.assertIs(analyzer.parse_trees["A.java"], old_tree)
+
+        source_code = "class A {\n  int x;\n  void g() { f(); }\n  void f() {}\n}\n"
+        analyzer.extract_function_info_from_code("A.java", source_code)
+        function_ids = analyzer.get_function_ids_in_file("A.java")
+        self.assertTrue(set(function_ids).isdisjoint(old_function_ids))
+        self.assertEqual(
+            sorted(
+                analyzer.get_function_node(function_id).text.decode("utf8") for function_id in function_ids
+            ),
+            ["void f() {}", "void g() { f(); }"],
+        )
+        self.assertEqual(len(analyzer.functionRawDataDic), 2)
+
+        analyzer.extract_function_info_from_code("B.java", "class B {\n  void h() {}\n}\n")
+        self.assertEqual(len(analyzer.get_function_ids_in_file("B.java")), 1)
+
+
+class TestSymbolicBackend(unittest.TestCase):
+    def test_thread_and_process_backends(self):
+        code_in_files = {
+            f"p/A{i}.java": f"class A{i} {{\n"
+            f"  int f(int x) {{ if (x > 0) {{ return g(x - 1); }} while (x < 0) {{ x++; }} return x; }}\n"
+            f"  int g(int y) {{ return f(y) + Math.abs(y); }}\n"
+            f"}}\n"
+            for i in range(4)
+        }
+        code_in_files["p/C.java"] = "class C {\n  int h(int z) { return z; }\n}\n"
+
+        def summarize(analyzer):
+            def key(function):
+                return (function.file_path, function.start_line_number, function.function_name)
+
+            functions = {}
+            for function in analyzer.function_env.values():
+                callees = analyzer.function_caller_callee_map.get(function.function_id, set())
+                apis = analyzer.function_caller_api_callee_map.get(function.function_id, set())
+                functions[key(function)] = (
+                    function.function_code,
+                    sorted(map(str, function.paras)),
+                    sorted(map(str, function.retvals)),
+                    sorted(function.if_statements.items()),
+                    sorted(function.loop_statements.items()),
+                    function.def_use_index.records,
+                    sorted(key(analyzer.function_env[callee_id]) for callee_id in callees),
+                    sorted(analyzer.api_env[api_id].api_name for api_id in apis),
+                )
+            return functions
+
+        thread_analyzer = JavaTSAnalyzer(dict(code_in_files), max_symbolic_workers_num=2)
+        process_analyzer = JavaTSAnalyzer(
+            dict(code_in_files), max_symbolic_workers_num=2, symbolic_backend="process"
+        )
+        self.assertEqual(len(thread_analyzer.function_env), 9)
+        self.assertEqual(summarize(process_analyzer), summarize(thread_analyzer))
+        # The main process only parses the files whose call sites are resolved
+        self.assertIsNone(process_analyzer.parse_trees.peek("p/C.java"))
+        self.assertEqual(process_analyzer.parse_trees.reparse_num, 4)
+
+
+class TestAnalysisCache(unittest.TestCase):
+    def test_identical_files(self):
+        source_code = "class A {\n  int f(int x) {\n    g(x);\n    return x;\n  }\n  void g(int y) {}\n}\n"
+        code_in_files = {"a/A.java": source_code, "b/A.java": source_code}
+        with tempfile.TemporaryDirectory() as cache_dir:
+            JavaTSAnalyzer(dict(code_in_files), max_symbolic_workers_num=1, cache_dir=cache_dir)
+            analyzer = JavaTSAnalyzer(
+                dict(code_in_files), max_symbolic_workers_num=1, cache_dir=cache_dir
+            )
+            self.assertEqual(analyzer.cache.hit_num, 2)
+            for function in analyzer.function_env.values():
+                values = set(function.paras) | set(function.retvals)
+                for arguments in analyzer.call_site_summaries.get(function.function_id, []):
+                    values |= set(arguments[3])
+                self.assertGreater(len(values), 0)
+                self.assertEqual({value.file for value in values}, {function.file_path})
+
+    def test_warm_load_defers_parsing(self):
+        code_in_files = {
+            "p/A.java": "package p;\nclass A extends B {\n  int f(int x) {\n    return x;\n  }\n}\n",
+            "p/B.java": "package p;\nclass B {\n  int g(int y) {\n    return y + 1;\n  }\n}\n",
+        }
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold_analyzer = JavaTSAnalyzer(
+                dict(code_in_files), max_symbolic_workers_num=1, cache_dir=cache_dir
+            )
+            warm_analyzer = JavaTSAnalyzer(
+                dict(code_in_files), max_symbolic_workers_num=1, cache_dir=cache_dir
+            )
+            self.assertEqual(warm_analyzer.cache.hit_num, 2)
+            # Neither file has call sites, so no tree has been parsed yet
+            self.assertEqual(warm_analyzer.parse_trees.reparse_num, 0)
+            for file_path in code_in_files:
+                self.assertIsNone(warm_analyzer.parse_trees.peek(file_path))
+                self.assertEqual(
+                    warm_analyzer.type_index.get_file_scope(file_path),
+                    cold_analyzer.type_index.get_file_scope(file_path),
+                )
+            for function_id, function in warm_analyzer.function_env.items():
+                cold_function = cold_analyzer.function_env[function_id]
+                self.assertEqual(function.function_code, cold_function.function_code)
+                self.assertEqual(function.paras, cold_function.paras)
+                self.assertEqual(function.retvals, cold_function.retvals)
+                # The tree is parsed on first access
+                self.assertEqual(
+                    function.parse_tree_root_node.byte_range,
+                    cold_function.parse_tree_root_node.byte_range,
+                )
+            self.assertEqual(warm_analyzer.parse_trees.reparse_num, 2)
+
+
+class TestTreeEviction(unittest.TestCase):
+    def test_evicted_files_have_no_live_nodes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_paths = []
+            for i in range(6):
+                file_path = path.join(tmp_dir, f"A{i}.java")
+                with open(file_path, "w") as source_file:
+                    source_file.write(
+                        f"class A{i} {{\n"
+                        f"  int f{i}(int x) {{ if (x > 0) {{ return f{i}(x - 1); }} return size(x); }}\n"
+                        f"}}\n"
+                    )
+                file_paths.append(file_path)
+            analyzer = JavaTSAnalyzer(
+                SourceFileStore(file_paths), max_symbolic_workers_num=1, max_tree_memory=1
+            )
+            evicted_file_paths = [
+                file_path for file_path in file_paths if analyzer.parse_trees.peek(file_path) is None
+            ]
+            self.assertEqual(len(evicted_file_paths), 5)
+            for function in analyzer.function_env.values():
+                if function.file_path not in evicted_file_paths:
+                    continue
+                self.assertIsNone(function._parse_tree_root_node)
+                self.assertIsNone(function._all_nodes)
+                self.assertIsNone(function._function_call_site_nodes)
+                self.assertIsNone(function._api_call_site_nodes)
+                self.assertIsNone(analyzer.functionRawDataDic[function.function_id][3])
+            # The nodes are located again on demand
+            function = analyzer.function_env[analyzer.get_function_ids_in_file(evicted_file_paths[0])[0]]
+            self.assertEqual(len(function.function_call_site_nodes), 1)
+            self.assertEqual(len(function.api_call_site_nodes), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import unittest
+import sys
+import tempfile
+from os import path
+from pathlib import Path
+
+sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+
+from src.tstool.analyzer.ts_cache import *
+from src.memory.syntactic.value import *
+
+
+class TestTSAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.grammar_path = Path(self.tmp_dir.name) / "my-languages.so"
+        self.grammar_path.write_bytes(b"grammar")
+        self.cache = TSAnalysisCache(
+            self.tmp_dir.name + "/cache", "Java", "JavaTSAnalyzer", self.grammar_path
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_store_and_load(self):
+        source_code = "class A { void f() {} }"
+        self.assertIsNone(self.cache.load(source_code))
+        summary = {"functions": [{"name": "f", "start_line": 1, "end_line": 1}]}
+        self.cache.store(source_code, summary)
+        self.assertEqual(self.cache.load(source_code), summary)
+        self.assertIsNone(self.cache.load(source_code + "\n"))
+        self.assertEqual(self.cache.hit_num, 1)
+        self.assertEqual(self.cache.miss_num, 2)
+
+    def test_key_depends_on_analyzer(self):
+        other_cache = TSAnalysisCache(
+            self.tmp_dir.name + "/cache", "Java", "OtherAnalyzer", self.grammar_path
+        )
+        self.assertNotEqual(self.cache.get_key("x"), other_cache.get_key("x"))
+
+    def test_value_record_round_trip(self):
+        value = Value("a, b", 3, ValueLabel.ARG, "A.java", 1)
+        self.assertEqual(record_to_value(value_to_record(value), "A.java"), value)
+
+    def test_statement_record_round_trip(self):
+        if_statements = {(1, 5): ("x > 0", 1, 1, (2, 3), (4, 5))}
+        records = statements_to_records(if_statements)
+        self.assertEqual(records_to_statements(records), if_statements)
+
+    def test_file_scope_record_round_trip(self):
+        scope = FileScope(
+            "p",
+            ("java.util.List",),
+            ("java.io",),
+            ("java.lang.Math",),
+            (ClassInfo("p.A", "A.java", ("B",), (("x", "List"),)),),
+        )
+        record = json.loads(json.dumps(file_scope_to_record(scope)))
+        self.assertEqual(record_to_file_scope(record, "A.java"), scope)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+
+from src.tstool.analyzer.ts_call_graph import *
+
+
+class TestCallGraphQuery(unittest.TestCase):
+    def setUp(self):
+        # 0 -> 1 <-> 2 -> 3, 4 -> 4
+        self.query = CallGraphQuery({0: {1}, 1: {2}, 2: {1, 3}, 4: {4}})
+
+    def test_components(self):
+        self.assertEqual(self.query.component_ids[1], self.query.component_ids[2])
+        self.assertEqual(len(self.query.components), 4)
+
+    def test_unbounded_reach(self):
+        self.assertEqual(self.query.reach(0), {1, 2, 3})
+        self.assertEqual(self.query.reach(1), {1, 2, 3})
+        self.assertEqual(self.query.reach(3), set())
+        self.assertEqual(self.query.reach(4), {4})
+        self.assertEqual(self.query.reach(5), set())
+
+    def test_bounded_reach(self):
+        self.assertEqual(self.query.reach(0, 0), set())
+        self.assertEqual(self.query.reach(0, 1), {1})
+        self.assertEqual(self.query.reach(0, 2), {1, 2})
+        self.assertEqual(self.query.reach(1, 2), {1, 2, 3})
+        self.assertEqual(self.query.reach(0, 1000), {1, 2, 3})
+
+    def test_long_chain(self):
+        query = CallGraphQuery({node: {node + 1} for node in range(50000)})
+        self.assertEqual(len(query.reach(0)), 50000)
+        self.assertEqual(query.reach(0, 3), {1, 2, 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
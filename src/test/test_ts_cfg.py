@@ -0,0 +1,69 @@
+import unittest
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+
+from src.tstool.analyzer.ts_cfg import *
+from src.tstool.analyzer.Java_TS_analyzer import JavaTSAnalyzer
+
+
+class TestControlFlowGraph(unittest.TestCase):
+    def test_dominators(self):
+        # entry -> 2 -> {3, 4} -> 5 -> exit, 5 -> 2
+        cfg = ControlFlowGraph()
+        for _ in range(4):
+            cfg.add_block()
+        for src, dst in [(0, 2), (2, 3), (2, 4), (3, 5), (4, 5), (5, 2), (5, 1)]:
+            cfg.add_edge(src, dst)
+        self.assertEqual(cfg.get_dominator_tree(), {0: 0, 2: 0, 3: 2, 4: 2, 5: 2, 1: 5})
+        self.assertEqual(cfg.get_post_dominator_tree(), {1: 1, 5: 1, 3: 5, 4: 5, 2: 5, 0: 2})
+        self.assertTrue(cfg.dominates(2, 4))
+        self.assertFalse(cfg.dominates(3, 5))
+        self.assertTrue(cfg.post_dominates(5, 0))
+
+    def test_java_reachability(self):
+        code = (
+            "class A {\n"
+            "  int f(int x) {\n"
+            "    if (x > 0) {\n"
+            "      return 1;\n"
+            "    }\n"
+            "    int y = x;\n"
+            "    while (true) {\n"
+            "      if (y > 3) break;\n"
+            "      y++;\n"
+            "    }\n"
+            "    try {\n"
+            "      g(y);\n"
+            "    } catch (Exception e) {\n"
+            "      return 2;\n"
+            "    } finally {\n"
+            "      h();\n"
+            "    }\n"
+            "    switch (x) {\n"
+            "      case 1: a();\n"
+            "      case 2: b(); break;\n"
+            "      default: return 3;\n"
+            "    }\n"
+            "    return y;\n"
+            "  }\n"
+            "}\n"
+        )
+        analyzer = JavaTSAnalyzer({"A.java": code}, max_symbolic_workers_num=1)
+        function = list(analyzer.function_env.values())[0]
+        self.assertFalse(analyzer.check_control_reachability(function, 4, 6))
+        self.assertTrue(analyzer.check_control_reachability(function, 3, 6))
+        self.assertTrue(analyzer.check_control_reachability(function, 12, 14))
+        self.assertTrue(analyzer.check_control_reachability(function, 14, 16))
+        self.assertTrue(analyzer.check_control_reachability(function, 19, 20))
+        self.assertTrue(analyzer.check_control_reachability(function, 9, 8))
+        self.assertEqual(
+            analyzer.check_control_reachability_in_bulk(function, [(21, 23), (20, 23), (4, 23)]),
+            [False, True, False],
+        )
+        self.assertIs(analyzer.get_control_flow_graph(function), function.control_flow_graph)
+
+
+if __name__ == "__main__":
+    unittest.main()
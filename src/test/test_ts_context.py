@@ -0,0 +1,56 @@
+import unittest
+import copy
+import pickle
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+
+from src.tstool.analyzer.ts_context import *
+
+
+class TestCallContext(unittest.TestCase):
+    def setUp(self):
+        self.call = ContextLabel("A.java", 3, 1, Parenthesis.LEFT_PAR)
+        self.ret = ContextLabel("A.java", 3, 1, Parenthesis.RIGHT_PAR)
+        self.other_ret = ContextLabel("A.java", 7, 1, Parenthesis.RIGHT_PAR)
+
+    def test_hash_consing(self):
+        _, first = CallContext(False).add_and_check_context(self.call)
+        _, second = CallContext(False).add_and_check_context(
+            ContextLabel("A.java", 3, 1, Parenthesis.LEFT_PAR)
+        )
+        self.assertIs(first, second)
+        self.assertIsNot(first, CallContext(True).add_and_check_context(self.call)[1])
+        self.assertIs(copy.deepcopy(first), first)
+        self.assertIs(pickle.loads(pickle.dumps(first)), first)
+        with self.assertRaises(AttributeError):
+            first.is_backward = True
+
+    def test_cfl_matching(self):
+        context = CallContext(False)
+        _, called = context.add_and_check_context(self.call)
+        is_reachable, returned = called.add_and_check_context(self.ret)
+        self.assertTrue(is_reachable)
+        self.assertEqual(returned.simplified_context, [])
+        self.assertEqual(returned.context, [self.call, self.ret])
+        self.assertEqual(len(returned), 2)
+        is_reachable, unchanged = called.add_and_check_context(self.other_ret)
+        self.assertFalse(is_reachable)
+        self.assertIs(unchanged, called)
+        self.assertEqual(
+            str(returned), "False(A.java 3 1 LEFT_PAR) -> (A.java 3 1 RIGHT_PAR)"
+        )
+
+    def test_k_limit(self):
+        context = CallContext(False, k_limit=2)
+        for line_number in range(5):
+            label = ContextLabel("A.java", line_number, 1, Parenthesis.LEFT_PAR)
+            _, context = context.add_and_check_context(label)
+        self.assertEqual(len(context), 2)
+        self.assertEqual([label.line_number for label in context.context], [3, 4])
+        self.assertEqual(len(context.simplified_context), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
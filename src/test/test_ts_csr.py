@@ -0,0 +1,51 @@
+import unittest
+import random
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+
+from src.tstool.analyzer.ts_call_graph import *
+from src.tstool.analyzer.ts_csr import *
+
+
+class TestCSRCallGraph(unittest.TestCase):
+    def setUp(self):
+        # 0 -> 1 <-> 2 -> 3, 4 -> 4
+        self.successors = {0: {1}, 1: {2}, 2: {1, 3}, 4: {4}}
+        self.graph = CSRCallGraph(self.successors)
+
+    def test_adjacency(self):
+        self.assertEqual(len(self.graph), 5)
+        self.assertEqual(self.graph.edge_num, 5)
+        self.assertEqual(self.graph.successors(2), [1, 3])
+        self.assertEqual(self.graph.successors(3), [])
+        self.assertEqual(self.graph.successors(5), [])
+
+    def test_reach(self):
+        self.assertEqual(
+            self.graph.reach([0, 1, 3, 4, 5]),
+            {0: [1, 2, 3], 1: [1, 2, 3], 3: [], 4: [4], 5: []},
+        )
+        self.assertEqual(self.graph.reach([0], 2), {0: [1, 2]})
+        self.assertEqual(self.graph.reach([0], 0), {0: []})
+        self.assertEqual(self.graph.reach_bitsets([0, 1], 1).shape, (2, 1))
+
+    def test_consistent_with_query(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            node_num = rng.randint(1, 40)
+            successors = {
+                node: set(rng.sample(range(node_num), rng.randint(0, min(3, node_num))))
+                for node in range(node_num)
+            }
+            graph = CSRCallGraph(successors)
+            query = CallGraphQuery(successors)
+            for max_depth in [1, 3, None]:
+                reach = graph.reach(range(node_num), max_depth)
+                for node in range(node_num):
+                    self.assertEqual(reach[node], sorted(query.reach(node, max_depth)))
+
+
+if __name__ == "__main__":
+    unittest.main()
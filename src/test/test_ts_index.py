@@ -0,0 +1,65 @@
+import unittest
+import sys
+import time
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+
+from src.tstool.analyzer.ts_index import *
+
+
+class TestIntervalIndex(unittest.TestCase):
+    def test_nested_intervals(self):
+        index = IntervalIndex([(1, 10, "a"), (3, 5, "b"), (3, 4, "c"), (12, 20, "d")])
+        self.assertEqual(index.find(4), ["c", "b", "a"])
+        self.assertEqual(index.find(5), ["b", "a"])
+        self.assertEqual(index.find(11), [])
+        self.assertEqual(index.find(20), ["d"])
+        self.assertEqual(index.find(0), [])
+
+    def test_overlapping_intervals(self):
+        intervals = [(start, start + length, (start, length)) for start in range(0, 50, 3) for length in (0, 4, 9)]
+        index = IntervalIndex(intervals)
+        for point in range(-1, 62):
+            expected = set(item for start, end, item in intervals if start <= point <= end)
+            self.assertEqual(set(index.find(point)), expected)
+
+
+class TestControlOrderIndex(unittest.TestCase):
+    def test_check_orders(self):
+        # if at lines 2-9 with the true branch 3-5 and the else branch 6-8, loop body 11-20
+        if_statements = {(2, 9): ("x > 0", 2, 2, (3, 5), (6, 8)), (12, 14): ("y", 12, 12, (13, 14), (0, 0))}
+        loop_statements = {(10, 21): ("i < n", 10, 10, 11, 20)}
+        index = ControlOrderIndex(if_statements, loop_statements)
+        self.assertFalse(index.check_order(4, 7))
+        self.assertTrue(index.check_order(7, 7))
+        self.assertTrue(index.check_order(1, 7))
+        self.assertFalse(index.check_order(7, 4))
+        self.assertTrue(index.check_order(18, 12))
+        self.assertEqual(index.check_orders([(4, 7), (13, 15), (15, 13), (22, 1)]), [False, True, True, False])
+
+    def test_scaling_with_enclosing_constructs(self):
+        def check_time(branch_num):
+            # A guard if and a loop enclose all the branches
+            if_statements = {(1, 10 * branch_num + 5): ("guard", 1, 1, (2, 10 * branch_num + 4), (0, 0))}
+            for i in range(branch_num):
+                line = 10 * i + 3
+                if_statements[(line, line + 8)] = ("c", line, line, (line + 1, line + 3), (line + 5, line + 7))
+            loop_statements = {(0, 10 * branch_num + 6): ("loop", 0, 0, 1, 10 * branch_num + 5)}
+            pairs = [(10 * i + 5, 10 * i + 9) for i in range(branch_num)]
+            pairs += [(10 * i + 9, 10 * i + 5) for i in range(branch_num)]
+            best_time = None
+            for _ in range(3):
+                start_time = time.perf_counter()
+                results = ControlOrderIndex(if_statements, loop_statements).check_orders(pairs)
+                elapsed_time = time.perf_counter() - start_time
+                best_time = elapsed_time if best_time is None else min(best_time, elapsed_time)
+            self.assertEqual(results, [False] * branch_num + [True] * branch_num)
+            return best_time
+
+        # Four times the branches take about four times as long, instead of sixteen times
+        self.assertLess(check_time(4000), 10 * check_time(1000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import sys
+import tempfile
+from os import path
+from pathlib import Path
+
+sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+
+from src.tstool.analyzer.ts_store import *
+
+
+class FakeNode:
+    def __init__(self, end_byte):
+        self.end_byte = end_byte
+
+
+class FakeTree:
+    def __init__(self, end_byte):
+        self.root_node = FakeNode(end_byte)
+
+
+class TestParseTreeCache(unittest.TestCase):
+    def setUp(self):
+        self.evicted = []
+        self.cache = ParseTreeCache(
+            2 * TREE_BYTES_PER_SOURCE_BYTE * 100,
+            lambda file_path: FakeTree(99),
+            self.evicted.append,
+        )
+
+    def test_evict_and_reparse(self):
+        for file_path in ["a", "b", "c"]:
+            self.cache[file_path] = FakeTree(99)
+        self.assertEqual(self.evicted, ["a"])
+        self.assertIsNone(self.cache.peek("a"))
+        self.assertEqual(len(self.cache), 3)
+        self.assertIsNotNone(self.cache["a"])
+        self.assertEqual(self.cache.reparse_num, 1)
+        self.assertEqual(self.evicted, ["a", "b"])
+
+    def test_pop_without_reparse(self):
+        for file_path in ["a", "b", "c"]:
+            self.cache[file_path] = FakeTree(99)
+        self.assertIsNone(self.cache.pop("a"))
+        self.assertIsNone(self.cache.pop("a", None))
+        self.assertEqual(self.cache.reparse_num, 0)
+        self.assertNotIn("a", self.cache)
+
+    def test_unbounded(self):
+        cache = ParseTreeCache(None, lambda file_path: FakeTree(0))
+        for file_path in range(100):
+            cache[file_path] = FakeTree(10**6)
+        self.assertEqual(len(cache._trees), 100)
+
+
+class TestSourceFileStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_paths = []
+        for name, content in [("A.java", "class A {}\r\n"), ("B.java", ""), ("c.txt", "x")]:
+            file_path = Path(self.tmp_dir.name) / name
+            file_path.write_bytes(content.encode("utf8"))
+            self.file_paths.append(str(file_path))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_from_directory(self):
+        store = SourceFileStore.from_directory(self.tmp_dir.name, [".java"])
+        self.assertEqual(list(store), self.file_paths[:2])
+        self.assertEqual(store[self.file_paths[0]], "class A {}\n")
+        self.assertEqual(store[self.file_paths[1]], "")
+        with self.assertRaises(KeyError):
+            store[self.file_paths[2]]
+
+    def test_override_and_delete(self):
+        store = SourceFileStore(self.file_paths, max_cached_bytes=1)
+        self.assertEqual(store[self.file_paths[2]], "x")
+        store[self.file_paths[2]] = "y"
+        self.assertEqual(store[self.file_paths[2]], "y")
+        del store[self.file_paths[2]]
+        self.assertNotIn(self.file_paths[2], store)
+        self.assertEqual(len(store), 2)
+
+
+class TestLineIndex(unittest.TestCase):
+    def test_line_numbers(self):
+        source_code = "a\nbc\n\nd"
+        line_index = LineIndex(source_code)
+        offsets = list(range(len(source_code) + 1))
+        expected = [source_code[:offset].count("\n") + 1 for offset in offsets]
+        self.assertEqual([line_index.get_line_number(offset) for offset in offsets], expected)
+        self.assertEqual(line_index.get_line_numbers(offsets[::-1]), expected[::-1])
+
+    def test_line_content(self):
+        source_code = "a\nbc\n\nd"
+        line_index = LineIndex(source_code)
+        lines = source_code.split("\n")
+        for line_number in range(1, len(lines) + 1):
+            self.assertEqual(
+                line_index.get_line_content(source_code, line_number), lines[line_number - 1]
+            )
+        self.assertEqual(line_index.get_line_content(source_code, len(lines) + 1), "")
+        self.assertEqual(LineIndex("").get_line_content("", 1), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
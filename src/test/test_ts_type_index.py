@@ -0,0 +1,59 @@
+import unittest
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+
+from src.tstool.analyzer.ts_type_index import *
+
+
+class TestTypeIndex(unittest.TestCase):
+    def setUp(self):
+        self.type_index = TypeIndex()
+        self.type_index.update_file(
+            "p/A.java",
+            FileScope(
+                "p",
+                ("q.Helper",),
+                (),
+                (),
+                (
+                    ClassInfo("p.A", "p/A.java", ("Base", "Runnable"), (("h", "Helper"),)),
+                    ClassInfo("p.A.Inner", "p/A.java", ("A",), ()),
+                ),
+            ),
+        )
+        self.type_index.update_file(
+            "p/Base.java", FileScope("p", (), ("q",), (), (ClassInfo("p.Base", "p/Base.java", (), ()),))
+        )
+        self.type_index.update_file(
+            "q/Helper.java", FileScope("q", (), (), (), (ClassInfo("q.Helper", "q/Helper.java", (), ()),))
+        )
+
+    def test_resolve_type(self):
+        self.assertEqual(self.type_index.resolve_type("Base", "p/A.java"), "p.Base")
+        self.assertEqual(self.type_index.resolve_type("Helper", "p/A.java"), "q.Helper")
+        self.assertEqual(self.type_index.resolve_type("Helper", "p/Base.java"), "q.Helper")
+        self.assertEqual(self.type_index.resolve_type("Inner", "p/A.java"), "p.A.Inner")
+        self.assertEqual(self.type_index.resolve_type("A.Inner", "p/Base.java"), "p.A.Inner")
+        self.assertEqual(self.type_index.resolve_type("String", "p/A.java"), "String")
+
+    def test_hierarchy(self):
+        self.assertEqual(
+            self.type_index.get_supertypes("p.A.Inner"), {"p.A.Inner", "p.A", "p.Base", "Runnable"}
+        )
+        self.assertEqual(self.type_index.get_subtypes("Runnable"), {"Runnable", "p.A", "p.A.Inner"})
+        self.assertEqual(self.type_index.get_subtypes("q.Helper"), {"q.Helper"})
+        self.assertEqual(self.type_index.get_field_type("p.A.Inner", "h"), "q.Helper")
+        self.assertIsNone(self.type_index.get_field_type("p.A", "x"))
+
+    def test_update_and_remove(self):
+        scope = self.type_index.get_file_scope("p/Base.java")
+        self.assertFalse(self.type_index.update_file("p/Base.java", scope))
+        self.assertTrue(self.type_index.remove_file("p/Base.java"))
+        self.assertFalse(self.type_index.remove_file("p/Base.java"))
+        self.assertEqual(self.type_index.get_supertypes("p.A"), {"p.A", "Base", "Runnable"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+import sys
+import pickle
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+
+from src.memory.syntactic.value import *
+
+
+class TestValue(unittest.TestCase):
+    def test_equality_and_hash(self):
+        value = Value("x", 3, ValueLabel.SRC, "A.java")
+        same_value = Value("x", 3, ValueLabel.SRC, "".join(["A", ".java"]))
+        self.assertEqual(value, same_value)
+        self.assertEqual(hash(value), hash(same_value))
+        self.assertIs(value.file, same_value.file)
+        self.assertNotEqual(value, Value("x", 3, ValueLabel.SINK, "A.java"))
+        self.assertNotEqual(value, Value("x", 3, ValueLabel.SRC, "A.java", 0))
+        self.assertEqual(len({value, same_value, (value, 1)}), 2)
+
+    def test_string_round_trip(self):
+        value = Value("x", 3, ValueLabel.PARA, "src/A.java", 1)
+        self.assertEqual(str(value), "((x, src/A.java, 3, 1), ValueLabel.PARA)")
+        self.assertEqual(Value.from_str_to_value(str(value)), value)
+
+    def test_immutable(self):
+        value = Value("x", 3, ValueLabel.SRC, "A.java")
+        with self.assertRaises(AttributeError):
+            value.line_number = 4
+        self.assertEqual(pickle.loads(pickle.dumps(value)), value)
+
+
+if __name__ == "__main__":
+    unittest.main()
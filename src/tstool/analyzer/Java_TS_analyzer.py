@@ -1,18 +1,22 @@
 from os import path
 import sys
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 import tree_sitter
 
 from src.tstool.analyzer.ts_analyzer import TSAnalyzer, find_nodes_by_type
 from src.memory.syntactic.function import Function
 from src.memory.syntactic.value import Value, ValueLabel
+from src.tstool.analyzer.ts_type_index import ClassInfo, FileScope
+from src.tstool.analyzer.ts_cache import file_scope_to_record, record_to_file_scope
+from src.tstool.analyzer.ts_cfg import ControlFlowGraph
+from src.tstool.analyzer.ts_def_use import DefUseRecord
 
 sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
 
 class JavaTSAnalyzer(TSAnalyzer):
-    def __init__(self, code_in_files: dict = None):
-        super().__init__(code_in_files, "Java")
+    def __init__(self, code_in_files: dict = None, **kwargs):
+        super().__init__(code_in_files, "Java", **kwargs)
 
     def find_nodes_by_type(self, node, node_type):
         return find_nodes_by_type(node, node_type)
@@ -25,47 +29,281 @@ class JavaTSAnalyzer(TSAnalyzer):
             name: (identifier) @name
         ) @method
         """
-        query = self.language.query(query_str)
+        query = self.get_query(query_str)
         captures = query.captures(tree.root_node)
 
-        method_name_map = {}
-        for node, tag in captures:
-            if tag == 'method':
-                method_name_map[node.id] = None
-            elif tag == 'name':
-                parent_method = node.parent
-                if parent_method.id in method_name_map:
-                    method_name_map[parent_method.id] = node
-
-        for method_id, name_node in method_name_map.items():
+        for method_node, tag in captures:
+            if tag != 'method':
+                continue
+            name_node = method_node.child_by_field_name("name")
             if name_node:
-                method_node = tree.root_node.descendant_for_byte_range(method_id, method_id)
                 function_name = name_node.text.decode('utf8')
                 start_line_number = method_node.start_point[0] + 1
                 end_line_number = method_node.end_point[0] + 1
-                
-                if function_name not in self.functionNameToId:
-                    self.functionNameToId[function_name] = []
-                
-                current_function_id = len(self.functionRawDataDic)
-                self.functionRawDataDic[current_function_id] = (
+                self._register_function(
                     function_name,
                     start_line_number,
                     end_line_number,
                     method_node,
+                    file_path,
                 )
-                self.functionNameToId[function_name].append(current_function_id)
-                self.functionToFile[current_function_id] = file_path
 
     def extract_function_info_from_code(self, file_path: str, source_code: str) -> None:
-        tree = self.parser.parse(bytes(source_code, "utf8"))
-        self.extract_function_info(file_path, source_code, tree)
+        """
+        Extract the functions of a single file.
+        If the analyzer has already parsed the same content, its tree and functions are reused.
+        Otherwise, the file is (re-)analyzed by update_files, which drops its stale functions.
+        """
+        if self.code_in_files.get(file_path) == source_code:
+            if file_path not in self.parse_trees:
+                self._parse_single_file(file_path, source_code)
+            elif len(self._file_function_ids.get(file_path, [])) == 0:
+                self.extract_function_info(file_path, source_code, self.parse_trees[file_path])
+            return
+        self.update_files({file_path: source_code})
 
     def extract_global_info(self, file_path: str, source_code: str, tree: tree_sitter.Tree) -> None:
         # Java does not have global variables or macros in the same way as C/Cpp,
         # but you can have public static fields.
         # This implementation can be extended to find them if needed.
-        pass
+        # The package, the imports and the class declarations are indexed for callee resolution.
+        self.type_index.update_file(file_path, self._extract_file_scope(file_path, tree))
+
+    def summarize_global_info(self, file_path: str) -> Optional[List]:
+        return file_scope_to_record(self.type_index.get_file_scope(file_path))
+
+    def load_global_info(self, file_path: str, source_code: str, record: Optional[List]) -> None:
+        self.type_index.update_file(file_path, record_to_file_scope(record, file_path))
+
+    def _extract_file_scope(self, file_path: str, tree: tree_sitter.Tree) -> FileScope:
+        package = ""
+        imports = []
+        wildcard_imports = []
+        static_imports = []
+        for node in tree.root_node.named_children:
+            if node.type == "package_declaration":
+                for child in node.named_children:
+                    if child.type in {"identifier", "scoped_identifier"}:
+                        package = child.text.decode("utf8")
+            elif node.type == "import_declaration":
+                name_nodes = [
+                    child for child in node.named_children
+                    if child.type in {"identifier", "scoped_identifier"}
+                ]
+                if len(name_nodes) == 0:
+                    continue
+                imported_name = name_nodes[0].text.decode("utf8")
+                is_static = any(child.type == "static" for child in node.children)
+                is_wildcard = any(child.type == "asterisk" for child in node.children)
+                if is_static:
+                    static_imports.append(
+                        imported_name if is_wildcard else imported_name.rsplit(".", 1)[0]
+                    )
+                elif is_wildcard:
+                    wildcard_imports.append(imported_name)
+                else:
+                    imports.append(imported_name)
+
+        classes = []
+        query = self.get_query(
+            "["
+            + " ".join(f"({node_type})" for node_type in sorted(JAVA_CLASS_DECLARATION_TYPES))
+            + "] @class"
+        )
+        for node, _ in query.captures(tree.root_node):
+            qualified_name = self._get_qualified_class_name(node, package)
+            if qualified_name is None:
+                continue
+            super_names = []
+            for field_name in ["superclass", "interfaces"]:
+                super_node = node.child_by_field_name(field_name)
+                if super_node is not None:
+                    super_names.extend(get_java_type_names(super_node))
+            for child in node.named_children:
+                if child.type == "extends_interfaces":
+                    super_names.extend(get_java_type_names(child))
+            field_types = []
+            body_node = node.child_by_field_name("body")
+            for child in body_node.named_children if body_node is not None else []:
+                if child.type not in {"field_declaration", "constant_declaration"}:
+                    continue
+                type_name = get_java_type_name(child.child_by_field_name("type"))
+                for declarator in child.children_by_field_name("declarator"):
+                    name_node = declarator.child_by_field_name("name")
+                    if name_node is not None and type_name is not None:
+                        field_types.append((name_node.text.decode("utf8"), type_name))
+            classes.append(
+                ClassInfo(
+                    qualified_name,
+                    file_path,
+                    tuple(super_names),
+                    tuple(field_types),
+                )
+            )
+        return FileScope(
+            package,
+            tuple(imports),
+            tuple(wildcard_imports),
+            tuple(static_imports),
+            tuple(classes),
+        )
+
+    @staticmethod
+    def _get_qualified_class_name(class_node: tree_sitter.Node, package: str) -> Optional[str]:
+        """
+        Get the qualified name of a class declaration, e.g., package.Outer.Inner.
+        Return None for the classes declared in method bodies.
+        """
+        names = []
+        node = class_node
+        while node is not None:
+            if node.type in JAVA_CLASS_DECLARATION_TYPES:
+                name_node = node.child_by_field_name("name")
+                if name_node is None:
+                    return None
+                names.append(name_node.text.decode("utf8"))
+            elif node.type not in JAVA_CLASS_BODY_TYPES and node.type != "program":
+                return None
+            node = node.parent
+        if package != "":
+            names.append(package)
+        return ".".join(reversed(names))
+
+    def get_declaring_class_name(self, function: Function) -> Optional[str]:
+        """
+        Get the qualified name of the class declaring a method.
+        Return None for the methods of anonymous or local classes.
+        """
+        function_id = function.function_id
+        if function_id in self._declaring_classes:
+            return self._declaring_classes[function_id]
+        class_name = None
+        node = function.parse_tree_root_node.parent
+        if node is not None and node.type in JAVA_CLASS_BODY_TYPES:
+            if node.type == "enum_body_declarations":
+                node = node.parent
+            scope = self.type_index.get_file_scope(function.file_path)
+            class_name = self._get_qualified_class_name(
+                node.parent, scope.package if scope is not None else ""
+            )
+        self._declaring_classes[function_id] = class_name
+        return class_name
+
+    def _filter_callee_function_ids(
+        self,
+        current_function: Function,
+        call_site_node: tree_sitter.Node,
+        callee_ids: List[int],
+    ) -> List[int]:
+        """
+        Keep the callees declared in the subtypes or the supertypes of the receiver type.
+        Unqualified calls are resolved in the enclosing classes and the statically imported classes.
+        If the receiver type is unknown, all the callees are kept.
+        """
+        allowed_class_names = self._get_receiver_class_names(current_function, call_site_node)
+        if allowed_class_names is None:
+            return callee_ids
+        filtered_callee_ids = []
+        for callee_id in callee_ids:
+            class_name = self.get_declaring_class_name(self.function_env[callee_id])
+            if class_name is None or class_name in allowed_class_names:
+                filtered_callee_ids.append(callee_id)
+        return filtered_callee_ids
+
+    def _get_receiver_class_names(
+        self, current_function: Function, call_site_node: tree_sitter.Node
+    ) -> Optional[Set[str]]:
+        """
+        Get the names of the classes that may declare the callee of a call site.
+        :return: the class names, or None if the receiver type is unknown
+        """
+        class_name = self.get_declaring_class_name(current_function)
+        file_path = current_function.file_path
+        object_node = call_site_node.child_by_field_name("object")
+        if object_node is None:
+            if class_name is None:
+                return None
+            scope = self.type_index.get_file_scope(file_path)
+            class_names = set()
+            outer_name = class_name
+            while self.type_index.get_class(outer_name) is not None:
+                class_names |= self.__get_related_class_names(outer_name)
+                if "." not in outer_name:
+                    break
+                outer_name = outer_name.rsplit(".", 1)[0]
+            for imported_name in scope.static_imports if scope is not None else []:
+                class_names |= self.type_index.get_supertypes(imported_name)
+            return class_names
+
+        if object_node.type == "this":
+            if class_name is None:
+                return None
+            return self.__get_related_class_names(class_name)
+        if object_node.type == "super":
+            if class_name is None:
+                return None
+            return set(self.type_index.get_supertypes(class_name)) - {class_name}
+
+        type_name = None
+        if object_node.type == "object_creation_expression":
+            type_name = get_java_type_name(object_node.child_by_field_name("type"))
+        elif object_node.type == "identifier":
+            variable_name = object_node.text.decode("utf8")
+            type_name = self.__get_local_variable_type(
+                current_function, variable_name, call_site_node.start_byte
+            )
+            if type_name is None and class_name is not None:
+                field_type = self.type_index.get_field_type(class_name, variable_name)
+                if field_type is not None:
+                    return self.__get_related_class_names(field_type)
+            if type_name is None:
+                if not variable_name[:1].isupper():
+                    # A variable declared elsewhere, e.g., in a library superclass
+                    return None
+                # A static call via a class name
+                type_name = variable_name
+        elif (
+            object_node.type == "field_access"
+            and object_node.child_by_field_name("object").type == "this"
+            and class_name is not None
+        ):
+            field_name = object_node.child_by_field_name("field").text.decode("utf8")
+            field_type = self.type_index.get_field_type(class_name, field_name)
+            return None if field_type is None else self.__get_related_class_names(field_type)
+
+        # Every class is a subtype of Object, and var leaves the type to inference
+        if type_name is None or type_name in {"var", "Object", "java.lang.Object"}:
+            return None
+        if type_name in get_java_type_parameters_in_scope(current_function.parse_tree_root_node):
+            return None
+        return self.__get_related_class_names(self.type_index.resolve_type(type_name, file_path))
+
+    def __get_related_class_names(self, type_name: str) -> Set[str]:
+        """
+        The subtypes (via dynamic dispatch) and the supertypes (via inheritance) of a type.
+        """
+        return set(self.type_index.get_subtypes(type_name)) | set(
+            self.type_index.get_supertypes(type_name)
+        )
+
+    def __get_local_variable_type(
+        self, current_function: Function, variable_name: str, offset: int
+    ) -> Optional[str]:
+        """
+        Find the declared type of a parameter or a local variable declared before an offset.
+        The innermost preceding declaration wins.
+        """
+        type_name = None
+        declaration_start = -1
+        for node_type in JAVA_VARIABLE_DECLARATION_TYPES:
+            for node in current_function.find_nodes_by_type(node_type):
+                if node.start_byte >= offset or node.start_byte < declaration_start:
+                    continue
+                for name in get_java_declared_names(node):
+                    if name == variable_name:
+                        type_name = get_java_type_name(node.child_by_field_name("type"))
+                        declaration_start = node.start_byte
+        return type_name
 
     def get_callee_name_at_call_site(self, node: tree_sitter.Node, source_code: str) -> str:
         if node.type == "method_invocation":
@@ -83,12 +321,9 @@ class JavaTSAnalyzer(TSAnalyzer):
 
     def get_callsites_by_callee_name(self, current_function: Function, callee_name: str) -> List[tree_sitter.Node]:
         results = []
-        file_content = self.fileContentDic[current_function.file_path]
-        call_site_nodes = find_nodes_by_type(
-            current_function.parse_tree_root_node, "method_invocation"
-        )
+        call_site_nodes = current_function.find_nodes_by_type("method_invocation")
         for call_site in call_site_nodes:
-            if (self.get_callee_name_at_call_site(call_site, file_content) == callee_name):
+            if self.get_call_site_fact(current_function, call_site).callee_name == callee_name:
                 results.append(call_site)
         return results
 
@@ -121,7 +356,7 @@ class JavaTSAnalyzer(TSAnalyzer):
     def get_parameters_in_single_function(self, current_function: Function) -> Set[Value]:
         parameters = set()
         
-        param_list_node = find_nodes_by_type(current_function.parse_tree_root_node, "formal_parameters")
+        param_list_node = current_function.find_nodes_by_type("formal_parameters")
         if not param_list_node:
             return parameters
             
@@ -149,7 +384,7 @@ class JavaTSAnalyzer(TSAnalyzer):
     def get_return_values_in_single_function(self, current_function: Function) -> Set[Value]:
         ret_values = set()
         file_content = self.fileContentDic[current_function.file_path]
-        ret_nodes = find_nodes_by_type(current_function.parse_tree_root_node, "return_statement")
+        ret_nodes = current_function.find_nodes_by_type("return_statement")
         
         for ret_node in ret_nodes:
             line_number = ret_node.start_point[0] + 1
@@ -169,7 +404,7 @@ class JavaTSAnalyzer(TSAnalyzer):
 
     def get_if_statements(self, function: Function, source_code: str) -> Dict[Tuple, Tuple]:
         if_statements = {}
-        if_nodes = find_nodes_by_type(function.parse_tree_root_node, "if_statement")
+        if_nodes = function.find_nodes_by_type("if_statement")
         
         for if_node in if_nodes:
             start_line = if_node.start_point[0] + 1
@@ -203,12 +438,18 @@ class JavaTSAnalyzer(TSAnalyzer):
             )
         return if_statements
 
+    def build_control_flow_graph(self, function: Function) -> Optional[ControlFlowGraph]:
+        body_node = function.parse_tree_root_node.child_by_field_name("body")
+        if body_node is None:
+            return None
+        return JavaCFGBuilder().build(body_node)
+
     def get_loop_statements(self, function: Function, source_code: str) -> Dict[Tuple, Tuple]:
         loop_statements = {}
         loop_types = ["for_statement", "while_statement", "do_statement", "enhanced_for_statement"]
         
         for loop_type in loop_types:
-            loop_nodes = find_nodes_by_type(function.parse_tree_root_node, loop_type)
+            loop_nodes = function.find_nodes_by_type(loop_type)
             for loop_node in loop_nodes:
                 start_line = loop_node.start_point[0] + 1
                 end_line = loop_node.end_point[0] + 1
@@ -224,3 +465,491 @@ class JavaTSAnalyzer(TSAnalyzer):
                     body_end_line
                 )
         return loop_statements
+
+    def get_def_use_records(self, function: Function) -> List[DefUseRecord]:
+        records = []
+        # The identifiers that are defined rather than used
+        defined_ranges = set()
+
+        for node_type in ("formal_parameter", "spread_parameter"):
+            for node in function.find_nodes_by_type(node_type):
+                for name in get_java_declared_names(node):
+                    records.append(
+                        DefUseRecord("parameter", name, node.start_point[0] + 1, node.text.decode("utf8"), ())
+                    )
+                defined_ranges.update(get_java_declared_name_ranges(node))
+
+        for node in function.find_nodes_by_type("local_variable_declaration"):
+            type_text = node.child_by_field_name("type").text.decode("utf8")
+            for declarator in node.children_by_field_name("declarator"):
+                name_node = declarator.child_by_field_name("name")
+                value_node = declarator.child_by_field_name("value")
+                records.append(
+                    DefUseRecord(
+                        "declaration",
+                        name_node.text.decode("utf8"),
+                        declarator.start_point[0] + 1,
+                        f"{type_text} {declarator.text.decode('utf8')}",
+                        get_java_used_names(value_node),
+                    )
+                )
+                defined_ranges.add((name_node.start_byte, name_node.end_byte))
+
+        for node_type in ("enhanced_for_statement", "resource"):
+            for node in function.find_nodes_by_type(node_type):
+                type_node = node.child_by_field_name("type")
+                name_node = node.child_by_field_name("name")
+                value_node = node.child_by_field_name("value")
+                if type_node is None or name_node is None or value_node is None:
+                    continue
+                separator = " : " if node_type == "enhanced_for_statement" else " = "
+                records.append(
+                    DefUseRecord(
+                        "declaration",
+                        name_node.text.decode("utf8"),
+                        name_node.start_point[0] + 1,
+                        type_node.text.decode("utf8") + " " + name_node.text.decode("utf8")
+                        + separator + value_node.text.decode("utf8"),
+                        get_java_used_names(value_node),
+                    )
+                )
+                defined_ranges.add((name_node.start_byte, name_node.end_byte))
+
+        for node in function.find_nodes_by_type("assignment_expression"):
+            left_node = node.child_by_field_name("left")
+            used_names = get_java_used_names(node.child_by_field_name("right"))
+            # A compound assignment, e.g., x += y, also reads the variable
+            if node.child_by_field_name("operator").type != "=":
+                used_names = (left_node.text.decode("utf8"),) + used_names
+            elif left_node.type == "identifier":
+                defined_ranges.add((left_node.start_byte, left_node.end_byte))
+            records.append(
+                DefUseRecord(
+                    "assignment",
+                    left_node.text.decode("utf8"),
+                    node.start_point[0] + 1,
+                    node.text.decode("utf8"),
+                    used_names,
+                )
+            )
+
+        for node in function.find_nodes_by_type("update_expression"):
+            operand_node = node.named_children[0]
+            name = operand_node.text.decode("utf8")
+            records.append(
+                DefUseRecord("assignment", name, node.start_point[0] + 1, node.text.decode("utf8"), (name,))
+            )
+
+        for node in function.find_nodes_by_type("identifier"):
+            if (node.start_byte, node.end_byte) in defined_ranges or not is_java_variable_use(node):
+                continue
+            records.append(
+                DefUseRecord("use", node.text.decode("utf8"), node.start_point[0] + 1, node.text.decode("utf8"), ())
+            )
+        return records
+
+
+
+JAVA_CLASS_DECLARATION_TYPES = {
+    "class_declaration",
+    "interface_declaration",
+    "enum_declaration",
+    "record_declaration",
+}
+JAVA_CLASS_BODY_TYPES = {"class_body", "interface_body", "enum_body", "enum_body_declarations"}
+JAVA_VARIABLE_DECLARATION_TYPES = [
+    "formal_parameter",
+    "spread_parameter",
+    "local_variable_declaration",
+    "enhanced_for_statement",
+    "resource",
+    "catch_formal_parameter",
+]
+
+
+def get_java_type_name(type_node: Optional[tree_sitter.Node]) -> Optional[str]:
+    """
+    Get the name of a declared type without its type arguments, e.g., List for List<String>.
+    Return None for primitive types.
+    """
+    if type_node is None:
+        return None
+    if type_node.type == "generic_type":
+        type_node = type_node.named_children[0]
+    if type_node.type in {"type_identifier", "scoped_type_identifier", "array_type"}:
+        return type_node.text.decode("utf8")
+    return None
+
+
+def get_java_type_names(node: tree_sitter.Node) -> List[str]:
+    """
+    Get the names of the types listed in a superclass, super_interfaces or extends_interfaces node.
+    """
+    type_names = []
+    for child in node.named_children:
+        if child.type == "type_list":
+            type_names.extend(get_java_type_names(child))
+        else:
+            type_name = get_java_type_name(child)
+            if type_name is not None:
+                type_names.append(type_name)
+    return type_names
+
+
+def get_java_type_parameters(node: tree_sitter.Node) -> List[str]:
+    """
+    Get the names of the type parameters of a class or method declaration.
+    """
+    type_parameters_node = node.child_by_field_name("type_parameters")
+    if type_parameters_node is None:
+        return []
+    names = []
+    for type_parameter in type_parameters_node.named_children:
+        for child in type_parameter.named_children:
+            if child.type in {"identifier", "type_identifier"}:
+                names.append(child.text.decode("utf8"))
+                break
+    return names
+
+
+def get_java_type_parameters_in_scope(node: tree_sitter.Node) -> Set[str]:
+    """
+    Get the names of the type parameters of a declaration and its enclosing declarations.
+    """
+    names = set()
+    while node is not None:
+        if node.type in JAVA_CLASS_DECLARATION_TYPES or node.type == "method_declaration":
+            names.update(get_java_type_parameters(node))
+        node = node.parent
+    return names
+
+
+def get_java_declared_names(node: tree_sitter.Node) -> List[str]:
+    """
+    Get the names of the variables declared by a parameter or local declaration node.
+    """
+    name_node = node.child_by_field_name("name")
+    if name_node is not None:
+        return [name_node.text.decode("utf8")]
+    names = []
+    for child in node.named_children:
+        if child.type == "variable_declarator":
+            child_name_node = child.child_by_field_name("name")
+            if child_name_node is not None:
+                names.append(child_name_node.text.decode("utf8"))
+    return names
+
+
+def get_java_declared_name_ranges(node: tree_sitter.Node) -> List[Tuple[int, int]]:
+    """
+    Get the byte ranges of the names declared by a parameter or local declaration node.
+    """
+    name_node = node.child_by_field_name("name")
+    if name_node is not None:
+        return [(name_node.start_byte, name_node.end_byte)]
+    ranges = []
+    for child in node.named_children:
+        if child.type == "variable_declarator":
+            child_name_node = child.child_by_field_name("name")
+            if child_name_node is not None:
+                ranges.append((child_name_node.start_byte, child_name_node.end_byte))
+    return ranges
+
+
+def is_java_variable_use(node: tree_sitter.Node) -> bool:
+    """
+    Check if an identifier refers to a variable rather than a method, a field name, a label, or a declaration.
+    """
+    parent = node.parent
+    if parent is None:
+        return False
+    if parent.type in {
+        "method_declaration",
+        "constructor_declaration",
+        "labeled_statement",
+        "break_statement",
+        "continue_statement",
+        "catch_formal_parameter",
+        "lambda_expression",
+        "inferred_parameters",
+    } | JAVA_CLASS_DECLARATION_TYPES:
+        return False
+    for field_name in ("name", "field"):
+        field_node = parent.child_by_field_name(field_name)
+        if (
+            field_node is not None
+            and field_node.start_byte == node.start_byte
+            and field_node.end_byte == node.end_byte
+            and parent.type in {"method_invocation", "field_access", "variable_declarator"}
+        ):
+            return False
+    return True
+
+
+def get_java_used_names(node: Optional[tree_sitter.Node]) -> Tuple[str, ...]:
+    """
+    Get the variables read by an expression, in the order of their occurrences.
+    """
+    if node is None:
+        return ()
+    names = []
+    identifier_nodes = [node] if node.type == "identifier" else find_nodes_by_type(node, "identifier")
+    for identifier_node in identifier_nodes:
+        name = identifier_node.text.decode("utf8")
+        if is_java_variable_use(identifier_node) and name not in names:
+            names.append(name)
+    return tuple(names)
+
+
+JAVA_LOOP_STATEMENT_TYPES = {
+    "for_statement",
+    "enhanced_for_statement",
+    "while_statement",
+    "do_statement",
+}
+JAVA_NON_STATEMENT_TYPES = {
+    "line_comment",
+    "block_comment",
+    "switch_label",
+    "class_declaration",
+    "interface_declaration",
+    "enum_declaration",
+    "record_declaration",
+}
+
+
+class JavaCFGBuilder:
+    """
+    Build the control flow graph of a Java method from its parse tree.
+    Conditions and headers are placed in the blocks where they are evaluated.
+    Every block of a try body may throw into each of its catch clauses and its finally clause.
+    Returns inside a try statement skip its finally clause, and the short-circuit
+    operators and the conditional expressions do not split blocks.
+    """
+
+    def __init__(self) -> None:
+        self.cfg = ControlFlowGraph()
+        # (label, target block, whether unlabeled jumps target it) of the enclosing statements
+        self.break_targets: List[Tuple[Optional[str], int, bool]] = []
+        self.continue_targets: List[Tuple[Optional[str], int, bool]] = []
+        self.yield_targets: List[int] = []
+        self.handlers: List[List[int]] = []  # entry blocks of the enclosing catch/finally clauses
+        self.pending_label: Optional[str] = None
+
+    def build(self, body_node: tree_sitter.Node) -> ControlFlowGraph:
+        block_id = self.cfg.add_block()
+        self.cfg.add_edge(ControlFlowGraph.ENTRY, block_id)
+        end_block_id = self.visit(body_node, block_id)
+        if end_block_id is not None:
+            self.cfg.add_edge(end_block_id, ControlFlowGraph.EXIT)
+        return self.cfg
+
+    def visit(self, node: tree_sitter.Node, block_id: Optional[int]) -> Optional[int]:
+        """
+        Add the statement to the graph.
+        :param node: the statement node
+        :param block_id: the block where the statement starts, None if it is unreachable
+        :return: the block where the control continues after the statement, None if it does not fall through
+        """
+        if node.type in JAVA_NON_STATEMENT_TYPES or not node.is_named:
+            return block_id
+        if block_id is None:
+            block_id = self.cfg.add_block()
+        label, self.pending_label = self.pending_label, None
+
+        if node.type in {"block", "constructor_body", "switch_block_statement_group"}:
+            for child in node.named_children:
+                block_id = self.visit(child, block_id)
+            return block_id
+        if node.type == "labeled_statement":
+            statement_node = node.named_children[-1]
+            if statement_node.type in JAVA_LOOP_STATEMENT_TYPES:
+                self.pending_label = node.named_children[0].text.decode("utf8")
+                return self.visit(statement_node, block_id)
+            after_block_id = self.cfg.add_block()
+            self.break_targets.append((node.named_children[0].text.decode("utf8"), after_block_id, False))
+            end_block_id = self.visit(statement_node, block_id)
+            self.break_targets.pop()
+            self.__link(end_block_id, after_block_id)
+            return after_block_id
+        if node.type == "if_statement":
+            return self.__visit_if(node, block_id)
+        if node.type in JAVA_LOOP_STATEMENT_TYPES:
+            return self.__visit_loop(node, block_id, label)
+        if node.type == "switch_expression":
+            return self.__visit_switch(node, block_id)
+        if node.type in {"try_statement", "try_with_resources_statement"}:
+            return self.__visit_try(node, block_id)
+        if node.type == "synchronized_statement":
+            self.__add_statement(block_id, node.named_children[0])
+            return self.visit(node.named_children[-1], block_id)
+
+        self.__add_statement(block_id, node)
+        if node.type == "return_statement":
+            self.cfg.add_edge(block_id, ControlFlowGraph.EXIT)
+            return None
+        if node.type == "throw_statement":
+            self.__link_to_handlers(block_id)
+            return None
+        if node.type in {"break_statement", "continue_statement"}:
+            targets = self.break_targets if node.type == "break_statement" else self.continue_targets
+            target_label = node.named_children[0].text.decode("utf8") if node.named_child_count > 0 else None
+            for candidate_label, target_block_id, is_default_target in reversed(targets):
+                if candidate_label == target_label or (target_label is None and is_default_target):
+                    self.cfg.add_edge(block_id, target_block_id)
+                    break
+            return None
+        if node.type == "yield_statement":
+            if len(self.yield_targets) > 0:
+                self.cfg.add_edge(block_id, self.yield_targets[-1])
+            return None
+        return block_id
+
+    def __visit_if(self, node: tree_sitter.Node, block_id: int) -> Optional[int]:
+        self.__add_statement(block_id, node.child_by_field_name("condition"))
+        after_block_id = self.cfg.add_block()
+        for branch_node in (node.child_by_field_name("consequence"), node.child_by_field_name("alternative")):
+            if branch_node is None:
+                self.cfg.add_edge(block_id, after_block_id)
+                continue
+            branch_block_id = self.cfg.add_block()
+            self.cfg.add_edge(block_id, branch_block_id)
+            self.__link(self.visit(branch_node, branch_block_id), after_block_id)
+        return after_block_id if len(self.cfg.predecessors[after_block_id]) > 0 else None
+
+    def __visit_loop(self, node: tree_sitter.Node, block_id: int, label: Optional[str]) -> Optional[int]:
+        condition_node = node.child_by_field_name("condition")
+        header_block_id = self.cfg.add_block()
+        body_block_id = self.cfg.add_block()
+        after_block_id = self.cfg.add_block()
+        continue_block_id = header_block_id
+        if node.type == "do_statement":
+            self.cfg.add_edge(block_id, body_block_id)
+        else:
+            self.cfg.add_edge(block_id, header_block_id)
+            self.cfg.add_edge(header_block_id, body_block_id)
+        if node.type == "for_statement":
+            for init_node in node.children_by_field_name("init"):
+                self.__add_statement(block_id, init_node)
+            update_nodes = node.children_by_field_name("update")
+            if len(update_nodes) > 0:
+                continue_block_id = self.cfg.add_block()
+                for update_node in update_nodes:
+                    self.__add_statement(continue_block_id, update_node)
+                self.cfg.add_edge(continue_block_id, header_block_id)
+        elif node.type == "enhanced_for_statement":
+            self.cfg.add_statement(header_block_id, node.start_point[0] + 1, node.start_point[0] + 1)
+        if condition_node is not None:
+            self.__add_statement(header_block_id, condition_node)
+        # A loop without a condition or with a true condition exits only via break
+        if node.type == "enhanced_for_statement" or (
+            condition_node is not None and condition_node.text.decode("utf8").strip("() \t\n") != "true"
+        ):
+            self.cfg.add_edge(header_block_id, after_block_id)
+        if node.type == "do_statement":
+            self.cfg.add_edge(header_block_id, body_block_id)
+
+        self.break_targets.append((label, after_block_id, True))
+        self.continue_targets.append((label, continue_block_id, True))
+        end_block_id = self.visit(node.child_by_field_name("body"), body_block_id)
+        self.continue_targets.pop()
+        self.break_targets.pop()
+        self.__link(end_block_id, continue_block_id)
+        return after_block_id if len(self.cfg.predecessors[after_block_id]) > 0 else None
+
+    def __visit_switch(self, node: tree_sitter.Node, block_id: int) -> Optional[int]:
+        self.__add_statement(block_id, node.child_by_field_name("condition"))
+        after_block_id = self.cfg.add_block()
+        self.break_targets.append((None, after_block_id, True))
+        self.yield_targets.append(after_block_id)
+        has_default = False
+        end_block_id = None
+        for case_node in node.child_by_field_name("body").named_children:
+            if case_node.type not in {"switch_block_statement_group", "switch_rule"}:
+                continue
+            for label_node in case_node.named_children:
+                if label_node.type == "switch_label" and label_node.text.decode("utf8").startswith("default"):
+                    has_default = True
+            case_block_id = self.cfg.add_block()
+            self.cfg.add_edge(block_id, case_block_id)
+            if case_node.type == "switch_block_statement_group":
+                # The statements of the previous group fall through
+                self.__link(end_block_id, case_block_id)
+                end_block_id = self.visit(case_node, case_block_id)
+            else:
+                for child in case_node.named_children:
+                    case_block_id = self.visit(child, case_block_id)
+                self.__link(case_block_id, after_block_id)
+        self.yield_targets.pop()
+        self.break_targets.pop()
+        self.__link(end_block_id, after_block_id)
+        if not has_default:
+            self.cfg.add_edge(block_id, after_block_id)
+        return after_block_id if len(self.cfg.predecessors[after_block_id]) > 0 else None
+
+    def __visit_try(self, node: tree_sitter.Node, block_id: int) -> Optional[int]:
+        resources_node = node.child_by_field_name("resources")
+        if resources_node is not None:
+            self.__add_statement(block_id, resources_node)
+        catch_nodes = [child for child in node.named_children if child.type == "catch_clause"]
+        finally_nodes = [child for child in node.named_children if child.type == "finally_clause"]
+        handler_block_ids = [self.cfg.add_block() for _ in catch_nodes]
+        finally_block_id = self.cfg.add_block() if finally_nodes else None
+
+        body_block_id = self.cfg.add_block()
+        self.cfg.add_edge(block_id, body_block_id)
+        first_block_id = body_block_id
+        self.handlers.append(handler_block_ids + ([finally_block_id] if finally_block_id is not None else []))
+        end_block_id = self.visit(node.child_by_field_name("body"), body_block_id)
+        body_handler_block_ids = self.handlers.pop()
+        # Any block of the try body may throw
+        for thrown_block_id in range(first_block_id, len(self.cfg)):
+            if thrown_block_id not in body_handler_block_ids:
+                for handler_block_id in body_handler_block_ids:
+                    self.cfg.add_edge(thrown_block_id, handler_block_id)
+
+        end_block_ids = [end_block_id]
+        if finally_block_id is not None:
+            self.handlers.append([finally_block_id])
+        for catch_node, handler_block_id in zip(catch_nodes, handler_block_ids):
+            catch_first_block_id = len(self.cfg)
+            parameter_nodes = [child for child in catch_node.named_children if child.type == "catch_formal_parameter"]
+            if len(parameter_nodes) > 0:
+                self.__add_statement(handler_block_id, parameter_nodes[0])
+            end_block_ids.append(self.visit(catch_node.child_by_field_name("body"), handler_block_id))
+            if finally_block_id is not None:
+                for thrown_block_id in [handler_block_id] + list(range(catch_first_block_id, len(self.cfg))):
+                    self.cfg.add_edge(thrown_block_id, finally_block_id)
+        if finally_block_id is not None:
+            self.handlers.pop()
+
+        if finally_block_id is None:
+            after_block_id = self.cfg.add_block()
+            for end_block_id in end_block_ids:
+                self.__link(end_block_id, after_block_id)
+            return after_block_id if len(self.cfg.predecessors[after_block_id]) > 0 else None
+        for end_block_id in end_block_ids:
+            self.__link(end_block_id, finally_block_id)
+        finally_end_block_id = self.visit(finally_nodes[0].named_children[-1], finally_block_id)
+        if finally_end_block_id is None:
+            return None
+        # The finally clause also rethrows the exceptions that are not caught
+        after_block_id = self.cfg.add_block()
+        self.cfg.add_edge(finally_end_block_id, after_block_id)
+        self.__link_to_handlers(finally_end_block_id)
+        return after_block_id
+
+    def __add_statement(self, block_id: int, node: Optional[tree_sitter.Node]) -> None:
+        if node is not None:
+            self.cfg.add_statement(block_id, node.start_point[0] + 1, node.end_point[0] + 1)
+
+    def __link(self, src_block_id: Optional[int], dst_block_id: int) -> None:
+        if src_block_id is not None:
+            self.cfg.add_edge(src_block_id, dst_block_id)
+
+    def __link_to_handlers(self, block_id: int) -> None:
+        if len(self.handlers) > 0 and len(self.handlers[-1]) > 0:
+            for handler_block_id in self.handlers[-1]:
+                self.cfg.add_edge(block_id, handler_block_id)
+        else:
+            self.cfg.add_edge(block_id, ControlFlowGraph.EXIT)
@@ -2,124 +2,43 @@ import sys
 from os import path
 from pathlib import Path
 import copy
+import heapq
 import concurrent.futures
-from typing import List, Tuple, Dict, Set, Optional
+from typing import List, Tuple, Dict, Set, Optional, FrozenSet, Iterable, Iterator, NamedTuple
 from abc import ABC, abstractmethod
 import threading
+from collections import deque
 from enum import Enum
 
 import tree_sitter
 from tree_sitter import Language, Parser
 from tqdm import tqdm
-import networkx as nx
 
 sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
 
 from src.memory.syntactic.function import *
 from src.memory.syntactic.api import *
 from src.memory.syntactic.value import *
+from src.tstool.analyzer.ts_cache import *
+from src.tstool.analyzer.ts_store import *
+from src.tstool.analyzer.ts_index import *
+from src.tstool.analyzer.ts_call_graph import *
+from src.tstool.analyzer.ts_context import *
+from src.tstool.analyzer.ts_type_index import *
+from src.tstool.analyzer.ts_cfg import *
+from src.tstool.analyzer.ts_def_use import *
 
 
-class Parenthesis(Enum):
-    LEFT_PAR = -1
-    RIGHT_PAR = 1
-
-    def __str__(self) -> str:
-        return self.name
-
-
-class ContextLabel:
-    def __init__(
-        self,
-        file_name: str,
-        line_number: int,
-        function_id: int,
-        parenthesis: Parenthesis,
-    ):
-        self.file_name = file_name
-        self.line_number = line_number
-        self.function_id = function_id
-        self.parenthesis = parenthesis
-
-    def __str__(self) -> str:
-        return f"({self.file_name} {self.line_number} {self.function_id} {self.parenthesis})"
-
-
-class CallContext:
-    def __init__(self, is_backward: bool = True):
-        self.context: List[ContextLabel] = []
-        self.simplified_context: List[ContextLabel] = []
-        self.is_backward = is_backward
-
-    def add_and_check_context(self, label: ContextLabel) -> bool:
-        """
-        Add a context entry to the context
-        :param label: the context label
-        :ret True if the context after adding the new context label is in the CFL reachable, False otherwise
-        """
-        is_CFL_reachable = True
-
-        # Handle empty context case
-        if len(self.simplified_context) == 0:
-            self.simplified_context.append(label)
-            self.context.append(label)
-            return is_CFL_reachable
-
-        # Get the top element from the context stack
-        top_label = self.get_top_unmatched_context_label()
-
-        # Determine which labels to match based on analysis direction
-        first_label = (
-            Parenthesis.LEFT_PAR if not self.is_backward else Parenthesis.RIGHT_PAR
-        )
-        second_label = (
-            Parenthesis.RIGHT_PAR if not self.is_backward else Parenthesis.LEFT_PAR
-        )
-
-        # Check the label combinations
-        if top_label.parenthesis == label.parenthesis:
-            self.simplified_context.append(label)
-        elif top_label == first_label and label == second_label:
-            if (
-                top_label.file_name == label.file_name
-                and top_label.line_number == label.line_number
-                and top_label.function_id == label.function_id
-            ):
-                self.simplified_context.pop()
-            else:
-                is_CFL_reachable = False
-        else:
-            # Other combinations
-            self.simplified_context.append(label)
-
-        # Only update context if CFL reachable
-        if is_CFL_reachable:
-            self.context.append(label)
-        return is_CFL_reachable
-
-    def get_top_unmatched_context_label(self) -> ContextLabel:
-        """
-        Get the top unmatched context label.
-        :return: The top unmatched context label.
-        """
-        if len(self.simplified_context) == 0:
-            return None
-        return self.simplified_context[-1]
-
-    def __str__(self) -> str:
-        """
-        Convert the context to a string representation.
-        """
-        return f"{self.is_backward}" + " -> ".join(
-            [str(label) for label in self.context]
-        )
-
-    def __eq__(self, other: "CallContext") -> bool:
-        return self.__str__() == other.__str__()
+class CallSiteFact(NamedTuple):
+    """
+    The facts of a call site, which are computed once during call graph construction.
+    """
 
-    def __hash__(self) -> int:
-        # Convert context list to tuple for hashing; assumes that context entries are immutable
-        return hash(self.__str__())
+    callee_name: str
+    arguments: FrozenSet[Value]
+    callee_ids: Tuple[int, ...]  # the resolved user-defined functions
+    api_ids: Tuple[int, ...]  # the library API if no user-defined function is resolved
+    line_number: int
 
 
 class TSAnalyzer(ABC):
@@ -132,48 +51,104 @@ class TSAnalyzer(ABC):
         code_in_files: Dict[str, str],
         language_name: str,
         max_symbolic_workers_num=10,
+        cache_dir: Optional[str] = None,
+        symbolic_backend: str = "thread",
+        max_tree_memory: Optional[int] = None,
     ) -> None:
         """
         Initialize TSAnalyzer with the project source code and language.
         :param code_in_files: A dictionary mapping file paths to source file contents.
+            A SourceFileStore can be passed to read the files lazily.
         :param language: The programming language of the source code.
+        :param cache_dir: The directory of the on-disk parsing cache. No cache is used if None.
+        :param symbolic_backend: "thread" or "process". The process backend parses files in worker processes.
+        :param max_tree_memory: The estimated memory cap (in bytes) of the resident parse trees.
+            Evicted trees are re-parsed on demand. No limit if None.
+        """
+        self._init_analysis_state(
+            code_in_files,
+            language_name,
+            max_symbolic_workers_num,
+            cache_dir,
+            symbolic_backend,
+            max_tree_memory,
+        )
+
+        # Analyze stage I: Project AST parsing
+        self.parse_project()
+
+        # Analyze stage II: Call graph analysis
+        self.analyze_call_graph()
+
+        # Persist the summaries of the files missing in the cache
+        self.save_cache()
+        return
+
+    def _init_analysis_state(
+        self,
+        code_in_files: Dict[str, str],
+        language_name: str,
+        max_symbolic_workers_num=10,
+        cache_dir: Optional[str] = None,
+        symbolic_backend: str = "thread",
+        max_tree_memory: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize the parser and the empty analysis results without analyzing any file.
         """
+        if symbolic_backend not in {"thread", "process"}:
+            raise ValueError("Invalid symbolic backend setting")
         self.code_in_files = code_in_files
-        cwd = Path(__file__).resolve().parent.absolute()
-        TSPATH = cwd / "../../../lib/build/"
-        language_path = TSPATH / "my-languages.so"
         self.max_symbolic_workers_num = max_symbolic_workers_num
+        self.symbolic_backend = symbolic_backend
         self._lock = threading.Lock()
+        self._call_graph_lock = threading.Lock()
 
         # Initialize tree-sitter parser
-        self.parser = tree_sitter.Parser()
         self.language_name = language_name
-        if language_name == "C":
-            self.language = Language(str(language_path), "c")
-        elif language_name == "Cpp":
-            self.language = Language(str(language_path), "cpp")
-        elif language_name == "Java":
-            self.language = Language(str(language_path), "java")
-        elif language_name == "Python":
-            self.language = Language(str(language_path), "python")
-        elif language_name == "Go":
-            self.language = Language(str(language_path), "go")
-        else:
-            raise ValueError("Invalid language setting")
-        self.parser.set_language(self.language)
-        
-        # Add a dictionary to store parsed trees
-        self.parse_trees: Dict[str, tree_sitter.Tree] = {}
+        self.language = load_language(language_name)
+        # The parser of the constructing thread. Use get_parser() in other threads.
+        self.parser = load_parser(language_name)
+
+        # Add a dictionary to store parsed trees.
+        # Trees beyond the memory cap are evicted and re-parsed on demand.
+        self.parse_trees: ParseTreeCache = ParseTreeCache(
+            max_tree_memory, self._reparse_file, self._release_file_nodes
+        )
 
         # Results of parsing
         self.functionRawDataDic = {}
         self.functionNameToId = {}
         self.functionToFile = {}
-        self.fileContentDic = {}
+        self.fileContentDic = code_in_files  # an alias, so that contents are not kept twice
         self.glb_var_map = {}  # global var info
+        self._file_function_ids: Dict[str, Set[int]] = {}  # file path --> function ids
+        # file path --> function id --> Function, tracked from the creation of each Function
+        # (before it enters function_env), so that the eviction of a tree releases all its nodes
+        self._file_functions: Dict[str, Dict[int, Function]] = {}
+        self._function_node_ranges: Dict[int, NodeRange] = {}  # function id --> node range
+        self._line_indexes: Dict[str, LineIndex] = {}  # file path --> newline offsets
+        self._function_indexes: Dict[str, IntervalIndex[int]] = {}  # file path --> function line ranges
+        self.type_index = TypeIndex()  # class hierarchy and import scopes
+        self._declaring_classes: Dict[int, Optional[str]] = {}  # function id --> class name
 
         self.function_env: dict[int, Function] = {}
-        self.api_env: dict[int, API] = {}
+        self.api_registry = APIRegistry()
+        self.api_env: dict[int, API] = self.api_registry.api_env
+
+        # Call site facts of each function: function id --> [(start_byte, end_byte, callee name, arguments)]
+        self.call_site_summaries: Dict[int, List[Tuple[int, int, str, Set[Value]]]] = {}
+
+        # On-disk cache of file summaries
+        self.cache = (
+            TSAnalysisCache(cache_dir, language_name, type(self).__name__, TS_LANGUAGE_PATH)
+            if cache_dir is not None
+            else None
+        )
+        # Summaries loaded from the cache or computed by worker processes
+        self._file_summaries: Dict[str, Dict] = {}  # file path --> summary
+        self._function_summaries: Dict[int, Dict] = {}  # function id --> summary
+        self._next_function_id = 0
 
         # Results of call graph analysis
         ## Caller-callee relationship between user-defined functions
@@ -184,23 +159,156 @@ class TSAnalyzer(ABC):
         self.function_caller_api_callee_map = {}
         self.api_callee_function_caller_map = {}
 
-        # Analyze stage I: Project AST parsing
-        self.parse_project()
+        ## Facts of the call sites in each function:
+        ## function id --> (start byte, end byte) of the call site node --> facts.
+        ## Byte ranges are used as the keys since node ids change once an evicted tree is reparsed.
+        self.call_site_facts: Dict[int, Dict[Tuple[int, int], CallSiteFact]] = {}
 
-        # Analyze stage II: Call graph analysis
-        self.analyze_call_graph()
+        ## Numbers of the name-matched and the resolved callees at the call sites of each function
+        self._call_edge_counts: Dict[int, Tuple[int, int]] = {}
+
+        ## Memoized transitive queries, which are rebuilt after the call graph changes
+        self._callee_query: Optional[CallGraphQuery] = None
+        self._caller_query: Optional[CallGraphQuery] = None
+        ## CSR adjacencies for bulk queries, keyed by is_backward
+        self._csr_call_graphs: Dict[bool, "CSRCallGraph"] = {}
+        return
+
+    def get_parser(self) -> tree_sitter.Parser:
+        """
+        Get the parser owned by the current thread, which is shared by all analyzers and extractors.
+        """
+        return load_parser(self.language_name)
+
+    def get_query(self, query_text: str) -> tree_sitter.Query:
+        """
+        Get the compiled query of the analyzed language, which is shared by all analyzers and extractors.
+        """
+        return load_query(self.language_name, query_text)
+
+    def _reparse_file(self, file_path: str) -> tree_sitter.Tree:
+        """
+        Re-parse a file whose tree has been evicted.
+        """
+        return self.get_parser().parse(bytes(self.code_in_files[file_path], "utf8"))
+
+    def _load_node(
+        self, file_path: str, start_byte: int, end_byte: int, node_type: str
+    ) -> tree_sitter.Node:
+        """
+        Locate a node in the tree of a file, re-parsing the file if needed.
+        """
+        return locate_node(
+            self.parse_trees[file_path].root_node, start_byte, end_byte, node_type
+        )
+
+    def _release_file_nodes(self, file_path: str) -> None:
+        """
+        Drop the nodes pinning the evicted tree of a file.
+        The raw data of the functions keeps None in place of the function node afterwards.
+        """
+        with self._lock:
+            functions = list(self._file_functions.get(file_path, {}).values())
+        for function in functions:
+            function.release_parse_tree()
+        for function_id in list(self._file_function_ids.get(file_path, [])):
+            raw_data = self.functionRawDataDic.get(function_id, None)
+            if raw_data is not None and raw_data[3] is not None:
+                self.functionRawDataDic[function_id] = raw_data[:3] + (None,)
         return
 
-    def _parse_single_file(self, file_path: str, source_code: str) -> Tuple[str, str]:
+    def _track_function(self, function: Function) -> None:
+        """
+        Track a newly created function, so that its nodes are released once the tree of its file is evicted.
+        """
+        with self._lock:
+            self._file_functions.setdefault(function.file_path, {})[function.function_id] = function
+        self._release_if_evicted(function)
+        return
+
+    def _release_if_evicted(self, function: Function) -> None:
+        """
+        Release the nodes just stored in a function if the tree of its file has been evicted meanwhile,
+        e.g., when the analysis of the function has re-parsed other files.
+        """
+        if self.parse_trees.peek(function.file_path) is None:
+            function.release_parse_tree()
+        return
+
+    def get_function_node(self, function_id: int) -> tree_sitter.Node:
+        """
+        Get the node of a registered function, re-locating it if it has been released.
+        """
+        function_node = self.functionRawDataDic[function_id][3]
+        if function_node is not None:
+            return function_node
+        return self._load_node(
+            self.functionToFile[function_id], *self._function_node_ranges[function_id]
+        )
+
+    def get_function_ids_in_file(self, file_path: str) -> List[int]:
+        """
+        Get the ids of the functions registered in a file.
+        """
+        return sorted(self._file_function_ids.get(file_path, []))
+
+    def _register_function(
+        self,
+        function_name: str,
+        start_line_number: int,
+        end_line_number: int,
+        function_node: Optional[tree_sitter.Node],
+        file_path: str,
+        node_range: Optional[NodeRange] = None,
+    ) -> int:
+        """
+        Register the raw data of a function found in a file.
+        :param function_node: the function node, or None if the tree of the file has not been parsed
+        :param node_range: the range of the function node, only needed if function_node is None
+        :return: The id of the function.
+        """
+        with self._lock:
+            function_id = self._next_function_id
+            self._next_function_id += 1
+            self.functionRawDataDic[function_id] = (
+                function_name,
+                start_line_number,
+                end_line_number,
+                function_node,
+            )
+            if function_name not in self.functionNameToId:
+                self.functionNameToId[function_name] = []
+            self.functionNameToId[function_name].append(function_id)
+            self.functionToFile[function_id] = file_path
+            if file_path not in self._file_function_ids:
+                self._file_function_ids[file_path] = set([])
+            self._file_function_ids[file_path].add(function_id)
+            self._function_indexes.pop(file_path, None)
+            self._function_node_ranges[function_id] = (
+                (function_node.start_byte, function_node.end_byte, function_node.type)
+                if function_node is not None
+                else node_range
+            )
+        return function_id
+
+    def _parse_single_file(
+        self,
+        file_path: str,
+        source_code: str,
+        old_tree: Optional[tree_sitter.Tree] = None,
+    ) -> Tuple[str, str]:
         """
         Helper function to parse a single file.
+        If the old tree is provided, it should have been edited and is reused for reparsing.
         """
         try:
-            tree = self.parser.parse(bytes(source_code, "utf8"))
+            if old_tree is None:
+                tree = self.get_parser().parse(bytes(source_code, "utf8"))
+            else:
+                tree = self.get_parser().parse(bytes(source_code, "utf8"), old_tree)
             # Store the parsed tree
             self.parse_trees[file_path] = tree
         except Exception as e:
-            print(self.parser)
             print(f"Error parsing {file_path}: {e}")
             exit(0)
         # Call user-defined processing.
@@ -215,6 +323,7 @@ class TSAnalyzer(ABC):
         Helper function to analyze a single function.
         """
         (name, start_line_number, end_line_number, function_node) = raw_data
+        function_node = self.get_function_node(function_id)
         file_name = self.functionToFile[function_id]
         file_content = self.fileContentDic[file_name]
         function_code = file_content[function_node.start_byte : function_node.end_byte]
@@ -226,41 +335,147 @@ class TSAnalyzer(ABC):
             end_line_number,
             function_node,
             file_name,
+            node_loader=self._load_node,
         )
+        self._track_function(current_function)
         current_function = self.extract_meta_data_in_single_function(current_function)
+        self._release_if_evicted(current_function)
+        return function_id, current_function
+
+    def _load_file_summary(
+        self, file_path: str, source_code: str, summary: Dict
+    ) -> Tuple[str, str]:
+        """
+        Helper function to load a single file from its summary.
+        The file is not parsed: the functions are registered with their node ranges,
+        and the tree is parsed by the tree cache once a node is first accessed.
+        """
+        self.parse_trees.register(file_path)
+        for function_summary in summary["functions"]:
+            function_id = self._register_function(
+                function_summary["name"],
+                function_summary["start_line"],
+                function_summary["end_line"],
+                None,
+                file_path,
+                (
+                    function_summary["start_byte"],
+                    function_summary["end_byte"],
+                    function_summary["node_type"],
+                ),
+            )
+            with self._lock:
+                self._function_summaries[function_id] = function_summary
+        self.load_global_info(file_path, source_code, summary["global_info"])
+        return file_path, source_code
+
+    def _load_function_summary(
+        self, function_id: int, raw_data: Tuple
+    ) -> Tuple[int, "Function"]:
+        """
+        Helper function to restore a single function from its summary without parsing its file.
+        """
+        (name, start_line_number, end_line_number, function_node) = raw_data
+        node_range = self._function_node_ranges[function_id]
+        function_summary = self._function_summaries[function_id]
+        file_name = self.functionToFile[function_id]
+        file_content = self.fileContentDic[file_name]
+        function_code = file_content[node_range[0] : node_range[1]]
+        current_function = Function(
+            function_id,
+            name,
+            function_code,
+            start_line_number,
+            end_line_number,
+            function_node,
+            file_name,
+            node_loader=self._load_node,
+            node_range=node_range,
+        )
+        self._track_function(current_function)
+        current_function.paras = set(
+            record_to_value(record, file_name) for record in function_summary["paras"]
+        )
+        current_function.retvals = set(
+            record_to_value(record, file_name) for record in function_summary["retvals"]
+        )
+        current_function.if_statements = records_to_statements(
+            function_summary["if_statements"]
+        )
+        current_function.loop_statements = records_to_statements(
+            function_summary["loop_statements"]
+        )
+        current_function.def_use_index = DefUseIndex(
+            records_to_def_use_records(function_summary["def_use"])
+        )
         return function_id, current_function
 
     def parse_project(self) -> None:
         """
 
         Parse all project files using tree-sitter.
+        Files whose summaries are cached are loaded without running the node visitors.
+        With the process backend, the other files are summarized in worker processes first.
         """
+        if self.cache is not None:
+            for file_path, source_code in self.code_in_files.items():
+                summary = self.cache.load(source_code)
+                if summary is not None:
+                    self._file_summaries[file_path] = summary
+
+        if self.symbolic_backend == "process":
+            self._summarize_files_in_processes()
+
+        # The summaries are merged in the main thread, as loading them neither parses
+        # the files nor runs the node visitors. Only the other files go to the thread pool.
+        pbar = tqdm(total=len(self.code_in_files), desc="Parsing files")
+        unsummarized_file_paths = []
+        for file_path in self.code_in_files:
+            if file_path in self._file_summaries:
+                self._load_file_summary(
+                    file_path,
+                    self.code_in_files[file_path],
+                    self._file_summaries[file_path],
+                )
+                pbar.update(1)
+            else:
+                unsummarized_file_paths.append(file_path)
         with concurrent.futures.ThreadPoolExecutor(
             max_workers=self.max_symbolic_workers_num
         ) as executor:
             futures = {}
-            pbar = tqdm(total=len(self.code_in_files), desc="Parsing files")
-            for file_path, source_code in self.code_in_files.items():
+            for file_path in unsummarized_file_paths:
                 # Submit a task for each file.
                 future = executor.submit(
-                    self._parse_single_file, file_path, source_code
+                    self._parse_single_file, file_path, self.code_in_files[file_path]
                 )
                 futures[future] = file_path
             # Collect results.
             for future in concurrent.futures.as_completed(futures):
-                file_path, source = future.result()
-                self.fileContentDic[file_path] = source
+                future.result()
                 pbar.update(1)
-            pbar.close()
-
+        pbar.close()
+
+        pbar = tqdm(total=len(self.functionRawDataDic), desc="Analyzing functions")
+        unsummarized_function_ids = []
+        for function_id, raw_data in self.functionRawDataDic.items():
+            if function_id in self._function_summaries:
+                func_id, current_function = self._load_function_summary(
+                    function_id, raw_data
+                )
+                self.function_env[func_id] = current_function
+                pbar.update(1)
+            else:
+                unsummarized_function_ids.append(function_id)
         with concurrent.futures.ThreadPoolExecutor(
             max_workers=self.max_symbolic_workers_num
         ) as executor:
             futures = {}
-            pbar = tqdm(total=len(self.functionRawDataDic), desc="Analyzing functions")
-            for function_id, raw_data in self.functionRawDataDic.items():
+            for function_id in unsummarized_function_ids:
                 future = executor.submit(
-                    self._analyze_single_function, function_id, raw_data
+                    self._analyze_single_function,
+                    function_id,
+                    self.functionRawDataDic[function_id],
                 )
                 futures[future] = function_id
 
@@ -268,33 +483,304 @@ class TSAnalyzer(ABC):
                 func_id, current_function = future.result()
                 self.function_env[func_id] = current_function
                 pbar.update(1)
+        pbar.close()
+        return
+
+    def _summarize_files_in_processes(self) -> None:
+        """
+        Summarize the files without summaries in a process pool.
+        Each worker process owns its parser and returns picklable file summaries,
+        which are then loaded in the same way as cached summaries.
+        """
+        file_paths = [
+            file_path
+            for file_path in self.code_in_files
+            if file_path not in self._file_summaries
+        ]
+        if len(file_paths) == 0:
+            return
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_symbolic_workers_num,
+            initializer=_init_summary_worker,
+            initargs=(type(self), self.language_name),
+        ) as executor:
+            pbar = tqdm(total=len(file_paths), desc="Summarizing files")
+            # Results are collected in the submission order to keep function ids deterministic
+            for (file_path, source_code), summary in map_in_processes(
+                executor,
+                _summarize_file_in_worker,
+                ((file_path, self.code_in_files[file_path]) for file_path in file_paths),
+                self.max_symbolic_workers_num * 4,
+            ):
+                if self.cache is not None:
+                    self.cache.store(source_code, summary)
+                self._file_summaries[file_path] = summary
+                pbar.update(1)
             pbar.close()
         return
 
+    def summarize_file(self, file_path: str, source_code: str) -> Dict:
+        """
+        Analyze a single file in isolation and summarize its functions.
+        The call sites are recorded without being resolved, as resolution needs the whole project.
+        :param file_path: Path of the source file.
+        :param source_code: Content of the source file.
+        :return: The summary of the file.
+        """
+        self._parse_single_file(file_path, source_code)
+        self.fileContentDic[file_path] = source_code
+        function_ids = sorted(self._file_function_ids.get(file_path, []))
+        functions = []
+        for function_id in function_ids:
+            _, current_function = self._analyze_single_function(
+                function_id, self.functionRawDataDic[function_id]
+            )
+            self.call_site_summaries[function_id] = [
+                (call_site_node.start_byte, call_site_node.end_byte, callee_name, arguments)
+                for call_site_node, callee_name, arguments in self._collect_call_sites(
+                    current_function
+                )
+            ]
+            functions.append(current_function)
+        return {
+            "functions": [self._summarize_function(function) for function in functions],
+            "global_info": self.summarize_global_info(file_path),
+        }
+
     def analyze_call_graph(self) -> None:
         """
         Compute two kinds of caller-callee relationships:
         1. Between user-defined functions.
         2. Between user-defined functions and library APIs.
         Note that library APIs are collected on the fly.
-        This method parallelizes the extraction of call graph edges.
+        This method parallelizes the resolution of call sites, while the edges are
+        added in the order of function ids so that the API ids are deterministic.
         """
+        function_ids = sorted(self.function_env)
         with concurrent.futures.ThreadPoolExecutor(
             max_workers=self.max_symbolic_workers_num
         ) as executor:
-            futures = {}
-            pbar = tqdm(total=len(self.function_env), desc="Analyzing call graphs")
-            for function_id, current_function in self.function_env.items():
-                future = executor.submit(
-                    self.extract_call_graph_edges, current_function
+            pbar = tqdm(total=len(function_ids), desc="Analyzing call graphs")
+            for function_id, resolved_call_sites in zip(
+                function_ids,
+                executor.map(
+                    self._resolve_call_sites,
+                    [self.function_env[function_id] for function_id in function_ids],
+                ),
+            ):
+                self._add_call_graph_edges(
+                    self.function_env[function_id], resolved_call_sites
                 )
-                futures[future] = function_id
-            for future in concurrent.futures.as_completed(futures):
-                # Optionally, process or log each completed task here.
                 pbar.update(1)
             pbar.close()
         return
 
+    def update_files(
+        self, changed: Dict[str, str], removed: Optional[List[str]] = None
+    ) -> Set[int]:
+        """
+        Incrementally update the analysis results after some files are changed or removed.
+        The trees of changed files are reparsed via the edit/reparse path of tree-sitter,
+        and only the call graph edges touching the affected functions are recomputed.
+        :param changed: A dictionary mapping the changed (or newly added) file paths to their new contents.
+        :param removed: A list of removed file paths.
+        :return: The ids of the functions whose meta data or call graph edges have been recomputed.
+        """
+        removed = removed if removed is not None else []
+        changed = {
+            file_path: source_code
+            for file_path, source_code in changed.items()
+            if self.code_in_files.get(file_path) != source_code
+        }
+        stale_files = set(changed.keys()) | set(removed)
+
+        # Step I: Drop the functions defined in the stale files and their edges
+        stale_function_ids = [
+            function_id
+            for function_id, file_path in self.functionToFile.items()
+            if file_path in stale_files
+        ]
+        stale_function_names = set(
+            self.functionRawDataDic[function_id][0] for function_id in stale_function_ids
+        )
+        affected_caller_ids = set([])
+        for function_id in stale_function_ids:
+            affected_caller_ids.update(self._remove_function(function_id))
+
+        is_type_index_changed = False
+        for file_path in removed:
+            is_type_index_changed |= self.type_index.remove_file(file_path)
+            self.code_in_files.pop(file_path, None)
+            self.parse_trees.pop(file_path, None)
+            self._line_indexes.pop(file_path, None)
+            self._file_summaries.pop(file_path, None)
+
+        # Step II: Reparse the changed files, reusing the edited old trees
+        new_function_ids = set([])
+        for file_path, source_code in changed.items():
+            old_tree = self.parse_trees.peek(file_path)
+            old_source_code = self.code_in_files.get(file_path, None)
+            self.code_in_files[file_path] = source_code
+            self._line_indexes.pop(file_path, None)
+            self._file_summaries.pop(file_path, None)
+
+            next_function_id = self._next_function_id
+            old_file_scope = self.type_index.get_file_scope(file_path)
+            summary = self.cache.load(source_code) if self.cache is not None else None
+            if summary is not None:
+                self._file_summaries[file_path] = summary
+                self._load_file_summary(file_path, source_code, summary)
+            else:
+                if old_tree is not None and old_source_code is not None:
+                    edit = compute_tree_edit(
+                        bytes(old_source_code, "utf8"), bytes(source_code, "utf8")
+                    )
+                    old_tree.edit(*edit)
+                self._parse_single_file(file_path, source_code, old_tree)
+            new_function_ids.update(range(next_function_id, self._next_function_id))
+            if self.type_index.get_file_scope(file_path) != old_file_scope:
+                is_type_index_changed = True
+
+        for function_id in sorted(new_function_ids):
+            raw_data = self.functionRawDataDic[function_id]
+            if function_id in self._function_summaries:
+                _, current_function = self._load_function_summary(function_id, raw_data)
+            else:
+                _, current_function = self._analyze_single_function(
+                    function_id, raw_data
+                )
+            self.function_env[function_id] = current_function
+
+        # Step III: Recompute the edges of the new functions and the functions
+        # whose call sites may be resolved to the removed or new functions
+        new_function_names = set(
+            self.functionRawDataDic[function_id][0] for function_id in new_function_ids
+        )
+        touched_names = stale_function_names | new_function_names
+        for caller_id, call_site_summaries in self.call_site_summaries.items():
+            for _, _, callee_name, _ in call_site_summaries:
+                if callee_name in touched_names:
+                    affected_caller_ids.add(caller_id)
+                    break
+        affected_caller_ids.update(new_function_ids)
+        if is_type_index_changed:
+            # The receiver types of any call site may resolve differently
+            affected_caller_ids.update(self.function_env)
+
+        for caller_id in sorted(affected_caller_ids):
+            if caller_id not in self.function_env:
+                continue
+            self._remove_outgoing_edges(caller_id)
+            self.extract_call_graph_edges(self.function_env[caller_id])
+
+        self.save_cache()
+        return affected_caller_ids
+
+    def _remove_function(self, function_id: int) -> Set[int]:
+        """
+        Remove a function and all the call graph edges touching it.
+        :param function_id: The id of the removed function.
+        :return: The ids of the caller functions of the removed function.
+        """
+        function_name = self.functionRawDataDic[function_id][0]
+        self.functionNameToId[function_name].remove(function_id)
+        if len(self.functionNameToId[function_name]) == 0:
+            del self.functionNameToId[function_name]
+        del self.functionRawDataDic[function_id]
+        self._file_function_ids[self.functionToFile[function_id]].discard(function_id)
+        self._file_functions.get(self.functionToFile[function_id], {}).pop(function_id, None)
+        self._function_indexes.pop(self.functionToFile[function_id], None)
+        del self.functionToFile[function_id]
+        del self._function_node_ranges[function_id]
+        self.function_env.pop(function_id, None)
+        self._function_summaries.pop(function_id, None)
+        self._declaring_classes.pop(function_id, None)
+
+        self._remove_outgoing_edges(function_id)
+        caller_ids = self.function_callee_caller_map.pop(function_id, set([]))
+        for caller_id in caller_ids:
+            self.function_caller_callee_map[caller_id].discard(function_id)
+        return set(caller_ids) - {function_id}
+
+    def _remove_outgoing_edges(self, caller_id: int) -> None:
+        """
+        Remove the call graph edges starting from a function.
+        :param caller_id: The id of the caller function.
+        """
+        self._invalidate_call_graph_queries()
+        for callee_id in self.function_caller_callee_map.pop(caller_id, set([])):
+            if callee_id in self.function_callee_caller_map:
+                self.function_callee_caller_map[callee_id].discard(caller_id)
+        for api_id in self.function_caller_api_callee_map.pop(caller_id, set([])):
+            if api_id in self.api_callee_function_caller_map:
+                self.api_callee_function_caller_map[api_id].discard(caller_id)
+        self.call_site_summaries.pop(caller_id, None)
+        self.call_site_facts.pop(caller_id, None)
+        self._call_edge_counts.pop(caller_id, None)
+        return
+
+    def save_cache(self) -> None:
+        """
+        Store the summaries of the analyzed files that are not cached yet.
+        """
+        if self.cache is None:
+            return
+        functions_in_files: Dict[str, List[Function]] = {}
+        for function in self.function_env.values():
+            if function.file_path not in functions_in_files:
+                functions_in_files[function.file_path] = []
+            functions_in_files[function.file_path].append(function)
+
+        for file_path, source_code in self.code_in_files.items():
+            if file_path in self._file_summaries:
+                continue
+            functions = sorted(
+                functions_in_files.get(file_path, []),
+                key=lambda function: function.function_id,
+            )
+            summary = {
+                "functions": [
+                    self._summarize_function(function) for function in functions
+                ],
+                "global_info": self.summarize_global_info(file_path),
+            }
+            self.cache.store(source_code, summary)
+            self._file_summaries[file_path] = summary
+        return
+
+    def _summarize_function(self, function: Function) -> Dict:
+        """
+        Summarize a function as a JSON-serializable record.
+        """
+        start_byte, end_byte, node_type = function.node_range
+        return {
+            "name": function.function_name,
+            "start_line": function.start_line_number,
+            "end_line": function.end_line_number,
+            "start_byte": start_byte,
+            "end_byte": end_byte,
+            "node_type": node_type,
+            "paras": [value_to_record(para) for para in function.paras],
+            "retvals": [value_to_record(retval) for retval in function.retvals],
+            "if_statements": statements_to_records(function.if_statements),
+            "loop_statements": statements_to_records(function.loop_statements),
+            "def_use": def_use_records_to_records(function.def_use_index.records),
+            "call_sites": [
+                [
+                    start_byte,
+                    end_byte,
+                    callee_name,
+                    [value_to_record(argument) for argument in arguments],
+                ]
+                for (
+                    start_byte,
+                    end_byte,
+                    callee_name,
+                    arguments,
+                ) in self.call_site_summaries.get(function.function_id, [])
+            ],
+        }
+
     ###########################################
     # Helper function for project AST parsing #
     ###########################################
@@ -310,6 +796,25 @@ class TSAnalyzer(ABC):
         """
         pass
 
+    def summarize_global_info(self, file_path: str) -> Optional[List]:
+        """
+        Summarize the global information of a source file as a JSON-serializable record.
+        :param file_path: Path of the source file.
+        :return: The record, or None if the information is extracted again from the tree when loaded.
+        """
+        return None
+
+    def load_global_info(
+        self, file_path: str, source_code: str, record: Optional[List]
+    ) -> None:
+        """
+        Restore the global information of a source file from its summary.
+        :param file_path: Path of the source file.
+        :param source_code: Content of the source file.
+        :param record: The record returned by summarize_global_info.
+        """
+        self.extract_global_info(file_path, source_code, self.parse_trees[file_path])
+
     def extract_meta_data_in_single_function(
         self, current_function: Function
     ) -> Function:
@@ -332,6 +837,9 @@ class TSAnalyzer(ABC):
         current_function.loop_statements = self.get_loop_statements(
             current_function, file_content
         )
+        current_function.def_use_index = DefUseIndex(
+            self.get_def_use_records(current_function)
+        )
         return current_function
 
     @abstractmethod
@@ -346,6 +854,25 @@ class TSAnalyzer(ABC):
         """
         pass
 
+    def summarize_global_info(self, file_path: str) -> Optional[List]:
+        """
+        Summarize the global information of a source file as a JSON-serializable record.
+        :param file_path: Path of the source file.
+        :return: The record, or None if the information is extracted again from the tree when loaded.
+        """
+        return None
+
+    def load_global_info(
+        self, file_path: str, source_code: str, record: Optional[List]
+    ) -> None:
+        """
+        Restore the global information of a source file from its summary.
+        :param file_path: Path of the source file.
+        :param source_code: Content of the source file.
+        :param record: The record returned by summarize_global_info.
+        """
+        self.extract_global_info(file_path, source_code, self.parse_trees[file_path])
+
     ###########################################
     # Helper function for call graph analysis #
     ###########################################
@@ -356,9 +883,156 @@ class TSAnalyzer(ABC):
         2. Between user-defined functions and library APIs.
         :param current_function: the function to be analyzed.
         """
-        file_name = self.functionToFile[current_function.function_id]
-        file_content = self.fileContentDic[file_name]
+        self._add_call_graph_edges(
+            current_function, self._resolve_call_sites(current_function)
+        )
+        return
+
+    def _resolve_call_sites(
+        self, current_function: Function
+    ) -> List[Tuple[tree_sitter.Node, str, Set[Value], List[int], int]]:
+        """
+        Collect the call sites in a function and resolve their callee functions
+        without modifying the call graph.
+        :param current_function: the function to be analyzed.
+        :return: A list of (call site node, callee name, arguments, callee function ids,
+                 number of the functions matching the callee name and the number of arguments).
+        """
+        caller_id = current_function.function_id
+
+        call_site_summaries = []
+        if caller_id in self._function_summaries:
+            # Restore the call site facts from the summary
+            for start_byte, end_byte, callee_name, arguments in self._function_summaries[
+                caller_id
+            ]["call_sites"]:
+                call_site_node = locate_node(
+                    current_function.parse_tree_root_node,
+                    start_byte,
+                    end_byte,
+                    self.get_call_node_type(),
+                )
+                call_site_summaries.append(
+                    (
+                        call_site_node,
+                        callee_name,
+                        set(
+                            record_to_value(record, current_function.file_path)
+                            for record in arguments
+                        ),
+                    )
+                )
+        else:
+            call_site_summaries = self._collect_call_sites(current_function)
+
+        resolved_call_sites = []
+        for call_site_node, callee_name, arguments in call_site_summaries:
+            candidate_ids = self._resolve_callee_function_ids(callee_name, len(arguments))
+            callee_ids = (
+                self._filter_callee_function_ids(
+                    current_function, call_site_node, candidate_ids
+                )
+                if len(candidate_ids) > 0
+                else candidate_ids
+            )
+            resolved_call_sites.append(
+                (call_site_node, callee_name, arguments, callee_ids, len(candidate_ids))
+            )
+        return resolved_call_sites
+
+    def _add_call_graph_edges(
+        self,
+        current_function: Function,
+        resolved_call_sites: List[Tuple[tree_sitter.Node, str, Set[Value], List[int], int]],
+    ) -> None:
+        """
+        Add the call graph edges of the resolved call sites in a function.
+        :param current_function: the function to be analyzed.
+        :param resolved_call_sites: the result of _resolve_call_sites.
+        """
+        caller_id = current_function.function_id
+        function_call_sites = []
+        api_call_sites = []
+        call_site_facts = {}
+        line_numbers = self.get_line_numbers(
+            current_function.file_path,
+            [call_site_node.start_byte for call_site_node, *_ in resolved_call_sites],
+        )
+
+        with self._call_graph_lock:
+            self._invalidate_call_graph_queries()
+            self._call_edge_counts[caller_id] = (
+                sum(candidate_num for *_, candidate_num in resolved_call_sites),
+                sum(len(callee_ids) for _, _, _, callee_ids, _ in resolved_call_sites),
+            )
+            for (call_site_node, callee_name, arguments, callee_ids, _), line_number in zip(
+                resolved_call_sites, line_numbers
+            ):
+                api_ids = ()
+                if len(callee_ids) > 0:
+                    # Update the caller-callee relationship between user-defined functions
+                    for callee_id in callee_ids:
+                        if caller_id not in self.function_caller_callee_map:
+                            self.function_caller_callee_map[caller_id] = set([])
+                        self.function_caller_callee_map[caller_id].add(callee_id)
+                        if callee_id not in self.function_callee_caller_map:
+                            self.function_callee_caller_map[callee_id] = set([])
+                        self.function_callee_caller_map[callee_id].add(caller_id)
+                    function_call_sites.append(call_site_node)
+                else:
+                    # Insert the API into the API environment if it does not exist previously
+                    api_id = self.api_registry.intern(callee_name, len(arguments))
+
+                    # Update the caller-callee relationship between user-defined functions and library APIs
+                    if caller_id not in self.function_caller_api_callee_map:
+                        self.function_caller_api_callee_map[caller_id] = set([])
+                    self.function_caller_api_callee_map[caller_id].add(api_id)
+                    if api_id not in self.api_callee_function_caller_map:
+                        self.api_callee_function_caller_map[api_id] = set([])
+                    self.api_callee_function_caller_map[api_id].add(caller_id)
+                    api_call_sites.append(call_site_node)
+                    api_ids = (api_id,)
+                call_site_facts[(call_site_node.start_byte, call_site_node.end_byte)] = (
+                    CallSiteFact(
+                        callee_name,
+                        frozenset(arguments),
+                        tuple(callee_ids),
+                        api_ids,
+                        line_number,
+                    )
+                )
+            self.call_site_facts[caller_id] = call_site_facts
 
+            self.call_site_summaries[caller_id] = [
+                (call_site_node.start_byte, call_site_node.end_byte, callee_name, arguments)
+                for call_site_node, callee_name, arguments, _, _ in resolved_call_sites
+            ]
+        current_function.function_call_site_nodes = function_call_sites
+        current_function.api_call_site_nodes = api_call_sites
+        self._release_if_evicted(current_function)
+        return
+
+    def _collect_call_sites(
+        self, current_function: Function
+    ) -> List[Tuple[tree_sitter.Node, str, Set[Value]]]:
+        """
+        Collect the call sites in a function together with the callee names and arguments.
+        :param current_function: the function to be analyzed.
+        :return: A list of (call site node, callee name, arguments).
+        """
+        file_content = self.fileContentDic[current_function.file_path]
+        call_sites = []
+        all_call_sites = current_function.find_nodes_by_type(self.get_call_node_type())
+        for call_site_node in all_call_sites:
+            callee_name = self.get_callee_name_at_call_site(call_site_node, file_content)
+            arguments = self.get_arguments_at_callsite(current_function, call_site_node)
+            call_sites.append((call_site_node, callee_name, arguments))
+        return call_sites
+
+    def get_call_node_type(self) -> str:
+        """
+        Get the AST node type of call sites in the analyzed language.
+        """
         call_node_type = None
         if self.language_name == "C" or self.language_name == "Cpp":
             call_node_type = "call_expression"
@@ -370,61 +1044,7 @@ class TSAnalyzer(ABC):
             call_node_type = "call_expression"
 
         assert call_node_type != None
-
-        all_call_sites = find_nodes_by_type(
-            current_function.parse_tree_root_node, call_node_type
-        )
-        function_call_sites = []
-        api_call_sites = []
-
-        for call_site_node in all_call_sites:
-            callee_ids = self.get_callee_function_ids_at_callsite(
-                current_function, call_site_node
-            )
-            if len(callee_ids) > 0:
-                # Update the caller-callee relationship between user-defined functions
-                for callee_id in callee_ids:
-                    caller_id = current_function.function_id
-                    if caller_id not in self.function_caller_callee_map:
-                        self.function_caller_callee_map[caller_id] = set([])
-                    self.function_caller_callee_map[caller_id].add(callee_id)
-                    if callee_id not in self.function_callee_caller_map:
-                        self.function_callee_caller_map[callee_id] = set([])
-                    self.function_callee_caller_map[callee_id].add(caller_id)
-                function_call_sites.append(call_site_node)
-            else:
-                api_id = None
-                arguments = self.get_arguments_at_callsite(
-                    current_function, call_site_node
-                )
-                callee_name = self.get_callee_name_at_call_site(
-                    call_site_node, file_content
-                )
-                tmp_api = API(-1, callee_name, len(arguments))
-
-                # Insert the API into the API environment if it does not exist previously
-                for single_api_id in self.api_env:
-                    if self.api_env[single_api_id] == tmp_api:
-                        api_id = single_api_id
-                if api_id == None:
-                    self.api_env[len(self.api_env)] = API(
-                        len(self.api_env), callee_name, len(arguments)
-                    )
-                    api_id = len(self.api_env) - 1
-
-                caller_id = current_function.function_id
-                # Update the caller-callee relationship between user-defined functions and library APIs
-                if caller_id not in self.function_caller_api_callee_map:
-                    self.function_caller_api_callee_map[caller_id] = set([])
-                self.function_caller_api_callee_map[caller_id].add(api_id)
-                if api_id not in self.api_callee_function_caller_map:
-                    self.api_callee_function_caller_map[api_id] = set([])
-                self.api_callee_function_caller_map[api_id].add(caller_id)
-                api_call_sites.append(call_site_node)
-
-        current_function.function_call_site_nodes = function_call_sites
-        current_function.api_call_site_nodes = api_call_sites
-        return
+        return call_node_type
 
     # Helper functions for callers
     def get_all_caller_functions(self, function: Function) -> List[Function]:
@@ -457,53 +1077,179 @@ class TSAnalyzer(ABC):
     ) -> List[Function]:
         """
         Get all transitive caller functions for the provided function.
+        :param function: The function to be analyzed.
+        :param max_depth: The maximal length of the call chains. Unbounded if None.
+        :return: The callers within max_depth calls, sorted by function id.
         """
-        if max_depth == 0:
-            return []
-        if function.function_id not in self.function_callee_caller_map:
-            return []
-        caller_ids = self.function_callee_caller_map[function.function_id]
-        caller_functions = [self.function_env[caller_id] for caller_id in caller_ids]
-        for caller_function in caller_functions:
-            caller_functions.extend(
-                self.get_all_transitive_caller_functions(caller_function, max_depth - 1)
-            )
-        caller_functions = list(
-            {function.function_id: function for function in caller_functions}.values()
-        )
-        return caller_functions
+        with self._call_graph_lock:
+            if self._caller_query is None:
+                self._caller_query = CallGraphQuery(self.function_callee_caller_map)
+            caller_query = self._caller_query
+        caller_ids = caller_query.reach(function.function_id, max_depth)
+        return [self.function_env[caller_id] for caller_id in sorted(caller_ids)]
 
     def get_all_transitive_callee_functions(
-        self, function: Function, max_depth, visited=None
+        self, function: Function, max_depth=1000
     ) -> List[Function]:
         """
         Get all transitive callee functions for the provided function.
+        :param function: The function to be analyzed.
+        :param max_depth: The maximal length of the call chains. Unbounded if None.
+        :return: The callees within max_depth calls, sorted by function id.
+        """
+        with self._call_graph_lock:
+            if self._callee_query is None:
+                self._callee_query = CallGraphQuery(self.function_caller_callee_map)
+            callee_query = self._callee_query
+        callee_ids = callee_query.reach(function.function_id, max_depth)
+        return [self.function_env[callee_id] for callee_id in sorted(callee_ids)]
+
+    def get_call_graph_sccs(self) -> List[Tuple[int, ...]]:
+        """
+        Get the strongly connected components (SCCs) of the call graph between user-defined functions.
+        :return: The SCCs in a bottom-up order, i.e., the SCCs of callees come before those of
+                 their callers. Functions without call edges form singleton SCCs.
+        """
+        with self._call_graph_lock:
+            if self._callee_query is None:
+                self._callee_query = CallGraphQuery(self.function_caller_callee_map)
+            callee_query = self._callee_query
+        sccs = [
+            component
+            for component in callee_query.components
+            if component[0] in self.function_env
+        ]
+        sccs.extend(
+            (function_id,)
+            for function_id in sorted(self.function_env)
+            if function_id not in callee_query.component_ids
+        )
+        return sccs
+
+    def get_sink_reachable_function_ids(
+        self, sink_function_ids: Set[int], max_depth: Optional[int] = None
+    ) -> Dict[int, int]:
+        """
+        Get the functions from which a value can reach a function containing a sink.
+        A value reaches a sink via realizable call chains, i.e., it is returned to the callers
+        a number of times and then passed to the callees a number of times.
+        :param sink_function_ids: The ids of the functions containing the sinks.
+        :param max_depth: The maximal number of returns and calls along a chain. Unbounded if None.
+        :return: The mapping from the id of each such function to the minimal number of returns and calls.
+        """
+        # The number of calls from each function to a sink function, via the callers of the sinks
+        call_distances: Dict[int, int] = {}
+        frontier = sorted(function_id for function_id in sink_function_ids if function_id in self.function_env)
+        for function_id in frontier:
+            call_distances[function_id] = 0
+        distance = 0
+        while frontier and (max_depth is None or distance < max_depth):
+            distance += 1
+            next_frontier = []
+            for function_id in frontier:
+                for caller_id in self.function_callee_caller_map.get(function_id, ()):
+                    if caller_id not in call_distances:
+                        call_distances[caller_id] = distance
+                        next_frontier.append(caller_id)
+            frontier = next_frontier
+
+        # A function also reaches a sink if one of its callers does, after one more return
+        distances = dict(call_distances)
+        heap = [(distance, function_id) for function_id, distance in call_distances.items()]
+        heapq.heapify(heap)
+        while heap:
+            distance, function_id = heapq.heappop(heap)
+            if distances[function_id] < distance:
+                continue
+            if max_depth is not None and distance >= max_depth:
+                continue
+            for callee_id in self.function_caller_callee_map.get(function_id, ()):
+                if distances.get(callee_id, distance + 2) > distance + 1:
+                    distances[callee_id] = distance + 1
+                    heapq.heappush(heap, (distance + 1, callee_id))
+        return distances
+
+    def _invalidate_call_graph_queries(self) -> None:
         """
-        if max_depth == 0:
-            return []
+        Drop the memoized transitive queries after the call graph changes.
+        """
+        self._callee_query = None
+        self._caller_query = None
+        self._csr_call_graphs = {}
+        return
 
-        if visited is None:
-            visited = set()
+    def get_call_graph_csr(self, is_backward: bool = False) -> "CSRCallGraph":
+        """
+        Get the CSR adjacency of the call graph between user-defined functions.
+        NumPy is only required when this method is called.
+        :param is_backward: True for the callee --> caller direction
+        :return: the CSR call graph, which is rebuilt after the call graph changes
+        """
+        from src.tstool.analyzer.ts_csr import CSRCallGraph
 
-        if function.function_id in visited:
-            return []
+        with self._call_graph_lock:
+            if is_backward not in self._csr_call_graphs:
+                self._csr_call_graphs[is_backward] = CSRCallGraph(
+                    self.function_callee_caller_map
+                    if is_backward
+                    else self.function_caller_callee_map
+                )
+            return self._csr_call_graphs[is_backward]
 
-        visited.add(function.function_id)
+    def get_all_transitive_function_ids_in_bulk(
+        self, function_ids: List[int], max_depth=1000, is_backward: bool = False
+    ) -> Dict[int, List[int]]:
+        """
+        Get the transitive callees (or callers) of many functions in one vectorized BFS.
+        :param function_ids: The ids of the functions to be analyzed.
+        :param max_depth: The maximal length of the call chains. Unbounded if None.
+        :param is_backward: True for transitive callers, False for transitive callees.
+        :return: The mapping from each function id to the sorted ids of its transitive callees (or callers).
+        """
+        return self.get_call_graph_csr(is_backward).reach(function_ids, max_depth)
 
-        if function.function_id not in self.function_caller_callee_map:
-            return []
-        callee_ids = self.function_caller_callee_map[function.function_id]
-        callee_functions = [self.function_env[callee_id] for callee_id in callee_ids]
-        for callee_function in callee_functions:
-            callee_functions.extend(
-                self.get_all_transitive_callee_functions(
-                    callee_function, max_depth - 1, visited
-                )
+    def to_networkx(self) -> "networkx.DiGraph":
+        """
+        Convert the call graph, including the calls of library APIs, to a networkx graph.
+        Functions are keyed by "function_<id>" and APIs by "api_<id>".
+        networkx is only required when this method is called.
+        """
+        import networkx
+
+        graph = networkx.DiGraph()
+        for function_id, function in self.function_env.items():
+            graph.add_node(
+                f"function_{function_id}",
+                kind="function",
+                name=function.function_name,
+                file_path=function.file_path,
+                start_line=function.start_line_number,
+                end_line=function.end_line_number,
             )
-        callee_functions = list(
-            {function.function_id: function for function in callee_functions}.values()
-        )
-        return callee_functions
+        for api_id, api in self.api_env.items():
+            graph.add_node(
+                f"api_{api_id}",
+                kind="api",
+                name=api.api_name,
+                para_num=api.api_para_num,
+            )
+        for caller_id, callee_ids in self.function_caller_callee_map.items():
+            for callee_id in callee_ids:
+                graph.add_edge(f"function_{caller_id}", f"function_{callee_id}")
+        for caller_id, api_ids in self.function_caller_api_callee_map.items():
+            for api_id in api_ids:
+                graph.add_edge(f"function_{caller_id}", f"api_{api_id}")
+        return graph
+
+    def export_call_graph(self, graphml_path: str) -> None:
+        """
+        Write the call graph to a GraphML file for offline analysis.
+        :param graphml_path: The path of the GraphML file.
+        """
+        import networkx
+
+        networkx.write_graphml(self.to_networkx(), graphml_path)
+        return
 
     # Helper functions for callees
     ## For library APIs
@@ -516,11 +1262,12 @@ class TSAnalyzer(ABC):
         :param callee: The name of the callee API.
         :param para_num: The number of parameters of the callee API.
         """
-        callee_list = []
-        for callee_api_id in self.function_caller_api_callee_map[function.function_id]:
-            if self.api_env[callee_api_id] == API(-1, callee_name, para_num):
-                callee_list.append(self.api_env[callee_api_id])
-        return callee_list
+        api_id = self.api_registry.get_api_id(callee_name, para_num)
+        if api_id is None or api_id not in self.function_caller_api_callee_map.get(
+            function.function_id, set([])
+        ):
+            return []
+        return [self.api_env[api_id]]
 
     @abstractmethod
     def get_callee_name_at_call_site(
@@ -543,10 +1290,56 @@ class TSAnalyzer(ABC):
         :param call_site_node: The node of the call site.
         :return: A list of function ids of the callee functions.
         """
-        file_name = current_function.file_path
-        source_code = self.code_in_files[file_name]
+        return list(self.get_call_site_fact(current_function, call_site_node).callee_ids)
+
+    def get_call_site_fact(
+        self, current_function: Function, call_site_node: tree_sitter.Node
+    ) -> CallSiteFact:
+        """
+        Get the facts of a call site, i.e., the callee name, the arguments, the resolved
+        callee functions or APIs, and the line number.
+        The facts recorded during call graph construction are returned directly.
+        :param current_function: The function to be analyzed.
+        :param call_site_node: The node of the call site.
+        :return: The facts of the call site.
+        """
+        call_site_fact = self.call_site_facts.get(current_function.function_id, {}).get(
+            (call_site_node.start_byte, call_site_node.end_byte)
+        )
+        if call_site_fact is not None:
+            return call_site_fact
+
+        # The call site has not been resolved, e.g., before the call graph is built
+        source_code = self.code_in_files[current_function.file_path]
         callee_name = self.get_callee_name_at_call_site(call_site_node, source_code)
         arguments = self.get_arguments_at_callsite(current_function, call_site_node)
+        callee_ids = self._resolve_callee_function_ids(callee_name, len(arguments))
+        if len(callee_ids) > 0:
+            callee_ids = self._filter_callee_function_ids(
+                current_function, call_site_node, callee_ids
+            )
+        api_id = (
+            self.api_registry.get_api_id(callee_name, len(arguments))
+            if len(callee_ids) == 0
+            else None
+        )
+        return CallSiteFact(
+            callee_name,
+            frozenset(arguments),
+            tuple(callee_ids),
+            (api_id,) if api_id is not None else (),
+            self.get_line_number(current_function.file_path, call_site_node.start_byte),
+        )
+
+    def _resolve_callee_function_ids(
+        self, callee_name: str, argument_num: int
+    ) -> List[int]:
+        """
+        Resolve the callee function(s) by the callee name and the number of arguments.
+        :param callee_name: The name of the callee.
+        :param argument_num: The number of arguments at the call site.
+        :return: A list of function ids of the callee functions.
+        """
         temp_callee_ids = []
         # while callee_name in self.glb_var_map:
         #     callee_name = self.glb_var_map[callee_name]
@@ -557,10 +1350,40 @@ class TSAnalyzer(ABC):
         for callee_id in temp_callee_ids:
             callee = self.function_env[callee_id]
             paras = callee.paras
-            if len(paras) == len(arguments):
+            if len(paras) == argument_num:
                 callee_ids.append(callee_id)
         return callee_ids
 
+    def _filter_callee_function_ids(
+        self,
+        current_function: Function,
+        call_site_node: tree_sitter.Node,
+        callee_ids: List[int],
+    ) -> List[int]:
+        """
+        Prune the callee functions matched by name and the number of arguments,
+        e.g., via the receiver type and the class hierarchy.
+        The default implementation keeps all of them.
+        :param current_function: The function to be analyzed.
+        :param call_site_node: The node of the call site.
+        :param callee_ids: The ids of the name-matched callee functions.
+        :return: The ids of the remaining callee functions.
+        """
+        return callee_ids
+
+    def get_call_edge_precision(self) -> Dict[str, int]:
+        """
+        Report how much callee resolution shrinks the call graph.
+        :return: The numbers of the (call site, callee) edges matched by name and the number
+                 of arguments, and of the edges kept after pruning.
+        """
+        with self._call_graph_lock:
+            counts = list(self._call_edge_counts.values())
+        return {
+            "name_matched_edges": sum(candidate_num for candidate_num, _ in counts),
+            "resolved_edges": sum(resolved_num for _, resolved_num in counts),
+        }
+
     def get_callee_api_ids_at_callsite(
         self, current_function: Function, call_site_node: tree_sitter.Node
     ) -> List[int]:
@@ -570,18 +1393,7 @@ class TSAnalyzer(ABC):
         :param call_site_node: The node of the call site.
         :return: A list of api ids of the callee apis.
         """
-        file_name = current_function.file_path
-        source_code = self.code_in_files[file_name]
-        callee_name = self.get_callee_name_at_call_site(call_site_node, source_code)
-        arguments = self.get_arguments_at_callsite(current_function, call_site_node)
-        callee_ids = []
-        # while callee_name in self.glb_var_map:
-        #     callee_name = self.glb_var_map[callee_name]
-        tmp_api = API(-1, callee_name, len(arguments))
-        for api_id in self.api_env:
-            if self.api_env[api_id] == tmp_api:
-                callee_ids.append(api_id)
-        return callee_ids
+        return list(self.get_call_site_fact(current_function, call_site_node).api_ids)
 
     @abstractmethod
     def get_callsites_by_callee_name(
@@ -632,7 +1444,9 @@ class TSAnalyzer(ABC):
         """
         file_code = self.code_in_files[current_function.file_path]
         name = file_code[call_site_node.start_byte : call_site_node.end_byte]
-        line_number = file_code[: call_site_node.start_byte].count("\n") + 1
+        line_number = self.get_line_number(
+            current_function.file_path, call_site_node.start_byte
+        )
         output_value = Value(
             name, line_number, ValueLabel.OUT, current_function.file_path, -1
         )
@@ -675,70 +1489,140 @@ class TSAnalyzer(ABC):
         """
         pass
 
+    # Helper functions for def-use chains
+    def get_def_use_records(self, function: Function) -> List[DefUseRecord]:
+        """
+        Find the definitions and the uses of the variables in a function.
+        :param function: The function to be analyzed.
+        :return: The def-use records, or an empty list if the language does not support it.
+        """
+        return []
+
+    def get_local_variable_declarations(
+        self, function: Function, variable_names: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """
+        Get the local variable declarations in a function.
+        :param function: The function to be analyzed.
+        :param variable_names: If given, only the declarations in the forward slice of the variables.
+        :return: The code of the declarations in the order of their lines.
+        """
+        if variable_names is None:
+            return function.def_use_index.declarations
+        return [
+            record.text
+            for record in function.def_use_index.get_forward_slice(variable_names)
+            if record.kind == "declaration"
+        ]
+
+    def get_assignment_expressions(
+        self, function: Function, variable_names: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """
+        Get the assignment expressions in a function.
+        :param function: The function to be analyzed.
+        :param variable_names: If given, only the assignments in the forward slice of the variables.
+        :return: The code of the assignments in the order of their lines.
+        """
+        if variable_names is None:
+            return function.def_use_index.assignments
+        return [
+            record.text
+            for record in function.def_use_index.get_forward_slice(variable_names)
+            if record.kind == "assignment"
+        ]
+
+    def get_def_use_slice(
+        self, function: Function, variable_names: Iterable[str]
+    ) -> List[DefUseRecord]:
+        """
+        Get the definitions and uses of some variables and the variables defined from them transitively.
+        :param function: The function to be analyzed.
+        :param variable_names: The variables.
+        :return: The def-use records in the order of their lines.
+        """
+        return function.def_use_index.get_forward_slice(variable_names)
+
+    def get_control_order_index(self, function: Function) -> ControlOrderIndex:
+        """
+        Get the index of the if statements and the loop statements of a function,
+        which is built once and rebuilt after the statements of the function change.
+        """
+        control_order_index = function.control_order_index
+        if control_order_index is None:
+            control_order_index = ControlOrderIndex(
+                function.if_statements, function.loop_statements
+            )
+            function.control_order_index = control_order_index
+        return control_order_index
+
+    def build_control_flow_graph(self, function: Function) -> Optional[ControlFlowGraph]:
+        """
+        Build the control flow graph of a function.
+        :param function: The function to be analyzed.
+        :return: The control flow graph, or None if the language does not support it.
+        """
+        return None
+
+    def get_control_flow_graph(self, function: Function) -> Optional[ControlFlowGraph]:
+        """
+        Get the control flow graph of a function, which is built once per function
+        and keeps its dominator and post-dominator trees once they are computed.
+        """
+        if function.control_flow_graph is None:
+            function.control_flow_graph = self.build_control_flow_graph(function)
+        return function.control_flow_graph
+
     def check_control_order(
-        self, function: Function, src_line_number: str, sink_line_number: str
+        self, function: Function, src_line_number: int, sink_line_number: int
     ) -> bool:
         """
         Check if the source line could execute before the sink line.
         """
-        src_line_number_in_function = src_line_number
-        sink_line_number_in_function = sink_line_number
-
-        if src_line_number_in_function == sink_line_number_in_function:
-            return True
-
-        for if_statement_start_line, if_statement_end_line in function.if_statements:
-            (
-                _,
-                _,
-                _,
-                (true_branch_start_line, true_branch_end_line),
-                (else_branch_start_line, else_branch_end_line),
-            ) = function.if_statements[(if_statement_start_line, if_statement_end_line)]
-            if (
-                true_branch_start_line
-                <= src_line_number_in_function
-                <= true_branch_end_line
-                and else_branch_start_line
-                <= sink_line_number_in_function
-                <= else_branch_end_line
-                and else_branch_start_line != 0
-                and else_branch_end_line != 0
-            ):
-                return False
+        return self.get_control_order_index(function).check_order(
+            src_line_number, sink_line_number
+        )
 
-        if src_line_number_in_function > sink_line_number_in_function:
-            for loop_start_line, loop_end_line in function.loop_statements:
-                (
-                    _,
-                    _,
-                    _,
-                    loop_body_start_line,
-                    loop_body_end_line,
-                ) = function.loop_statements[(loop_start_line, loop_end_line)]
-                if (
-                    loop_body_start_line
-                    <= src_line_number_in_function
-                    <= loop_body_end_line
-                    and loop_body_start_line
-                    <= sink_line_number_in_function
-                    <= loop_body_end_line
-                ):
-                    return True
-            return False
-        return True
+    def check_control_order_in_bulk(
+        self, function: Function, line_number_pairs: List[Tuple[int, int]]
+    ) -> List[bool]:
+        """
+        Check if the source line could execute before the sink line for many line pairs.
+        :param function: The function containing the lines.
+        :param line_number_pairs: The (source line number, sink line number) pairs.
+        :return: The results of check_control_order for the pairs, in the same order.
+        """
+        return self.get_control_order_index(function).check_orders(line_number_pairs)
 
     def check_control_reachability(
-        self, function: Function, src_line_number: str, sink_line_number: str
+        self, function: Function, src_line_number: int, sink_line_number: int
     ) -> bool:
         """
         Check if control can reach from the source line to the sink line, considering return statements.
         """
         if not self.check_control_order(function, src_line_number, sink_line_number):
             return False
-        # TODO: Enhance return statement analysis if needed.
+        control_flow_graph = self.get_control_flow_graph(function)
+        if control_flow_graph is not None:
+            return control_flow_graph.is_reachable(src_line_number, sink_line_number)
         return True
 
+    def check_control_reachability_in_bulk(
+        self, function: Function, line_number_pairs: List[Tuple[int, int]]
+    ) -> List[bool]:
+        """
+        Check if control can reach from the source line to the sink line for many line pairs.
+        :return: The results of check_control_reachability for the pairs, in the same order.
+        """
+        results = self.check_control_order_in_bulk(function, line_number_pairs)
+        control_flow_graph = self.get_control_flow_graph(function)
+        if control_flow_graph is None:
+            return results
+        return [
+            result and control_flow_graph.is_reachable(src_line_number, sink_line_number)
+            for result, (src_line_number, sink_line_number) in zip(results, line_number_pairs)
+        ]
+
     # Other helper functions
 
     def get_node_by_line_number(
@@ -748,51 +1632,77 @@ class TSAnalyzer(ABC):
         Find nodes that contain a specific line number.
         """
         code_node_list = []
-        for function_id in self.function_env:
-            function = self.function_env[function_id]
-            if not (
-                function.start_line_number <= line_number <= function.end_line_number
-            ):
-                continue
-            all_nodes = find_all_nodes(function.parse_tree_root_node)
-            for node in all_nodes:
-                start_line = (
-                    function.function_code[: node.start_byte].count("\n")
-                    + function.start_line_number
-                )
-                end_line = (
-                    function.function_code[: node.end_byte].count("\n")
-                    + function.start_line_number
-                )
-                if start_line == end_line == line_number:
+        for file_path in list(self._file_function_ids):
+            for function_id in self.get_function_index(file_path).find(line_number):
+                if function_id not in self.function_env:
+                    continue
+                function = self.function_env[function_id]
+                for node in function.get_nodes_at_line(line_number):
                     code_node_list.append((function.function_code, node))
         return code_node_list
 
     def get_function_from_localvalue(self, value: Value) -> Function:
         """
         Retrieve the function corresponding to a local value.
+        If the functions are nested, the innermost one is returned.
         """
-        file_name = value.file
-        for function_id, function in self.function_env.items():
-            if function.file_path == file_name:
-                if (
-                    function.start_line_number
-                    <= value.line_number
-                    <= function.end_line_number
-                ):
-                    return function
+        if value.file not in self._file_function_ids:
+            return None
+        for function_id in self.get_function_index(value.file).find(value.line_number):
+            if function_id in self.function_env:
+                return self.function_env[function_id]
         return None
 
+    def get_function_index(self, file_path: str) -> IntervalIndex[int]:
+        """
+        Get the index of the line ranges of the functions in a file,
+        which is rebuilt after the functions in the file change.
+        """
+        function_index = self._function_indexes.get(file_path, None)
+        if function_index is None:
+            function_index = IntervalIndex(
+                (
+                    self.functionRawDataDic[function_id][1],
+                    self.functionRawDataDic[function_id][2],
+                    function_id,
+                )
+                for function_id in sorted(self._file_function_ids.get(file_path, []))
+            )
+            self._function_indexes[file_path] = function_index
+        return function_index
+
     def get_content_by_line_number(self, line_number: int, file_name: str) -> str:
         """
         Get the content from a file at the specified line.
         """
         if file_name not in self.code_in_files:
             return ""
-        file_lines = self.code_in_files[file_name].split("\n")
-        if line_number > len(file_lines):
-            return ""
-        return file_lines[line_number - 1]
+        return self.get_line_index(file_name).get_line_content(
+            self.code_in_files[file_name], line_number
+        )
+
+    def get_line_index(self, file_path: str) -> LineIndex:
+        """
+        Get the newline offsets of a file, which are computed once per file content.
+        """
+        line_index = self._line_indexes.get(file_path, None)
+        if line_index is None:
+            line_index = LineIndex(self.code_in_files[file_path])
+            self._line_indexes[file_path] = line_index
+        return line_index
+
+    def get_line_number(self, file_path: str, offset: int) -> int:
+        """
+        Get the (1-based) line number of an offset in a file,
+        i.e., source_code[: offset].count("\n") + 1 without scanning the file prefix.
+        """
+        return self.get_line_index(file_path).get_line_number(offset)
+
+    def get_line_numbers(self, file_path: str, offsets: List[int]) -> List[int]:
+        """
+        Get the line numbers of a batch of offsets in a file.
+        """
+        return self.get_line_index(file_path).get_line_numbers(offsets)
 
     def get_all_functions(self) -> List[Function]:
         """
@@ -801,33 +1711,204 @@ class TSAnalyzer(ABC):
         return list(self.function_env.values())
 
 
+# Utility functions for grammar loading
+
+TS_LANGUAGE_PATH = (
+    Path(__file__).resolve().parent.absolute() / "../../../lib/build/my-languages.so"
+)
+TS_LANGUAGE_NAMES = {
+    "C": "c",
+    "Cpp": "cpp",
+    "Java": "java",
+    "Python": "python",
+    "Go": "go",
+}
+_languages: Dict[str, Language] = {}
+_languages_lock = threading.Lock()
+_queries: Dict[Tuple[str, str], tree_sitter.Query] = {}
+_queries_lock = threading.Lock()
+# Parsers are not thread-safe, so each thread owns one parser per language
+_parsers = threading.local()
+
+
+def load_language(language_name: str) -> Language:
+    """
+    Load the tree-sitter grammar of a language. Each grammar is loaded once per process.
+    """
+    if language_name not in TS_LANGUAGE_NAMES:
+        raise ValueError("Invalid language setting")
+    with _languages_lock:
+        if language_name not in _languages:
+            _languages[language_name] = Language(
+                str(TS_LANGUAGE_PATH), TS_LANGUAGE_NAMES[language_name]
+            )
+        return _languages[language_name]
+
+
+def load_parser(language_name: str) -> Parser:
+    """
+    Get the parser of a language owned by the current thread.
+    """
+    parsers: Optional[Dict[str, Parser]] = getattr(_parsers, "parsers", None)
+    if parsers is None:
+        parsers = {}
+        _parsers.parsers = parsers
+    if language_name not in parsers:
+        parser = Parser()
+        parser.set_language(load_language(language_name))
+        parsers[language_name] = parser
+    return parsers[language_name]
+
+
+def load_query(language_name: str, query_text: str) -> tree_sitter.Query:
+    """
+    Compile a tree-sitter query. Each (language, query text) pair is compiled once per process.
+    """
+    language = load_language(language_name)
+    key = (language_name, query_text)
+    with _queries_lock:
+        if key not in _queries:
+            _queries[key] = language.query(query_text)
+        return _queries[key]
+
+
+# Utility functions for the process backend
+
+_summary_worker_analyzer: Optional[TSAnalyzer] = None
+
+
+def map_in_processes(
+    executor: concurrent.futures.Executor,
+    fn,
+    arguments: Iterable[Tuple],
+    max_pending: int,
+) -> Iterator[Tuple[Tuple, object]]:
+    """
+    Apply a function to the argument tuples in a process pool, in the order of the arguments.
+    Unlike executor.map, the arguments are consumed lazily and at most max_pending tasks are
+    in flight, so that the file contents sent to the workers are not all kept in memory at once.
+    :return: the pairs of the argument tuples and the results
+    """
+    pending = deque()
+    for args in arguments:
+        pending.append((args, executor.submit(fn, *args)))
+        if len(pending) >= max_pending:
+            args, future = pending.popleft()
+            yield args, future.result()
+    while len(pending) > 0:
+        args, future = pending.popleft()
+        yield args, future.result()
+
+
+def _init_summary_worker(analyzer_class: type, language_name: str) -> None:
+    """
+    Initialize a worker process with its own analyzer, grammar, and parser.
+    """
+    global _summary_worker_analyzer
+    analyzer = analyzer_class.__new__(analyzer_class)
+    TSAnalyzer._init_analysis_state(analyzer, {}, language_name, 1)
+    _summary_worker_analyzer = analyzer
+    return
+
+
+def _summarize_file_in_worker(file_path: str, source_code: str) -> Dict:
+    """
+    Summarize a single file in a worker process.
+    The analysis results are reset afterwards so that the worker keeps no trees alive.
+    """
+    analyzer = _summary_worker_analyzer
+    try:
+        return analyzer.summarize_file(file_path, source_code)
+    finally:
+        TSAnalyzer._init_analysis_state(analyzer, {}, analyzer.language_name, 1)
+
+
 # Utility functions for AST node type maching
 
 
 def find_all_nodes(root_node: tree_sitter.Node) -> List[tree_sitter.Node]:
     """
-    Recursively find all nodes in the tree starting at root_node.
+    Find all nodes in the tree starting at root_node in pre-order.
     """
     if root_node is None:
         return []
-    nodes = [root_node]
-    for child_node in root_node.children:
-        nodes.extend(find_all_nodes(child_node))
-    return nodes
+    return list(walk_nodes(root_node))
+
+
+def compute_tree_edit(old_source: bytes, new_source: bytes) -> Tuple:
+    """
+    Compute the single edit turning the old source into the new one,
+    i.e., the arguments of tree_sitter.Tree.edit.
+    The edit spans the region between the common prefix and the common suffix.
+    """
+    old_view = memoryview(old_source)
+    new_view = memoryview(new_source)
+    min_length = min(len(old_source), len(new_source))
+
+    # Binary search on the lengths of the common prefix and suffix, so that the
+    # comparisons run in C instead of a byte-wise Python loop
+    low, high = 0, min_length
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old_view[:middle] == new_view[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    prefix_length = low
+
+    low, high = 0, min_length - prefix_length
+    while low < high:
+        middle = (low + high + 1) // 2
+        if (
+            old_view[len(old_source) - middle :]
+            == new_view[len(new_source) - middle :]
+        ):
+            low = middle
+        else:
+            high = middle - 1
+    suffix_length = low
+
+    def byte_to_point(source: bytes, byte_offset: int) -> Tuple[int, int]:
+        row = source.count(b"\n", 0, byte_offset)
+        column = byte_offset - (source.rfind(b"\n", 0, byte_offset) + 1)
+        return (row, column)
+
+    start_byte = prefix_length
+    old_end_byte = len(old_source) - suffix_length
+    new_end_byte = len(new_source) - suffix_length
+    return (
+        start_byte,
+        old_end_byte,
+        new_end_byte,
+        byte_to_point(old_source, start_byte),
+        byte_to_point(old_source, old_end_byte),
+        byte_to_point(new_source, new_end_byte),
+    )
+
+
+def locate_node(
+    root_node: tree_sitter.Node, start_byte: int, end_byte: int, node_type: str
+) -> tree_sitter.Node:
+    """
+    Find the node of the given type spanning exactly the given byte range.
+    """
+    node = root_node.descendant_for_byte_range(start_byte, end_byte)
+    while (
+        node.type != node_type
+        and node.parent is not None
+        and node.parent.start_byte == start_byte
+        and node.parent.end_byte == end_byte
+    ):
+        node = node.parent
+    return node
 
 
 def find_nodes_by_type(
-    root_node: tree_sitter.Node, node_type: str, k=0
+    root_node: tree_sitter.Node, node_type: str
 ) -> List[tree_sitter.Node]:
     """
-    Recursively find all nodes of a given type.
+    Find all nodes of a given type in pre-order.
+    Use Function.find_nodes_by_type for the repeated queries on a function.
     """
-    nodes = []
-    if k > 100:
-        return []
-    if root_node.type == node_type:
-        nodes.append(root_node)
-    for child_node in root_node.children:
-        nodes.extend(find_nodes_by_type(child_node, node_type, k + 1))
-    return nodes
+    return [node for node in walk_nodes(root_node) if node.type == node_type]
  
\ No newline at end of file
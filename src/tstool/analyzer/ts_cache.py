@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.memory.syntactic.value import Value, ValueLabel
+from src.tstool.analyzer.ts_def_use import DefUseRecord
+from src.tstool.analyzer.ts_type_index import ClassInfo, FileScope
+
+# Bump this number whenever the layout of a file summary changes
+CACHE_FORMAT_VERSION = 5
+
+
+class TSAnalysisCache:
+    """
+    On-disk cache of per-file parsing results.
+    Each entry is keyed by the content hash of a source file, the grammar version,
+    and the analyzer producing the summary, so unchanged files can skip the node visitors.
+    """
+
+    _grammar_versions: Dict[str, str] = {}
+    _grammar_lock = threading.Lock()
+
+    def __init__(
+        self,
+        cache_dir: str,
+        language_name: str,
+        analyzer_name: str,
+        grammar_path: Path,
+    ) -> None:
+        """
+        :param cache_dir: the root directory of the cache
+        :param language_name: the programming language of the analyzed files
+        :param analyzer_name: the name of the analyzer class producing the summaries
+        :param grammar_path: the path of the tree-sitter grammar library
+        """
+        self.cache_dir = Path(cache_dir) / language_name
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.analyzer_name = analyzer_name
+        self.grammar_version = self.compute_grammar_version(grammar_path)
+        self.hit_num = 0
+        self.miss_num = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def compute_grammar_version(cls, grammar_path: Path) -> str:
+        """
+        Compute the version of the grammar library as the hash of its content.
+        :param grammar_path: the path of the tree-sitter grammar library
+        :return: the hex digest of the library
+        """
+        key = str(Path(grammar_path).resolve())
+        with cls._grammar_lock:
+            if key not in cls._grammar_versions:
+                digest = hashlib.sha256()
+                with open(key, "rb") as grammar_file:
+                    for chunk in iter(lambda: grammar_file.read(1 << 20), b""):
+                        digest.update(chunk)
+                cls._grammar_versions[key] = digest.hexdigest()
+            return cls._grammar_versions[key]
+
+    def get_key(self, source_code: str) -> str:
+        """
+        Compute the cache key of a source file.
+        :param source_code: the content of the source file
+        :return: the cache key
+        """
+        digest = hashlib.sha256()
+        digest.update(
+            f"{CACHE_FORMAT_VERSION}:{self.grammar_version}:{self.analyzer_name}:".encode(
+                "utf8"
+            )
+        )
+        digest.update(source_code.encode("utf8", errors="surrogatepass"))
+        return digest.hexdigest()
+
+    def __entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def load(self, source_code: str) -> Optional[Dict]:
+        """
+        Load the summary of a source file.
+        :param source_code: the content of the source file
+        :return: the cached summary, or None if the file has not been cached
+        """
+        entry_path = self.__entry_path(self.get_key(source_code))
+        summary = None
+        if entry_path.exists():
+            try:
+                with entry_path.open("r") as entry_file:
+                    summary = json.load(entry_file)
+            except (OSError, ValueError):
+                # A corrupted entry is treated as a miss and overwritten later
+                summary = None
+        with self._lock:
+            if summary is None:
+                self.miss_num += 1
+            else:
+                self.hit_num += 1
+        return summary
+
+    def store(self, source_code: str, summary: Dict) -> None:
+        """
+        Store the summary of a source file.
+        :param source_code: the content of the source file
+        :param summary: the summary of the file
+        """
+        entry_path = self.__entry_path(self.get_key(source_code))
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp_path.open("w") as entry_file:
+            json.dump(summary, entry_file)
+        # Atomic replacement so that concurrent runs never observe partial entries
+        os.replace(tmp_path, entry_path)
+        return
+
+
+# Utility functions for (de)serializing summaries
+
+
+def value_to_record(value: Value) -> List:
+    """
+    Convert a value to a JSON-serializable record.
+    The file of the value is not recorded, as files with the same content share an entry.
+    """
+    return [value.name, value.line_number, value.label.name, value.index]
+
+
+def record_to_value(record: List, file: str) -> Value:
+    """
+    Convert a JSON record back to a value.
+    :param record: the record
+    :param file: the file of the value, i.e., the file whose summary holds the record
+    """
+    name, line_number, label_name, index = record
+    return Value(name, line_number, ValueLabel[label_name], file, index)
+
+
+def to_tuple(obj):
+    """
+    Recursively convert JSON lists back to the tuples used by the analyzers.
+    """
+    if isinstance(obj, list):
+        return tuple(to_tuple(item) for item in obj)
+    return obj
+
+
+def statements_to_records(statements: Dict[Tuple, Tuple]) -> List:
+    """
+    Convert the if/loop statement tables of a function to JSON records.
+    """
+    return [[list(key), value] for key, value in statements.items()]
+
+
+def records_to_statements(records: List) -> Dict[Tuple, Tuple]:
+    """
+    Convert JSON records back to the if/loop statement tables of a function.
+    """
+    return {to_tuple(key): to_tuple(value) for key, value in records}
+
+
+def def_use_records_to_records(records: Iterable[DefUseRecord]) -> List:
+    """
+    Convert the def-use records of a function to JSON records.
+    """
+    return [list(record[:4]) + [list(record.used_names)] for record in records]
+
+
+def records_to_def_use_records(records: List) -> List[DefUseRecord]:
+    """
+    Convert JSON records back to the def-use records of a function.
+    """
+    return [
+        DefUseRecord(kind, name, line_number, text, tuple(used_names))
+        for kind, name, line_number, text, used_names in records
+    ]
+
+
+def file_scope_to_record(scope: FileScope) -> List:
+    """
+    Convert the scope of a file to a JSON-serializable record.
+    The file of the declared classes is not recorded, as files with the same content share an entry.
+    """
+    return [
+        scope.package,
+        list(scope.imports),
+        list(scope.wildcard_imports),
+        list(scope.static_imports),
+        [
+            [
+                class_info.qualified_name,
+                list(class_info.super_names),
+                [list(field_type) for field_type in class_info.field_types],
+            ]
+            for class_info in scope.classes
+        ],
+    ]
+
+
+def record_to_file_scope(record: List, file_path: str) -> FileScope:
+    """
+    Convert a JSON record back to the scope of a file.
+    :param record: the record
+    :param file_path: the file whose summary holds the record
+    """
+    package, imports, wildcard_imports, static_imports, classes = record
+    return FileScope(
+        package,
+        tuple(imports),
+        tuple(wildcard_imports),
+        tuple(static_imports),
+        tuple(
+            ClassInfo(qualified_name, file_path, tuple(super_names), to_tuple(field_types))
+            for qualified_name, super_names, field_types in classes
+        ),
+    )
@@ -0,0 +1,155 @@
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+
+class CallGraphQuery:
+    """
+    Memoized transitive queries over one direction of the call graph.
+    The strongly connected components (SCCs) are condensed once, so the unbounded
+    reachability of a function is shared by its whole SCC and computed once per SCC
+    by a search over the condensed graph, in time proportional to the output.
+    Bounded-depth queries run a breadth-first search with a visited set, and their
+    results are memoized per (function, depth).
+    """
+
+    def __init__(self, successors: Dict[int, Iterable[int]]) -> None:
+        """
+        :param successors: the adjacency of the graph, e.g., caller id --> callee ids
+        """
+        self.successors: Dict[int, Tuple[int, ...]] = {
+            node: tuple(sorted(set(nexts))) for node, nexts in successors.items()
+        }
+        self.component_ids: Dict[int, int] = {}
+        self.components: List[Tuple[int, ...]] = []
+        self.__condense()
+        self._component_reach: Dict[int, FrozenSet[int]] = {}
+        self._bounded_reach: Dict[Tuple[int, int], FrozenSet[int]] = {}
+        self._lock = threading.Lock()
+
+    def __condense(self) -> None:
+        """
+        Compute the SCCs with an iterative version of Tarjan's algorithm.
+        The components are numbered in reverse topological order, i.e., successors first.
+        """
+        nodes = set(self.successors)
+        for nexts in self.successors.values():
+            nodes.update(nexts)
+        indexes: Dict[int, int] = {}
+        low_links: Dict[int, int] = {}
+        stack: List[int] = []
+        on_stack: Set[int] = set()
+        counter = 0
+        for root in sorted(nodes):
+            if root in indexes:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, next_index = work.pop()
+                if next_index == 0:
+                    indexes[node] = low_links[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+                nexts = self.successors.get(node, ())
+                recursed = False
+                while next_index < len(nexts):
+                    next_node = nexts[next_index]
+                    next_index += 1
+                    if next_node not in indexes:
+                        work.append((node, next_index))
+                        work.append((next_node, 0))
+                        recursed = True
+                        break
+                    if next_node in on_stack:
+                        low_links[node] = min(low_links[node], indexes[next_node])
+                if recursed:
+                    continue
+                if low_links[node] == indexes[node]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        self.component_ids[member] = len(self.components)
+                        members.append(member)
+                        if member == node:
+                            break
+                    self.components.append(tuple(sorted(members)))
+                if work:
+                    parent = work[-1][0]
+                    low_links[parent] = min(low_links[parent], low_links[node])
+
+    def __is_cyclic(self, component_id: int) -> bool:
+        members = self.components[component_id]
+        return len(members) > 1 or members[0] in self.successors.get(members[0], ())
+
+    def reach(self, node: int, max_depth: Optional[int] = None) -> FrozenSet[int]:
+        """
+        Get the nodes reachable from a node via paths of 1 to max_depth edges.
+        :param node: the start node
+        :param max_depth: the maximal number of edges, unbounded if None
+        :return: the reachable nodes, including the start node only if it is on a cycle
+        """
+        if max_depth is not None and max_depth <= 0:
+            return frozenset()
+        if node not in self.component_ids:
+            return frozenset()
+        # A simple path never has more edges than the number of nodes
+        if max_depth is None or max_depth >= len(self.component_ids):
+            return self.__reach_unbounded(node)
+        with self._lock:
+            if (node, max_depth) in self._bounded_reach:
+                return self._bounded_reach[(node, max_depth)]
+        result = self.__reach_bounded(node, max_depth)
+        with self._lock:
+            self._bounded_reach[(node, max_depth)] = result
+        return result
+
+    def __reach_bounded(self, node: int, max_depth: int) -> FrozenSet[int]:
+        visited: Set[int] = set()
+        frontier = [node]
+        for _ in range(max_depth):
+            next_frontier = []
+            for current in frontier:
+                for next_node in self.successors.get(current, ()):
+                    if next_node not in visited:
+                        visited.add(next_node)
+                        next_frontier.append(next_node)
+            if len(next_frontier) == 0:
+                break
+            frontier = next_frontier
+        return frozenset(visited)
+
+    def __reach_unbounded(self, node: int) -> FrozenSet[int]:
+        """
+        Search the condensed graph from the component of the node.
+        Components whose reachability has been memoized are not expanded again.
+        """
+        target = self.component_ids[node]
+        with self._lock:
+            if target in self._component_reach:
+                return self._component_reach[target]
+
+        reachable: Set[int] = set()
+        if self.__is_cyclic(target):
+            reachable.update(self.components[target])
+        visited = {target}
+        work = [target]
+        while work:
+            component_id = work.pop()
+            for member in self.components[component_id]:
+                for next_node in self.successors.get(member, ()):
+                    next_component = self.component_ids[next_node]
+                    if next_component in visited:
+                        continue
+                    visited.add(next_component)
+                    reachable.update(self.components[next_component])
+                    # A single dictionary lookup is atomic, so the memo is read without the lock
+                    memoized = self._component_reach.get(next_component)
+                    if memoized is not None:
+                        reachable.update(memoized)
+                    else:
+                        work.append(next_component)
+        result = frozenset(reachable)
+        with self._lock:
+            self._component_reach[target] = result
+        return result
@@ -0,0 +1,188 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class ControlFlowGraph:
+    """
+    The intra-procedural control flow graph (CFG) of a function over basic blocks.
+    A block is a sequence of statements given by their (start line, end line), so the
+    graph does not hold any parse tree node and survives the release of the trees.
+    Block 0 is the entry and block 1 is the exit, which all the returns and the uncaught
+    throws flow into. The dominator and post-dominator trees, the reachability between
+    blocks, and the blocks of each line are computed on demand and memoized.
+    """
+
+    ENTRY = 0
+    EXIT = 1
+
+    def __init__(self) -> None:
+        self.blocks: List[List[Tuple[int, int]]] = [[], []]  # block id --> statement lines
+        self.successors: List[Set[int]] = [set(), set()]
+        self.predecessors: List[Set[int]] = [set(), set()]
+        self._line_blocks: Optional[Dict[int, List[Tuple[int, int]]]] = None
+        self._reach: Dict[int, Set[int]] = {}
+        self._dominator_tree: Optional[Dict[int, int]] = None
+        self._post_dominator_tree: Optional[Dict[int, int]] = None
+
+    # Construction
+
+    def add_block(self) -> int:
+        self.blocks.append([])
+        self.successors.append(set())
+        self.predecessors.append(set())
+        return len(self.blocks) - 1
+
+    def add_statement(self, block_id: int, start_line: int, end_line: int) -> None:
+        self.blocks[block_id].append((start_line, end_line))
+
+    def add_edge(self, src_block_id: int, dst_block_id: int) -> None:
+        self.successors[src_block_id].add(dst_block_id)
+        self.predecessors[dst_block_id].add(src_block_id)
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    # Queries
+
+    def get_blocks_at_line(self, line_number: int) -> List[Tuple[int, int]]:
+        """
+        :return: the (block id, statement index) of the statements covering the line
+        """
+        if self._line_blocks is None:
+            line_blocks: Dict[int, List[Tuple[int, int]]] = {}
+            for block_id, statements in enumerate(self.blocks):
+                for index, (start_line, end_line) in enumerate(statements):
+                    for line in range(start_line, end_line + 1):
+                        line_blocks.setdefault(line, []).append((block_id, index))
+            self._line_blocks = line_blocks
+        return self._line_blocks.get(line_number, [])
+
+    def get_reachable_blocks(self, block_id: int) -> Set[int]:
+        """
+        :return: the blocks reachable from a block via at least one edge
+        """
+        reach = self._reach.get(block_id)
+        if reach is not None:
+            return reach
+        reach = set()
+        work = [block_id]
+        while work:
+            for next_block_id in self.successors[work.pop()]:
+                if next_block_id not in reach:
+                    reach.add(next_block_id)
+                    work.append(next_block_id)
+        # A single dictionary assignment is atomic, so the memo is written without a lock
+        self._reach[block_id] = reach
+        return reach
+
+    def is_reachable(self, src_line_number: int, sink_line_number: int) -> bool:
+        """
+        Check if a statement at the sink line can execute after a statement at the source line.
+        Lines without statements, e.g., blank lines and braces, are conservatively reachable.
+        """
+        src_positions = self.get_blocks_at_line(src_line_number)
+        sink_positions = self.get_blocks_at_line(sink_line_number)
+        if len(src_positions) == 0 or len(sink_positions) == 0:
+            return True
+        for src_block_id, src_index in src_positions:
+            reach = self.get_reachable_blocks(src_block_id)
+            for sink_block_id, sink_index in sink_positions:
+                if sink_block_id in reach:
+                    return True
+                if sink_block_id == src_block_id and src_index <= sink_index:
+                    return True
+        return False
+
+    def get_dominator_tree(self) -> Dict[int, int]:
+        """
+        :return: the immediate dominators of the blocks reachable from the entry,
+                 where the entry is its own immediate dominator
+        """
+        if self._dominator_tree is None:
+            self._dominator_tree = _compute_immediate_dominators(
+                self.ENTRY, self.successors, self.predecessors
+            )
+        return self._dominator_tree
+
+    def get_post_dominator_tree(self) -> Dict[int, int]:
+        """
+        :return: the immediate post-dominators of the blocks reaching the exit,
+                 where the exit is its own immediate post-dominator
+        """
+        if self._post_dominator_tree is None:
+            self._post_dominator_tree = _compute_immediate_dominators(
+                self.EXIT, self.predecessors, self.successors
+            )
+        return self._post_dominator_tree
+
+    def dominates(self, block_id: int, other_block_id: int) -> bool:
+        """
+        Check if every path from the entry to the other block passes the block.
+        """
+        return _is_ancestor(self.get_dominator_tree(), block_id, other_block_id)
+
+    def post_dominates(self, block_id: int, other_block_id: int) -> bool:
+        """
+        Check if every path from the other block to the exit passes the block.
+        """
+        return _is_ancestor(self.get_post_dominator_tree(), block_id, other_block_id)
+
+
+def _compute_immediate_dominators(
+    root: int, successors: List[Set[int]], predecessors: List[Set[int]]
+) -> Dict[int, int]:
+    """
+    The iterative algorithm of Cooper, Harvey, and Kennedy over the reverse postorder.
+    """
+    postorder: List[int] = []
+    visited = {root}
+    work = [(root, iter(sorted(successors[root])))]
+    while work:
+        node, nexts = work[-1]
+        for next_node in nexts:
+            if next_node not in visited:
+                visited.add(next_node)
+                work.append((next_node, iter(sorted(successors[next_node]))))
+                break
+        else:
+            work.pop()
+            postorder.append(node)
+    postorder_indexes = {node: index for index, node in enumerate(postorder)}
+
+    immediate_dominators = {root: root}
+    is_changed = True
+    while is_changed:
+        is_changed = False
+        for node in reversed(postorder):
+            if node == root:
+                continue
+            new_dominator = None
+            for predecessor in predecessors[node]:
+                if predecessor not in immediate_dominators:
+                    continue
+                if new_dominator is None:
+                    new_dominator = predecessor
+                    continue
+                # Intersect the two dominator chains
+                finger1, finger2 = predecessor, new_dominator
+                while finger1 != finger2:
+                    while postorder_indexes[finger1] < postorder_indexes[finger2]:
+                        finger1 = immediate_dominators[finger1]
+                    while postorder_indexes[finger2] < postorder_indexes[finger1]:
+                        finger2 = immediate_dominators[finger2]
+                new_dominator = finger1
+            if immediate_dominators.get(node) != new_dominator:
+                immediate_dominators[node] = new_dominator
+                is_changed = True
+    return immediate_dominators
+
+
+def _is_ancestor(tree: Dict[int, int], ancestor: int, node: int) -> bool:
+    if node not in tree or ancestor not in tree:
+        return False
+    while True:
+        if node == ancestor:
+            return True
+        parent = tree[node]
+        if parent == node:
+            return False
+        node = parent
@@ -0,0 +1,250 @@
+import threading
+import weakref
+from enum import Enum
+from typing import List, Optional, Tuple
+
+
+class Parenthesis(Enum):
+    LEFT_PAR = -1
+    RIGHT_PAR = 1
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class ContextLabel:
+    """
+    An immutable label of a call site, which opens or closes a call in CFL-reachability.
+    The key (file name, line number, function id, parenthesis) and its hash are computed once.
+    """
+
+    __slots__ = (
+        "file_name",
+        "line_number",
+        "function_id",
+        "parenthesis",
+        "_key",
+        "_hash",
+    )
+
+    def __init__(
+        self,
+        file_name: str,
+        line_number: int,
+        function_id: int,
+        parenthesis: Parenthesis,
+    ):
+        key = (file_name, line_number, function_id, parenthesis)
+        object.__setattr__(self, "file_name", file_name)
+        object.__setattr__(self, "line_number", line_number)
+        object.__setattr__(self, "function_id", function_id)
+        object.__setattr__(self, "parenthesis", parenthesis)
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_hash", hash(key))
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"ContextLabel is immutable: cannot set {name}")
+
+    def __reduce__(self):
+        return (
+            ContextLabel,
+            (self.file_name, self.line_number, self.function_id, self.parenthesis),
+        )
+
+    def is_same_call_site(self, other: "ContextLabel") -> bool:
+        return self._key[:3] == other._key[:3]
+
+    def __eq__(self, other: "ContextLabel") -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, ContextLabel):
+            return NotImplemented
+        return self._hash == other._hash and self._key == other._key
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __str__(self) -> str:
+        return f"({self.file_name} {self.line_number} {self.function_id} {self.parenthesis})"
+
+
+class LabelStack:
+    """
+    A hash-consed persistent stack of context labels.
+    Equal stacks are the same object, so stacks are compared and hashed by identity,
+    and pushing or popping a label shares the rest of the stack in O(1).
+    The empty stack is represented by None.
+    """
+
+    __slots__ = ("label", "below", "depth", "__weakref__")
+
+    _stacks: "weakref.WeakValueDictionary" = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+
+    def __new__(cls, label: ContextLabel, below: Optional["LabelStack"] = None):
+        key = (label, below)
+        with cls._lock:
+            stack = cls._stacks.get(key)
+            if stack is None:
+                stack = object.__new__(cls)
+                object.__setattr__(stack, "label", label)
+                object.__setattr__(stack, "below", below)
+                object.__setattr__(stack, "depth", 1 if below is None else below.depth + 1)
+                cls._stacks[key] = stack
+        return stack
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"LabelStack is immutable: cannot set {name}")
+
+    def __reduce__(self):
+        return (LabelStack, (self.label, self.below))
+
+    @staticmethod
+    def to_list(stack: Optional["LabelStack"]) -> List[ContextLabel]:
+        """
+        :return: the labels of the stack from the bottom to the top
+        """
+        labels = []
+        while stack is not None:
+            labels.append(stack.label)
+            stack = stack.below
+        labels.reverse()
+        return labels
+
+    @staticmethod
+    def truncate(
+        stack: Optional["LabelStack"], k_limit: Optional[int]
+    ) -> Optional["LabelStack"]:
+        """
+        Keep the k_limit labels on the top of the stack, which takes O(k_limit) time.
+        """
+        if k_limit is None or stack is None or stack.depth <= k_limit:
+            return stack
+        labels = []
+        while len(labels) < k_limit:
+            labels.append(stack.label)
+            stack = stack.below
+        truncated = None
+        for label in reversed(labels):
+            truncated = LabelStack(label, truncated)
+        return truncated
+
+
+class CallContext:
+    """
+    An immutable, hash-consed calling context for CFL-reachability.
+    A context consists of the history of its labels and the stack of its unmatched labels,
+    both of which are persistent label stacks. Equal contexts are the same object, so
+    contexts are compared and hashed by identity in the dictionaries of the states.
+    Adding a label returns a new context in O(1) time, or O(k_limit) time if the contexts
+    are k-limited, i.e., only the k_limit most recent labels are kept.
+    """
+
+    __slots__ = ("is_backward", "k_limit", "history", "unmatched", "__weakref__")
+
+    _contexts: "weakref.WeakValueDictionary" = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+
+    def __new__(
+        cls,
+        is_backward: bool = True,
+        k_limit: Optional[int] = None,
+        history: Optional[LabelStack] = None,
+        unmatched: Optional[LabelStack] = None,
+    ):
+        """
+        :param is_backward: whether the context is used in backward analysis
+        :param k_limit: the maximal number of kept labels, unbounded if None
+        :param history: the stack of all the (kept) labels
+        :param unmatched: the stack of the unmatched labels
+        """
+        key = (is_backward, k_limit, history, unmatched)
+        with cls._lock:
+            context = cls._contexts.get(key)
+            if context is None:
+                context = object.__new__(cls)
+                object.__setattr__(context, "is_backward", is_backward)
+                object.__setattr__(context, "k_limit", k_limit)
+                object.__setattr__(context, "history", history)
+                object.__setattr__(context, "unmatched", unmatched)
+                cls._contexts[key] = context
+        return context
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"CallContext is immutable: cannot set {name}")
+
+    def __reduce__(self):
+        return (
+            CallContext,
+            (self.is_backward, self.k_limit, self.history, self.unmatched),
+        )
+
+    @property
+    def context(self) -> List[ContextLabel]:
+        return LabelStack.to_list(self.history)
+
+    @property
+    def simplified_context(self) -> List[ContextLabel]:
+        return LabelStack.to_list(self.unmatched)
+
+    def add_and_check_context(
+        self, label: ContextLabel
+    ) -> Tuple[bool, "CallContext"]:
+        """
+        Add a context entry to the context
+        :param label: the context label
+        :ret (True, the new context) if the context after adding the new context label is in the CFL reachable,
+             (False, self) otherwise
+        """
+        top_label = self.get_top_unmatched_context_label()
+
+        # Determine which labels to match based on analysis direction
+        first_label = (
+            Parenthesis.LEFT_PAR if not self.is_backward else Parenthesis.RIGHT_PAR
+        )
+        second_label = (
+            Parenthesis.RIGHT_PAR if not self.is_backward else Parenthesis.LEFT_PAR
+        )
+
+        # Check the label combinations
+        if (
+            top_label is not None
+            and top_label.parenthesis == first_label
+            and label.parenthesis == second_label
+        ):
+            if not top_label.is_same_call_site(label):
+                return False, self
+            unmatched = self.unmatched.below
+        else:
+            unmatched = LabelStack(label, self.unmatched)
+
+        history = LabelStack(label, self.history)
+        return True, CallContext(
+            self.is_backward,
+            self.k_limit,
+            LabelStack.truncate(history, self.k_limit),
+            LabelStack.truncate(unmatched, self.k_limit),
+        )
+
+    def get_top_unmatched_context_label(self) -> Optional[ContextLabel]:
+        """
+        Get the top unmatched context label.
+        :return: The top unmatched context label.
+        """
+        if self.unmatched is None:
+            return None
+        return self.unmatched.label
+
+    def __len__(self) -> int:
+        return 0 if self.history is None else self.history.depth
+
+    def __str__(self) -> str:
+        """
+        Convert the context to a string representation.
+        """
+        return f"{self.is_backward}" + " -> ".join(
+            [str(label) for label in self.context]
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,157 @@
+from itertools import chain, repeat
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# The number of nodes transposed at once, which must be a multiple of 8
+TRANSPOSE_BLOCK_SIZE = 8192
+
+
+class CSRCallGraph:
+    """
+    A compressed sparse row (CSR) adjacency of one direction of the call graph.
+    The nodes are renumbered densely in the order of their ids, so the successors of
+    the i-th node are indices[indptr[i]:indptr[i + 1]].
+    Reachability is computed for many sources at once: every node carries a bitset
+    over the sources, and one BFS level is a single gather and OR-reduction over the
+    incoming edges, which keeps the per-edge work inside NumPy.
+    """
+
+    def __init__(self, successors: Dict[int, Iterable[int]]) -> None:
+        """
+        :param successors: the adjacency of the graph, e.g., caller id --> callee ids
+        """
+        edge_sources = np.fromiter(
+            chain.from_iterable(
+                repeat(node, len(nexts)) for node, nexts in successors.items()
+            ),
+            dtype=np.int64,
+        )
+        edge_targets = np.fromiter(
+            chain.from_iterable(successors.values()), dtype=np.int64
+        )
+        self.node_ids = _sorted_unique(
+            np.concatenate([np.fromiter(successors, dtype=np.int64), edge_targets])
+        )
+        self.node_indexes: Dict[int, int] = dict(
+            zip(self.node_ids.tolist(), range(len(self.node_ids)))
+        )
+
+        # Deduplicate the edges and sort them by (source, target)
+        node_num = len(self.node_ids)
+        edge_keys = _sorted_unique(
+            np.searchsorted(self.node_ids, edge_sources) * node_num
+            + np.searchsorted(self.node_ids, edge_targets)
+        )
+        edge_sources, self.indices = np.divmod(edge_keys, max(node_num, 1))
+        degrees = np.bincount(edge_sources, minlength=node_num)
+        self.indptr = np.zeros(node_num + 1, dtype=np.int64)
+        np.cumsum(degrees, out=self.indptr[1:])
+
+        # The incoming edges grouped by their targets, used to propagate the bitsets
+        order = np.argsort(self.indices, kind="stable")
+        self._in_sources = edge_sources[order]
+        in_targets = self.indices[order]
+        group_starts = np.flatnonzero(np.diff(in_targets, prepend=-1))
+        self._in_group_starts = group_starts
+        self._in_group_targets = in_targets[group_starts]
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_num(self) -> int:
+        return len(self.indices)
+
+    def successors(self, node_id: int) -> List[int]:
+        """
+        :param node_id: the id of a node
+        :return: the ids of its direct successors
+        """
+        index = self.node_indexes.get(node_id)
+        if index is None:
+            return []
+        nexts = self.indices[self.indptr[index] : self.indptr[index + 1]]
+        return self.node_ids[nexts].tolist()
+
+    def reach_bitsets(
+        self, sources: Iterable[int], max_depth: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Compute the nodes reachable from every source via paths of 1 to max_depth edges.
+        :param sources: the ids of the source nodes
+        :param max_depth: the maximal number of edges, unbounded if None
+        :return: a uint8 array of shape (len(sources), ceil(len(self) / 8)), where row i is
+                 the bitset of the nodes reachable from the i-th source. Bit j, in the
+                 big-endian bit order of np.packbits, stands for node_ids[j].
+        """
+        source_ids = list(sources)
+        node_num = len(self.node_ids)
+        # visited[j] is the bitset of the sources that reach the j-th node, stored in
+        # 64-bit words so that each level touches as few array elements as possible
+        word_num = (len(source_ids) + 63) // 64
+        visited = np.zeros((node_num, word_num), dtype=np.uint64)
+        if node_num > 0 and len(source_ids) > 0:
+            frontier = np.zeros((node_num, word_num * 64), dtype=bool)
+            for source_index, source_id in enumerate(source_ids):
+                node_index = self.node_indexes.get(source_id)
+                if node_index is not None:
+                    frontier[node_index, source_index] = True
+            frontier = np.packbits(frontier, axis=1).view(np.uint64)
+
+            depth = node_num if max_depth is None else min(max_depth, node_num)
+            for _ in range(depth):
+                if len(self._in_sources) == 0:
+                    break
+                next_frontier = np.zeros_like(frontier)
+                next_frontier[self._in_group_targets] = np.bitwise_or.reduceat(
+                    frontier[self._in_sources], self._in_group_starts, axis=0
+                )
+                next_frontier &= ~visited
+                if not next_frontier.any():
+                    break
+                visited |= next_frontier
+                frontier = next_frontier
+
+        # Transpose the node-major bits to source-major bitsets block by block, which is
+        # much faster than transposing the whole bit matrix at once
+        bitsets = np.zeros((len(source_ids), (node_num + 7) // 8), dtype=np.uint8)
+        for start in range(0, node_num, TRANSPOSE_BLOCK_SIZE):
+            block = visited[start : start + TRANSPOSE_BLOCK_SIZE].view(np.uint8)
+            reached = np.unpackbits(block, axis=1, count=len(source_ids))
+            packed = np.packbits(reached.T, axis=1)
+            bitsets[:, start // 8 : start // 8 + packed.shape[1]] = packed
+        return bitsets
+
+    def decode_bitset(self, bitset: np.ndarray) -> List[int]:
+        """
+        :param bitset: one row returned by reach_bitsets
+        :return: the ids of the nodes in the bitset, in ascending order
+        """
+        bits = np.unpackbits(bitset, count=len(self.node_ids)).astype(bool)
+        return self.node_ids[bits].tolist()
+
+    def reach(
+        self, sources: Iterable[int], max_depth: Optional[int] = None
+    ) -> Dict[int, List[int]]:
+        """
+        :param sources: the ids of the source nodes
+        :param max_depth: the maximal number of edges, unbounded if None
+        :return: the mapping from each source id to the sorted ids of its reachable nodes
+        """
+        source_ids = list(sources)
+        bitsets = self.reach_bitsets(source_ids, max_depth)
+        return {
+            source_id: self.decode_bitset(bitset)
+            for source_id, bitset in zip(source_ids, bitsets)
+        }
+
+
+def _sorted_unique(values: np.ndarray) -> np.ndarray:
+    """
+    The sorted distinct values of an integer array, computed by sorting.
+    """
+    values = np.sort(values)
+    if len(values) == 0:
+        return values
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
@@ -0,0 +1,72 @@
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+
+class DefUseRecord(NamedTuple):
+    """
+    A definition or a use of a variable in a function.
+    """
+
+    kind: str  # "parameter", "declaration", "assignment", or "use"
+    name: str  # the variable, e.g., x or this.x
+    line_number: int
+    text: str  # the code of the definition or the use
+    used_names: Tuple[str, ...]  # the variables read by a definition
+
+
+DEFINITION_KINDS = {"parameter", "declaration", "assignment"}
+
+
+class DefUseIndex:
+    """
+    The definitions and uses of the variables in a function, indexed by variable and by line.
+    The declarations and the assignments of the whole function are rendered once,
+    and the definitions are indexed by the variables they read for forward slicing.
+    """
+
+    def __init__(self, records: Iterable[DefUseRecord]) -> None:
+        self.records: Tuple[DefUseRecord, ...] = tuple(
+            sorted(records, key=lambda record: (record.line_number, record.kind, record.name))
+        )
+        by_name: Dict[str, List[DefUseRecord]] = {}
+        by_line: Dict[int, List[DefUseRecord]] = {}
+        definitions_by_used_name: Dict[str, List[DefUseRecord]] = {}
+        for record in self.records:
+            by_name.setdefault(record.name, []).append(record)
+            by_line.setdefault(record.line_number, []).append(record)
+            if record.kind in DEFINITION_KINDS:
+                for used_name in set(record.used_names):
+                    definitions_by_used_name.setdefault(used_name, []).append(record)
+        self.by_name: Dict[str, Tuple[DefUseRecord, ...]] = {
+            name: tuple(records) for name, records in by_name.items()
+        }
+        self.by_line: Dict[int, Tuple[DefUseRecord, ...]] = {
+            line_number: tuple(records) for line_number, records in by_line.items()
+        }
+        self._definitions_by_used_name = definitions_by_used_name
+        self.declarations: List[str] = [
+            record.text for record in self.records if record.kind == "declaration"
+        ]
+        self.assignments: List[str] = [
+            record.text for record in self.records if record.kind == "assignment"
+        ]
+
+    def get_records_of_variable(self, name: str) -> Tuple[DefUseRecord, ...]:
+        return self.by_name.get(name, ())
+
+    def get_records_at_line(self, line_number: int) -> Tuple[DefUseRecord, ...]:
+        return self.by_line.get(line_number, ())
+
+    def get_forward_slice(self, names: Iterable[str]) -> List[DefUseRecord]:
+        """
+        Collect the records of some variables and of the variables defined from them transitively.
+        :param names: the variables
+        :return: the records in the order of their lines
+        """
+        reached_names: Set[str] = set(names)
+        work = list(reached_names)
+        while work:
+            for record in self._definitions_by_used_name.get(work.pop(), ()):
+                if record.name not in reached_names:
+                    reached_names.add(record.name)
+                    work.append(record.name)
+        return [record for record in self.records if record.name in reached_names]
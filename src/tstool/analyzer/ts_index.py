@@ -0,0 +1,131 @@
+from bisect import bisect_right
+from typing import Dict, Generic, Iterable, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class IntervalIndex(Generic[T]):
+    """
+    A static index of closed intervals answering which intervals contain a point.
+    The intervals are sorted by their starts, and a segment tree over this order keeps
+    the maximal end of each block of intervals. A query descends only into the blocks
+    starting before the point whose maximal end reaches the point, so it takes logarithmic
+    time per reported interval, regardless of how many intervals enclose the others.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[int, int, T]]) -> None:
+        """
+        :param intervals: the (start, end, item) triples, where both ends are inclusive
+        """
+        # Among the intervals with the same start, the inner ones come later
+        sorted_intervals = sorted(intervals, key=lambda interval: (interval[0], -interval[1]))
+        self.starts = [start for start, _, _ in sorted_intervals]
+        self.ends = [end for _, end, _ in sorted_intervals]
+        self.items = [item for _, _, item in sorted_intervals]
+        # The leaves of the segment tree start at leaf_offset, and node i has the children 2i and 2i + 1
+        self.leaf_offset = 1
+        while self.leaf_offset < len(self.items):
+            self.leaf_offset *= 2
+        self.max_ends: List[Optional[int]] = [None] * self.leaf_offset + self.ends
+        self.max_ends.extend([None] * (2 * self.leaf_offset - len(self.max_ends)))
+        for node in range(self.leaf_offset - 1, 0, -1):
+            child_ends = [end for end in self.max_ends[2 * node : 2 * node + 2] if end is not None]
+            self.max_ends[node] = max(child_ends) if len(child_ends) > 0 else None
+
+    def find(self, point: int) -> List[T]:
+        """
+        Find the items of the intervals containing a point.
+        :return: the items, where the innermost interval comes first
+        """
+        items = []
+        last_index = bisect_right(self.starts, point) - 1
+        if last_index < 0:
+            return items
+        # (node, index of the first interval in its block, number of the intervals in its block)
+        work = [(1, 0, self.leaf_offset)]
+        while work:
+            node, first_index, block_size = work.pop()
+            max_end = self.max_ends[node]
+            if first_index > last_index or max_end is None or max_end < point:
+                continue
+            if block_size == 1:
+                items.append(self.items[first_index])
+                continue
+            # The right block is visited first, so the later (inner) intervals come first
+            half_size = block_size // 2
+            work.append((2 * node, first_index, half_size))
+            work.append((2 * node + 1, first_index + half_size, half_size))
+        return items
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class ControlOrderIndex:
+    """
+    The branch and loop structure of a function, indexed by lines.
+    The true branches, the else branches, and the loop bodies are kept in interval
+    indexes, so checking whether one line can execute before another only looks up
+    the constructs enclosing the two lines, instead of scanning all the constructs.
+    """
+
+    def __init__(
+        self, if_statements: Dict[Tuple, Tuple], loop_statements: Dict[Tuple, Tuple]
+    ) -> None:
+        """
+        :param if_statements: the if statements of a function, see TSAnalyzer.get_if_statements
+        :param loop_statements: the loop statements of a function, see TSAnalyzer.get_loop_statements
+        """
+        true_branches = []
+        else_branches = []
+        for key, (_, _, _, true_branch, else_branch) in if_statements.items():
+            true_branches.append((true_branch[0], true_branch[1], key))
+            if else_branch[0] != 0 and else_branch[1] != 0:
+                else_branches.append((else_branch[0], else_branch[1], key))
+        self.true_branch_index: IntervalIndex[Tuple] = IntervalIndex(true_branches)
+        self.else_branch_index: IntervalIndex[Tuple] = IntervalIndex(else_branches)
+        self.loop_body_index: IntervalIndex[Tuple] = IntervalIndex(
+            (body_start, body_end, key)
+            for key, (_, _, _, body_start, body_end) in loop_statements.items()
+        )
+
+    def check_order(self, src_line_number: int, sink_line_number: int) -> bool:
+        """
+        Check if the source line could execute before the sink line.
+        """
+        return self.check_orders([(src_line_number, sink_line_number)])[0]
+
+    def check_orders(self, line_number_pairs: Iterable[Tuple[int, int]]) -> List[bool]:
+        """
+        Check many (source line, sink line) pairs, looking up each line once.
+        :return: whether each source line could execute before the sink line
+        """
+        true_branches: Dict[int, Set[Tuple]] = {}
+        else_branches: Dict[int, List[Tuple]] = {}
+        loop_bodies: Dict[int, Set[Tuple]] = {}
+        results = []
+        for src_line_number, sink_line_number in line_number_pairs:
+            if src_line_number == sink_line_number:
+                results.append(True)
+                continue
+
+            # The source and the sink are in the two branches of the same if statement
+            if src_line_number not in true_branches:
+                true_branches[src_line_number] = set(self.true_branch_index.find(src_line_number))
+            if sink_line_number not in else_branches:
+                else_branches[sink_line_number] = self.else_branch_index.find(sink_line_number)
+            if not true_branches[src_line_number].isdisjoint(else_branches[sink_line_number]):
+                results.append(False)
+                continue
+
+            # A later source executes before the sink only in another iteration of a shared loop
+            if src_line_number > sink_line_number:
+                for line_number in (src_line_number, sink_line_number):
+                    if line_number not in loop_bodies:
+                        loop_bodies[line_number] = set(self.loop_body_index.find(line_number))
+                results.append(
+                    not loop_bodies[src_line_number].isdisjoint(loop_bodies[sink_line_number])
+                )
+                continue
+            results.append(True)
+        return results
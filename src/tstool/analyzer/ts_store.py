@@ -0,0 +1,288 @@
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import tree_sitter
+
+# Estimated memory (in bytes) of a parse tree per byte of source code
+TREE_BYTES_PER_SOURCE_BYTE = 16
+
+
+class SourceFileStore(MutableMapping):
+    """
+    A lazy mapping from file paths to file contents.
+    Files are read through mmap on demand, and only a bounded number of bytes of
+    decoded contents are kept in memory. Contents assigned explicitly (e.g., the
+    new contents of changed files) are kept in memory until they are removed.
+    """
+
+    def __init__(
+        self, file_paths: Iterable[str], max_cached_bytes: int = 256 * 1024 * 1024
+    ) -> None:
+        """
+        :param file_paths: the paths of the files on disk
+        :param max_cached_bytes: the maximal total size of the decoded contents kept in memory
+        """
+        self.file_paths: Dict[str, None] = dict.fromkeys(file_paths)
+        self.max_cached_bytes = max_cached_bytes
+        self._overrides: Dict[str, str] = {}
+        self._contents: OrderedDict = OrderedDict()  # file path --> decoded content
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_directory(
+        cls, project_path: str, suffixes: List[str], **kwargs
+    ) -> "SourceFileStore":
+        """
+        Collect the files with the given suffixes (e.g., [".java"]) under a directory.
+        """
+        file_paths = sorted(
+            str(file_path)
+            for suffix in suffixes
+            for file_path in Path(project_path).rglob(f"*{suffix}")
+            if file_path.is_file()
+        )
+        return cls(file_paths, **kwargs)
+
+    @staticmethod
+    def read_file(file_path: str) -> str:
+        """
+        Read a file through mmap without building an intermediate bytes object.
+        Newlines are translated as in text mode, so the contents match open(file_path).read().
+        """
+        with open(file_path, "rb") as source_file:
+            if os.fstat(source_file.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(source_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                content = str(memoryview(mapped), "utf-8", "ignore")
+        if "\r" in content:
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+        return content
+
+    def __getitem__(self, file_path: str) -> str:
+        with self._lock:
+            if file_path in self._overrides:
+                return self._overrides[file_path]
+            if file_path not in self.file_paths:
+                raise KeyError(file_path)
+            if file_path in self._contents:
+                self._contents.move_to_end(file_path)
+                return self._contents[file_path]
+
+        content = self.read_file(file_path)
+
+        with self._lock:
+            if file_path not in self._contents and file_path in self.file_paths:
+                self._contents[file_path] = content
+                self._cached_bytes += len(content)
+                while (
+                    self._cached_bytes > self.max_cached_bytes
+                    and len(self._contents) > 1
+                ):
+                    _, evicted_content = self._contents.popitem(last=False)
+                    self._cached_bytes -= len(evicted_content)
+        return content
+
+    def __setitem__(self, file_path: str, content: str) -> None:
+        with self._lock:
+            self.file_paths[file_path] = None
+            self._overrides[file_path] = content
+            self.__drop_content(file_path)
+
+    def __delitem__(self, file_path: str) -> None:
+        with self._lock:
+            if file_path not in self.file_paths:
+                raise KeyError(file_path)
+            del self.file_paths[file_path]
+            self._overrides.pop(file_path, None)
+            self.__drop_content(file_path)
+
+    def __drop_content(self, file_path: str) -> None:
+        if file_path in self._contents:
+            self._cached_bytes -= len(self._contents.pop(file_path))
+
+    def __contains__(self, file_path: object) -> bool:
+        return file_path in self.file_paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.file_paths))
+
+    def __len__(self) -> int:
+        return len(self.file_paths)
+
+
+class ParseTreeCache(MutableMapping):
+    """
+    An LRU mapping from file paths to parse trees with a memory cap.
+    Evicted trees are re-parsed on demand by the reparse callback, and the eviction
+    callback lets the owner drop the nodes that would otherwise pin the evicted tree.
+    """
+
+    def __init__(
+        self,
+        max_memory: Optional[int],
+        reparse: Callable[[str], tree_sitter.Tree],
+        on_evict: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        """
+        :param max_memory: the maximal estimated memory (in bytes) of the resident trees. No limit if None.
+        :param reparse: the callback re-parsing the file of an evicted tree
+        :param on_evict: the callback invoked with the file path of an evicted tree
+        """
+        self.max_memory = max_memory
+        self.reparse = reparse
+        self.on_evict = on_evict
+        self.file_paths: Dict[str, None] = {}
+        self._trees: OrderedDict = OrderedDict()  # file path --> (tree, estimated size)
+        self._memory = 0
+        self.reparse_num = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def estimate_tree_memory(tree: tree_sitter.Tree) -> int:
+        return (tree.root_node.end_byte + 1) * TREE_BYTES_PER_SOURCE_BYTE
+
+    def __getitem__(self, file_path: str) -> tree_sitter.Tree:
+        with self._lock:
+            if file_path not in self.file_paths:
+                raise KeyError(file_path)
+            if file_path in self._trees:
+                self._trees.move_to_end(file_path)
+                return self._trees[file_path][0]
+        tree = self.reparse(file_path)
+        with self._lock:
+            self.reparse_num += 1
+            if file_path in self.file_paths and file_path not in self._trees:
+                self.__insert(file_path, tree)
+        return tree
+
+    def __setitem__(self, file_path: str, tree: tree_sitter.Tree) -> None:
+        with self._lock:
+            self.file_paths[file_path] = None
+            self.__remove(file_path)
+            self.__insert(file_path, tree)
+
+    def register(self, file_path: str) -> None:
+        """
+        Register a file whose tree is parsed by the reparse callback on first access.
+        A resident tree of the file is dropped, as it may be stale.
+        """
+        with self._lock:
+            self.file_paths[file_path] = None
+            self.__remove(file_path)
+
+    def __delitem__(self, file_path: str) -> None:
+        with self._lock:
+            if file_path not in self.file_paths:
+                raise KeyError(file_path)
+            del self.file_paths[file_path]
+            self.__remove(file_path)
+
+    def pop(self, file_path: str, *default):
+        """
+        Remove a file without re-parsing its tree if it has been evicted.
+        """
+        with self._lock:
+            if file_path not in self.file_paths:
+                if default:
+                    return default[0]
+                raise KeyError(file_path)
+            tree = self.peek(file_path)
+            del self[file_path]
+            return tree
+
+    def peek(self, file_path: str) -> Optional[tree_sitter.Tree]:
+        """
+        Get the resident tree of a file without re-parsing it.
+        """
+        with self._lock:
+            if file_path in self._trees:
+                return self._trees[file_path][0]
+            return None
+
+    def __insert(self, file_path: str, tree: tree_sitter.Tree) -> None:
+        size = self.estimate_tree_memory(tree)
+        self._trees[file_path] = (tree, size)
+        self._memory += size
+        if self.max_memory is None:
+            return
+        # The most recently inserted tree is always kept
+        while self._memory > self.max_memory and len(self._trees) > 1:
+            evicted_file_path, (_, evicted_size) = self._trees.popitem(last=False)
+            self._memory -= evicted_size
+            if self.on_evict is not None:
+                self.on_evict(evicted_file_path)
+
+    def __remove(self, file_path: str) -> None:
+        if file_path in self._trees:
+            _, size = self._trees.pop(file_path)
+            self._memory -= size
+
+    def __contains__(self, file_path: object) -> bool:
+        return file_path in self.file_paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.file_paths))
+
+    def __len__(self) -> int:
+        return len(self.file_paths)
+
+
+class LineIndex:
+    """
+    The offsets of the newlines in a file, which convert offsets to line numbers
+    by binary search instead of counting the newlines in the file prefix.
+    The offsets index the string of the file content, i.e., the same positions as
+    source_code[: offset].count("\n"). The content itself is not kept.
+    """
+
+    def __init__(self, source_code: str) -> None:
+        self.source_length = len(source_code)
+        self.newline_offsets = array("q")
+        offset = source_code.find("\n")
+        while offset != -1:
+            self.newline_offsets.append(offset)
+            offset = source_code.find("\n", offset + 1)
+
+    def get_line_number(self, offset: int) -> int:
+        """
+        Get the (1-based) line number of an offset.
+        """
+        return bisect_left(self.newline_offsets, offset) + 1
+
+    def get_line_numbers(self, offsets: Sequence[int]) -> List[int]:
+        """
+        Get the line numbers of a batch of offsets in a single merge pass over the newlines.
+        """
+        line_numbers = [0] * len(offsets)
+        newline_offsets = self.newline_offsets
+        newline_num = len(newline_offsets)
+        newline_index = 0
+        for query_index in sorted(range(len(offsets)), key=offsets.__getitem__):
+            offset = offsets[query_index]
+            while newline_index < newline_num and newline_offsets[newline_index] < offset:
+                newline_index += 1
+            line_numbers[query_index] = newline_index + 1
+        return line_numbers
+
+    def get_line_content(self, source_code: str, line_number: int) -> str:
+        """
+        Get the content of a (1-based) line without the newline, or "" if the line does not exist.
+        :param source_code: the file content from which the index is built
+        """
+        if line_number < 1 or line_number > len(self.newline_offsets) + 1:
+            return ""
+        start = 0 if line_number == 1 else self.newline_offsets[line_number - 2] + 1
+        end = (
+            self.source_length
+            if line_number == len(self.newline_offsets) + 1
+            else self.newline_offsets[line_number - 1]
+        )
+        return source_code[start:end]
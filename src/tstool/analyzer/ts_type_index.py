@@ -0,0 +1,185 @@
+import threading
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+
+
+class ClassInfo(NamedTuple):
+    """
+    The declaration of a class (or an interface, enum, record) in the project.
+    The type names are kept as written and resolved in the scope of the declaring file.
+    """
+
+    qualified_name: str
+    file_path: str
+    super_names: Tuple[str, ...]  # the extended and implemented types
+    field_types: Tuple[Tuple[str, str], ...]  # (field name, type name)
+
+
+class FileScope(NamedTuple):
+    """
+    The type-level facts of a source file that determine how type names are resolved.
+    """
+
+    package: str
+    imports: Tuple[str, ...]  # single-type imports, e.g., java.util.List
+    wildcard_imports: Tuple[str, ...]  # imported packages or classes, e.g., java.util
+    static_imports: Tuple[str, ...]  # classes whose members are statically imported
+    classes: Tuple[ClassInfo, ...]
+
+
+class TypeIndex:
+    """
+    The class hierarchy and the import scopes of the files in a project.
+    Type names are resolved to the qualified names of project classes via the declaring
+    file, the single-type imports, the package, and the wildcard imports, in this order.
+    Names that cannot be resolved are kept as external (library) types.
+    The transitive supertypes and subtypes are computed once after each update.
+    """
+
+    def __init__(self) -> None:
+        self._file_scopes: Dict[str, FileScope] = {}  # file path --> scope
+        self._classes: Dict[str, ClassInfo] = {}  # qualified name --> class
+        self._supertypes: Optional[Dict[str, FrozenSet[str]]] = None
+        self._subtypes: Optional[Dict[str, FrozenSet[str]]] = None
+        self._lock = threading.Lock()
+
+    def get_file_scope(self, file_path: str) -> Optional[FileScope]:
+        return self._file_scopes.get(file_path)
+
+    def get_class(self, qualified_name: str) -> Optional[ClassInfo]:
+        return self._classes.get(qualified_name)
+
+    def update_file(self, file_path: str, scope: FileScope) -> bool:
+        """
+        Replace the scope of a file.
+        :return: True if the scope differs from the previous one
+        """
+        with self._lock:
+            old_scope = self._file_scopes.get(file_path)
+            if old_scope == scope:
+                return False
+            self.__remove_classes(old_scope)
+            self._file_scopes[file_path] = scope
+            for class_info in scope.classes:
+                self._classes[class_info.qualified_name] = class_info
+            self._supertypes = None
+            self._subtypes = None
+        return True
+
+    def remove_file(self, file_path: str) -> bool:
+        """
+        :return: True if the file had a scope
+        """
+        with self._lock:
+            old_scope = self._file_scopes.pop(file_path, None)
+            if old_scope is None:
+                return False
+            self.__remove_classes(old_scope)
+            self._supertypes = None
+            self._subtypes = None
+        return True
+
+    def __remove_classes(self, scope: Optional[FileScope]) -> None:
+        if scope is None:
+            return
+        for class_info in scope.classes:
+            if self._classes.get(class_info.qualified_name) == class_info:
+                del self._classes[class_info.qualified_name]
+
+    def resolve_type(self, type_name: str, file_path: str) -> str:
+        """
+        Resolve a type name in the scope of a file.
+        :return: the qualified name of the project class, or the type name itself if it is external
+        """
+        if type_name in self._classes:
+            return type_name
+        if "." in type_name:
+            # A nested class referenced via its outer class, e.g., Outer.Inner
+            outer_name, inner_name = type_name.split(".", 1)
+            qualified_name = self.resolve_type(outer_name, file_path) + "." + inner_name
+            return qualified_name if qualified_name in self._classes else type_name
+
+        scope = self._file_scopes.get(file_path)
+        if scope is None:
+            return type_name
+        for class_info in scope.classes:
+            if class_info.qualified_name.rsplit(".", 1)[-1] == type_name:
+                return class_info.qualified_name
+        for imported_name in scope.imports:
+            if imported_name.rsplit(".", 1)[-1] == type_name:
+                return imported_name
+        qualified_name = type_name if scope.package == "" else f"{scope.package}.{type_name}"
+        if qualified_name in self._classes:
+            return qualified_name
+        for imported_package in scope.wildcard_imports:
+            qualified_name = f"{imported_package}.{type_name}"
+            if qualified_name in self._classes:
+                return qualified_name
+        return type_name
+
+    def get_supertypes(self, qualified_name: str) -> FrozenSet[str]:
+        """
+        :return: the transitive supertypes of a type, including itself and external types
+        """
+        self.__build_hierarchy()
+        return self._supertypes.get(qualified_name, frozenset([qualified_name]))
+
+    def get_subtypes(self, qualified_name: str) -> FrozenSet[str]:
+        """
+        :return: the transitive project subtypes of a (project or external) type, including itself
+        """
+        self.__build_hierarchy()
+        return self._subtypes.get(qualified_name, frozenset([qualified_name]))
+
+    def get_field_type(self, qualified_name: str, field_name: str) -> Optional[str]:
+        """
+        Find the resolved type of a field declared in a class or its project supertypes.
+        """
+        visited: Set[str] = set()
+        work = [qualified_name]
+        while work:
+            class_name = work.pop(0)
+            class_info = self._classes.get(class_name)
+            if class_name in visited or class_info is None:
+                continue
+            visited.add(class_name)
+            for name, type_name in class_info.field_types:
+                if name == field_name:
+                    return self.resolve_type(type_name, class_info.file_path)
+            work.extend(
+                self.resolve_type(super_name, class_info.file_path)
+                for super_name in class_info.super_names
+            )
+        return None
+
+    def __build_hierarchy(self) -> None:
+        if self._supertypes is not None:
+            return
+        with self._lock:
+            if self._supertypes is not None:
+                return
+            direct_supertypes: Dict[str, List[str]] = {
+                class_name: [
+                    self.resolve_type(super_name, class_info.file_path)
+                    for super_name in class_info.super_names
+                ]
+                for class_name, class_info in self._classes.items()
+            }
+            supertypes: Dict[str, FrozenSet[str]] = {}
+            for class_name in direct_supertypes:
+                visited = {class_name}
+                work = [class_name]
+                while work:
+                    for super_name in direct_supertypes.get(work.pop(), []):
+                        if super_name not in visited:
+                            visited.add(super_name)
+                            work.append(super_name)
+                supertypes[class_name] = frozenset(visited)
+
+            subtypes: Dict[str, Set[str]] = {}
+            for class_name, super_names in supertypes.items():
+                for super_name in super_names:
+                    subtypes.setdefault(super_name, {super_name}).add(class_name)
+            self._subtypes = {
+                type_name: frozenset(names) for type_name, names in subtypes.items()
+            }
+            self._supertypes = supertypes
@@ -2,7 +2,7 @@ import tree_sitter
 import argparse
 from typing import List
 
-from src.tstool.analyzer.TS_analyzer import find_nodes_by_type
+from src.tstool.analyzer.ts_analyzer import find_nodes_by_type
 from src.tstool.analyzer.Cpp_TS_analyzer import Cpp_TSAnalyzer
 from src.tstool.dfbscan_extractor.dfbscan_extractor import DFBScanExtractor
 from src.memory.syntactic.function import Function
@@ -28,8 +28,8 @@ class Cpp_MLK_Extractor(DFBScanExtractor):
         4. new
         5. getline
         """
-        nodes = find_nodes_by_type(root_node, "call_expression")
-        nodes.extend(find_nodes_by_type(root_node, "new_expression"))
+        nodes = function.find_nodes_by_type("call_expression")
+        nodes.extend(function.find_nodes_by_type("new_expression"))
         mem_allocations = {
             "malloc",
             "calloc",
@@ -47,14 +47,12 @@ class Cpp_MLK_Extractor(DFBScanExtractor):
             if node.type == "new_expression":
                 is_seed_node = True
             if node.type == "call_expression":
-                for child in node.children:
-                    if child.type == "identifier":
-                        name = source_code[child.start_byte : child.end_byte]
-                        if name in mem_allocations or name in spec_apis:
-                            is_seed_node = True
+                callee_name = self.ts_analyzer.get_call_site_fact(function, node).callee_name
+                if callee_name in mem_allocations or callee_name in spec_apis:
+                    is_seed_node = True
 
             if is_seed_node:
-                line_number = source_code[: node.start_byte].count("\n") + 1
+                line_number = self.ts_analyzer.get_line_number(file_path, node.start_byte)
                 name = source_code[node.start_byte : node.end_byte]
                 sources.append(Value(name, line_number, ValueLabel.SRC, file_path))
         return sources
@@ -73,22 +71,15 @@ class Cpp_MLK_Extractor(DFBScanExtractor):
         Extract the sinks for Memory Leak Detection from the source code.
         1. free
         """
-        nodes = find_nodes_by_type(root_node, "call_expression")
+        nodes = function.find_nodes_by_type("call_expression")
         mem_deallocations = {"free"}
         spec_apis = {}  # specific user-defined APIs that deallocate memory
         sinks = []
         for node in nodes:
-            is_sink_node = False
-            self.ts_analyzer.get_arguments_at_callsite
-            find_nodes_by_type(node, "argument")
-            for child in node.children:
-                if child.type == "identifier":
-                    name = source_code[child.start_byte : child.end_byte]
-                    if name in mem_deallocations or name in spec_apis:
-                        is_sink_node = True
-
-            if is_sink_node:
-                line_number = source_code[: node.start_byte].count("\n") + 1
+            call_site_fact = self.ts_analyzer.get_call_site_fact(function, node)
+            callee_name = call_site_fact.callee_name
+            if callee_name in mem_deallocations or callee_name in spec_apis:
+                line_number = call_site_fact.line_number
                 name = source_code[node.start_byte : node.end_byte]
                 sinks.append(Value(name, line_number, ValueLabel.SINK, file_path))
         return sinks
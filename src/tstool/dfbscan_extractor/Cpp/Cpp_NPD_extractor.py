@@ -1,7 +1,7 @@
 import tree_sitter
 import argparse
 
-from src.tstool.analyzer.TS_analyzer import find_nodes_by_type
+from src.tstool.analyzer.ts_analyzer import find_nodes_by_type
 from src.tstool.analyzer.Cpp_TS_analyzer import Cpp_TSAnalyzer
 from src.tstool.dfbscan_extractor.dfbscan_extractor import DFBScanExtractor
 from src.memory.syntactic.function import Function
@@ -20,28 +20,26 @@ class Cpp_NPD_Extractor(DFBScanExtractor):
         2. return NULL;
         3. (type)* ptr = NULL;
         """
-        nodes = find_nodes_by_type(root_node, "init_declarator")
-        nodes.extend(find_nodes_by_type(root_node, "assignment_expression"))
-        nodes.extend(find_nodes_by_type(root_node, "return_statement"))
-        nodes.extend(find_nodes_by_type(root_node, "call_expression"))
+        nodes = function.find_nodes_by_type("init_declarator")
+        nodes.extend(function.find_nodes_by_type("assignment_expression"))
+        nodes.extend(function.find_nodes_by_type("return_statement"))
+        nodes.extend(function.find_nodes_by_type("call_expression"))
 
         spec_apis = {"malloc"}  # specific user-defined APIs that can return NULL
         sources = []
         for node in nodes:
             is_seed_node = False
             if node.type == "call_expression":
-                for child in node.children:
-                    if child.type == "identifier":
-                        name = source_code[child.start_byte : child.end_byte]
-                        if name in spec_apis:
-                            is_seed_node = True
+                callee_name = self.ts_analyzer.get_call_site_fact(function, node).callee_name
+                if callee_name in spec_apis:
+                    is_seed_node = True
             else:
                 for child in node.children:
                     if child.type == "null":
                         is_seed_node = True
 
             if is_seed_node:
-                line_number = source_code[: node.start_byte].count("\n") + 1
+                line_number = self.ts_analyzer.get_line_number(file_path, node.start_byte)
                 name = source_code[node.start_byte : node.end_byte]
                 sources.append(Value(name, line_number, ValueLabel.SRC, file_path))
         return sources
@@ -56,15 +54,15 @@ class Cpp_NPD_Extractor(DFBScanExtractor):
         source_code = self.ts_analyzer.code_in_files[function.file_path]
         file_path = function.file_path
 
-        nodes = find_nodes_by_type(root_node, "pointer_expression")
-        nodes.extend(find_nodes_by_type(root_node, "field_expression"))
-        nodes.extend(find_nodes_by_type(root_node, "subscript_expression"))
+        nodes = function.find_nodes_by_type("pointer_expression")
+        nodes.extend(function.find_nodes_by_type("field_expression"))
+        nodes.extend(function.find_nodes_by_type("subscript_expression"))
         sinks = []
 
         for node in nodes:
             if node.type == "pointer_expression" and node.children[0].type != "*":
                 continue
-            line_number = source_code[: node.start_byte].count("\n") + 1
+            line_number = self.ts_analyzer.get_line_number(file_path, node.start_byte)
             name = source_code[node.start_byte : node.end_byte]
             sinks.append(Value(name, line_number, ValueLabel.SINK, file_path))
         return sinks
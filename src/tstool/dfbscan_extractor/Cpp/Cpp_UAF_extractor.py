@@ -1,4 +1,4 @@
-from src.tstool.analyzer.TS_analyzer import *
+from src.tstool.analyzer.ts_analyzer import *
 from src.tstool.analyzer.Cpp_TS_analyzer import *
 from src.tstool.dfbscan_extractor.dfbscan_extractor import *
 import tree_sitter
@@ -20,8 +20,8 @@ class Cpp_UAF_Extractor(DFBScanExtractor):
         Extract the sources for UAF Detection from the source code.
         1. free
         """
-        nodes = find_nodes_by_type(root_node, "call_expression")
-        nodes.extend(find_nodes_by_type(root_node, "delete_expression"))
+        nodes = function.find_nodes_by_type("call_expression")
+        nodes.extend(function.find_nodes_by_type("delete_expression"))
 
         free_functions = {"free", "ngx_destroy_black_list_link"}
         spec_apis = {}  # specific user-defined APIs
@@ -31,14 +31,12 @@ class Cpp_UAF_Extractor(DFBScanExtractor):
             if node.type == "delete_expression":
                 is_seed_node = True
             if node.type == "call_expression":
-                for child in node.children:
-                    if child.type == "identifier":
-                        name = source_code[child.start_byte : child.end_byte]
-                        if name in free_functions:
-                            is_seed_node = True
+                callee_name = self.ts_analyzer.get_call_site_fact(function, node).callee_name
+                if callee_name in free_functions:
+                    is_seed_node = True
             if is_seed_node:
                 name = source_code[node.start_byte : node.end_byte]
-                line_number = source_code[: node.start_byte].count("\n") + 1
+                line_number = self.ts_analyzer.get_line_number(file_path, node.start_byte)
                 sources.append(Value(name, line_number, ValueLabel.SRC, file_path))
         return sources
 
@@ -56,15 +54,15 @@ class Cpp_UAF_Extractor(DFBScanExtractor):
         Extract the sinks for UAF Detection from the source code.
         1. dereference
         """
-        nodes = find_nodes_by_type(root_node, "pointer_expression")
-        nodes.extend(find_nodes_by_type(root_node, "field_expression"))
-        nodes.extend(find_nodes_by_type(root_node, "delete_expression"))
+        nodes = function.find_nodes_by_type("pointer_expression")
+        nodes.extend(function.find_nodes_by_type("field_expression"))
+        nodes.extend(function.find_nodes_by_type("delete_expression"))
         sinks = []
 
         for node in nodes:
             if node.type == "pointer_expression" and node.children[0].type != "*":
                 continue
-            line_number = source_code[: node.start_byte].count("\n") + 1
+            line_number = self.ts_analyzer.get_line_number(file_path, node.start_byte)
             name = source_code[node.start_byte : node.end_byte]
             sinks.append(Value(name, line_number, ValueLabel.SINK, file_path))
         return sinks
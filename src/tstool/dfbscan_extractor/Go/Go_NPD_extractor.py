@@ -3,7 +3,7 @@ from typing import Set, Tuple, List, Dict
 from src.tstool.dfbscan_extractor.dfbscan_extractor import *
 from src.memory.syntactic.function import Function
 from src.memory.syntactic.value import Value, ValueLabel
-from src.tstool.analyzer.TS_analyzer import find_nodes_by_type
+from src.tstool.analyzer.ts_analyzer import find_nodes_by_type
 from src.tstool.analyzer.Go_TS_analyzer import *
 import tree_sitter
 import argparse
@@ -17,10 +17,10 @@ class Go_NPD_Extractor(DFBScanExtractor):
         sources = []
 
         ## Case I: Nil value from uninitialized variables
-        var_declaration_nodes = find_nodes_by_type(root_node, "var_declaration")
+        var_declaration_nodes = function.find_nodes_by_type("var_declaration")
         for node in var_declaration_nodes:
             if len(find_nodes_by_type(node, "=")) == 0:
-                line_number = source_code[: node.start_byte].count("\n") + 1
+                line_number = self.ts_analyzer.get_line_number(file_path, node.start_byte)
                 for sub_node in node.children:
                     if sub_node.type == "var_spec":
                         for sub_sub_node in sub_node.children:
@@ -33,9 +33,9 @@ class Go_NPD_Extractor(DFBScanExtractor):
                                 )
 
         ## Case II: Nil value from literal nil nodes
-        literal_nil_nodes = find_nodes_by_type(root_node, "nil")
+        literal_nil_nodes = function.find_nodes_by_type("nil")
         for node in literal_nil_nodes:
-            line_number = source_code[: node.start_byte].count("\n") + 1
+            line_number = self.ts_analyzer.get_line_number(file_path, node.start_byte)
             name = source_code[node.start_byte : node.end_byte]
             sources.append(Value(name, line_number, ValueLabel.SRC, file_path, -1))
         return sources
@@ -58,19 +58,19 @@ class Go_NPD_Extractor(DFBScanExtractor):
             "index_expression",
             "slice_expression",
         ]:
-            for node in find_nodes_by_type(root_node, node_type):
+            for node in function.find_nodes_by_type(node_type):
                 first_child = node.children[0]
                 sink_nodes.append(first_child)
                 break
 
-        for node in find_nodes_by_type(root_node, "unary_expression"):
+        for node in function.find_nodes_by_type("unary_expression"):
             first_child = node.children[0]
             second_child = node.children[1]
             if first_child.type == "*":
                 sink_nodes.append(second_child)
 
         for node in sink_nodes:
-            line_number = source_code[: node.start_byte].count("\n") + 1
+            line_number = self.ts_analyzer.get_line_number(file_path, node.start_byte)
             name = source_code[node.start_byte : node.end_byte]
             sinks.append(Value(name, line_number, ValueLabel.SINK, file_path, -1))
         return sinks
@@ -1,4 +1,4 @@
-from src.tstool.analyzer.TS_analyzer import *
+from src.tstool.analyzer.ts_analyzer import *
 from src.tstool.analyzer.Java_TS_analyzer import *
 from src.tstool.dfbscan_extractor.dfbscan_extractor import DFBScanExtractor
 from src.memory.syntactic.value import Value, ValueLabel
@@ -6,21 +6,11 @@ import tree_sitter
 from pathlib import Path
 
 class Java_CWE20_extractor(DFBScanExtractor):
-    def __init__(self, ts_analyzer: TSAnalyzer) -> None:
-        super().__init__(ts_analyzer)
-        self.java_parser = tree_sitter.Parser()
-        
-        # Correctly calculate the path to the language library
-        cwd = Path(__file__).resolve().parent.absolute()
-        language_path = cwd / "../../../../lib/build/my-languages.so"
-        java_lang = tree_sitter.Language(str(language_path), "java")
-        
-        self.java_parser.set_language(java_lang)
-
     def extract_all(self):
         """
-        Overrides the base implementation to directly parse ASTs for sources and sinks,
+        Overrides the base implementation to directly query the ASTs for sources and sinks,
         bypassing the pre-processed function_env for greater accuracy.
+        The trees are those parsed by the analyzer, so no file is parsed again.
         """
         sources = []
         sinks = []
@@ -37,26 +27,35 @@ class Java_CWE20_extractor(DFBScanExtractor):
           body: (class_body) @class_body
         )
         """
-        class_query = self.ts_analyzer.language.query(class_query_str)
+        class_query = self.ts_analyzer.get_query(class_query_str)
+
+        # Query to find the 'deserialze' method within a class
+        method_query_str = """
+        (method_declaration
+          name: (identifier) @mname
+          parameters: (formal_parameters) @params
+          body: (block) @mbody
+          (#eq? @mname "deserialze")
+        )
+        """
+        method_query = self.ts_analyzer.get_query(method_query_str)
+
+        # Query to find 'parseArray' calls within the method
+        sink_query_str = """
+        (method_invocation
+          name: (identifier) @sink_name
+          (#eq? @sink_name "parseArray")
+        ) @sink_invocation
+        """
+        sink_query = self.ts_analyzer.get_query(sink_query_str)
 
         for file_path, source_code in self.ts_analyzer.code_in_files.items():
-            tree = self.java_parser.parse(bytes(source_code, "utf8"))
+            tree = self.ts_analyzer.parse_trees[file_path]
             captures = class_query.captures(tree.root_node)
 
             for node, name in captures:
                 if name == "class_body":
                     class_body_node = node
-                    
-                    # Query to find the 'deserialze' method within this class
-                    method_query_str = """
-                    (method_declaration
-                      name: (identifier) @mname
-                      parameters: (formal_parameters) @params
-                      body: (block) @mbody
-                      (#eq? @mname "deserialze")
-                    )
-                    """
-                    method_query = self.ts_analyzer.language.query(method_query_str)
                     method_captures = method_query.captures(class_body_node)
 
                     deserialze_method_body = None
@@ -74,14 +73,6 @@ class Java_CWE20_extractor(DFBScanExtractor):
                             deserialze_method_body = m_node
 
                     if deserialze_method_body:
-                        # Query to find 'parseArray' calls within the method
-                        sink_query_str = """
-                        (method_invocation
-                          name: (identifier) @sink_name
-                          (#eq? @sink_name "parseArray")
-                        ) @sink_invocation
-                        """
-                        sink_query = self.ts_analyzer.language.query(sink_query_str)
                         sink_captures = sink_query.captures(deserialze_method_body)
 
                         for s_node, s_name in sink_captures:
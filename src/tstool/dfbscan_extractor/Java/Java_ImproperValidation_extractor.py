@@ -3,7 +3,7 @@ from os import path
 
 sys.path.append(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
 
-from src.tstool.analyzer.TS_analyzer import *
+from src.tstool.analyzer.ts_analyzer import *
 from src.tstool.analyzer.Java_TS_analyzer import *
 from src.tstool.dfbscan_extractor.dfbscan_extractor import DFBScanExtractor
 from src.memory.syntactic.value import Value, ValueLabel
@@ -13,14 +13,6 @@ from pathlib import Path
 class Java_ImproperValidation_extractor(DFBScanExtractor):
     def __init__(self, ts_analyzer: TSAnalyzer) -> None:
         super().__init__(ts_analyzer)
-        self.java_parser = tree_sitter.Parser()
-        
-        # Correctly calculate the path to the language library
-        cwd = Path(__file__).resolve().parent.absolute()
-        language_path = cwd / "../../../../lib/build/my-languages.so"
-        java_lang = tree_sitter.Language(str(language_path), "java")
-        
-        self.java_parser.set_language(java_lang)
         self.extractor_name = "Java_ImproperValidation_extractor"
 
     def extract_sources(self) -> List[Value]:
@@ -39,7 +31,7 @@ class Java_ImproperValidation_extractor(DFBScanExtractor):
            (#eq? @mname "deserialze")
         )
         """
-        query = self.ts_analyzer.language.query(query_str)
+        query = self.ts_analyzer.get_query(query_str)
         for file_path, tree in self.ts_analyzer.parse_trees.items():
             captures = query.captures(tree.root_node)
             for node, name in captures:
@@ -63,7 +55,7 @@ class Java_ImproperValidation_extractor(DFBScanExtractor):
             (#eq? @method_name "parseArray")
         ) @invocation
         """
-        query = self.ts_analyzer.language.query(query_str)
+        query = self.ts_analyzer.get_query(query_str)
         captures = query.captures(function_node.parse_tree_root_node)
 
         for node, name in captures:
@@ -3,7 +3,7 @@ from typing import Set, Tuple, List, Dict
 from src.tstool.dfbscan_extractor.dfbscan_extractor import *
 from src.memory.syntactic.function import Function
 from src.memory.syntactic.value import Value, ValueLabel
-from src.tstool.analyzer.TS_analyzer import find_nodes_by_type
+from src.tstool.analyzer.ts_analyzer import find_nodes_by_type
 from src.tstool.analyzer.Java_TS_analyzer import *
 import tree_sitter
 import argparse
@@ -19,11 +19,11 @@ class Java_NPD_Extractor(DFBScanExtractor):
         Extract the potential null values as sources from the java source code.
         1. ptr = NULL;
         """
-        null_value_nodes = find_nodes_by_type(root_node, "null_literal")
+        null_value_nodes = function.find_nodes_by_type("null_literal")
 
         sources = []
         for node in null_value_nodes:
-            line_number = source_code[: node.start_byte].count("\n") + 1
+            line_number = self.ts_analyzer.get_line_number(file_path, node.start_byte)
             name = source_code[node.start_byte : node.end_byte]
             sources.append(Value(name, line_number, ValueLabel.SRC, file_path))
         return sources
@@ -38,8 +38,8 @@ class Java_NPD_Extractor(DFBScanExtractor):
         source_code = self.ts_analyzer.code_in_files[function.file_path]
         file_path = function.file_path
 
-        nodes = find_nodes_by_type(root_node, "method_invocation")
-        nodes.extend(find_nodes_by_type(root_node, "field_access"))
+        nodes = function.find_nodes_by_type("method_invocation")
+        nodes.extend(function.find_nodes_by_type("field_access"))
         sinks = []
 
         for node in nodes:
@@ -48,7 +48,7 @@ class Java_NPD_Extractor(DFBScanExtractor):
                 continue
             index = children_types.index(".")
             child = node.children[index - 1]
-            line_number = source_code[: child.start_byte].count("\n") + 1
+            line_number = self.ts_analyzer.get_line_number(file_path, child.start_byte)
             name = source_code[child.start_byte : child.end_byte]
             sinks.append(Value(name, line_number, ValueLabel.SINK, file_path))
         return sinks
@@ -4,7 +4,7 @@ from tree_sitter import Node
 from src.tstool.dfbscan_extractor.dfbscan_extractor import *
 from src.memory.syntactic.function import Function
 from src.memory.syntactic.value import Value, ValueLabel
-from src.tstool.analyzer.TS_analyzer import find_nodes_by_type
+from src.tstool.analyzer.ts_analyzer import find_nodes_by_type
 from src.tstool.analyzer.Python_TS_analyzer import *
 import tree_sitter
 import argparse
@@ -15,11 +15,11 @@ class Python_NPD_Extractor(DFBScanExtractor):
         root_node = function.parse_tree_root_node
         source_code = self.ts_analyzer.code_in_files[function.file_path]
         file_path = function.file_path
-        null_value_nodes = find_nodes_by_type(root_node, "none")
+        null_value_nodes = function.find_nodes_by_type("none")
 
         sources = []
         for node in null_value_nodes:
-            line_number = source_code[: node.start_byte].count("\n") + 1
+            line_number = self.ts_analyzer.get_line_number(file_path, node.start_byte)
             name = source_code[node.start_byte : node.end_byte]
             sources.append(Value(name, line_number, ValueLabel.SRC, file_path))
         return sources
@@ -34,13 +34,13 @@ class Python_NPD_Extractor(DFBScanExtractor):
         source_code = self.ts_analyzer.code_in_files[function.file_path]
         file_path = function.file_path
 
-        nodes = find_nodes_by_type(root_node, "attribute")
-        nodes.extend(find_nodes_by_type(root_node, "subscript"))
+        nodes = function.find_nodes_by_type("attribute")
+        nodes.extend(function.find_nodes_by_type("subscript"))
         sinks = []
 
         for node in nodes:
             first_child = node.children[0]
-            line_number = source_code[: first_child.start_byte].count("\n") + 1
+            line_number = self.ts_analyzer.get_line_number(file_path, first_child.start_byte)
             name = source_code[first_child.start_byte : first_child.end_byte]
             sinks.append(Value(name, line_number, ValueLabel.SINK, file_path, -1))
         return sinks
@@ -1,8 +1,9 @@
 import sys
 import os
+import concurrent.futures
 from os import path
 from pathlib import Path
-from src.tstool.analyzer.TS_analyzer import *
+from src.tstool.analyzer.ts_analyzer import *
 from src.memory.syntactic.function import *
 from src.memory.syntactic.value import *
 import tree_sitter
@@ -24,22 +25,34 @@ class DFBScanExtractor(ABC):
         self.sinks = []
         return
 
-    def extract_all(self):
+    def extract_all(self, max_workers: Optional[int] = None):
         """
         Start the source/sink extraction process.
+        :param max_workers: the number of the worker processes, which only applies to the process backend
+                            of the analyzer, the number of its symbolic workers if None.
+                            The result does not depend on it.
         """
-        pbar = tqdm(total=len(self.ts_analyzer.function_env), desc="Parsing files")
-        for function_id in self.ts_analyzer.function_env:
-            pbar.update(1)
-            function: Function = self.ts_analyzer.function_env[function_id]
-            if "test" in function.file_path or "example" in function.file_path:
-                continue
-            file_content = self.ts_analyzer.code_in_files[function.file_path]
-            function_root_node = function.parse_tree_root_node
-            self.sources.extend(self.extract_sources(function))
-            self.sinks.extend(self.extract_sinks(function))
+        extract_in_parallel(self.ts_analyzer, [self], max_workers)
         return self.sources, self.sinks
 
+    def __getstate__(self) -> Dict:
+        """
+        Drop the analyzer and the results when an extractor is sent to a worker process,
+        which attaches its own analyzer.
+        """
+        state = dict(self.__dict__)
+        state["ts_analyzer"] = None
+        state["sources"] = []
+        state["sinks"] = []
+        return state
+
+    @staticmethod
+    def is_excluded(function: Function) -> bool:
+        """
+        Check if a function is in test or example code, which is not scanned.
+        """
+        return "test" in function.file_path or "example" in function.file_path
+
     @abstractmethod
     def extract_sources(self, function: Function) -> List[Value]:
         """
@@ -57,3 +70,188 @@ class DFBScanExtractor(ABC):
         :return: A list of the sinks in the ast tree of which the root is root_node.
         """
         pass
+
+
+class DFBScanMultiExtractor:
+    """
+    Run the extractors of several bug types in a single traversal of the functions.
+    All the extractors of a function run back to back, so they share the node buckets
+    of Function.find_nodes_by_type, which are built once per function, and a parse tree
+    evicted under a memory budget is re-parsed at most once for all the bug types.
+    The extractors overriding extract_all, e.g., the project-level ones, run on their own.
+    """
+
+    def __init__(self, extractors: Dict[str, DFBScanExtractor]):
+        """
+        :param extractors: the mapping from the bug types to their extractors,
+                           which must share the same analyzer
+        """
+        self.extractors = extractors
+        analyzers = {id(extractor.ts_analyzer): extractor.ts_analyzer for extractor in extractors.values()}
+        if len(analyzers) != 1:
+            raise ValueError("The extractors must share the same TSAnalyzer")
+        self.ts_analyzer: TSAnalyzer = next(iter(analyzers.values()))
+        return
+
+    def extract_all(
+        self, max_workers: Optional[int] = None
+    ) -> Dict[str, Tuple[List[Value], List[Value]]]:
+        """
+        Start the source/sink extraction process for all the bug types.
+        :param max_workers: the number of the worker processes, which only applies to the process backend
+                            of the analyzer, the number of its symbolic workers if None
+        :return: the mapping from each bug type to its sources and sinks
+        """
+        # The extractors overriding extract_all scan the project in their own ways,
+        # and may return their results without storing them in sources and sinks
+        results: Dict[str, Tuple[List[Value], List[Value]]] = {}
+        per_function_extractors = []
+        for bug_type, extractor in self.extractors.items():
+            if type(extractor).extract_all is DFBScanExtractor.extract_all:
+                per_function_extractors.append(extractor)
+            else:
+                results[bug_type] = extractor.extract_all()
+        extract_in_parallel(self.ts_analyzer, per_function_extractors, max_workers)
+        return {
+            bug_type: results.get(bug_type, (extractor.sources, extractor.sinks))
+            for bug_type, extractor in self.extractors.items()
+        }
+
+
+def extract_in_parallel(
+    ts_analyzer: TSAnalyzer,
+    extractors: List[DFBScanExtractor],
+    max_workers: Optional[int] = None,
+) -> None:
+    """
+    Run the per-function extraction of some extractors over the functions of a project.
+    The extractors are pure Python traversals, which threads cannot run in parallel.
+    So the functions are extracted in the analyzer's process, unless the analyzer uses the
+    process backend, where the files are sharded over worker processes parsing their own trees.
+    The file contents are read lazily and only a bounded number of files are in flight.
+    The sources and sinks are appended to the extractors in the order of the function locations
+    (file path, start line, end line), which, unlike the order of function_env and the function ids,
+    does not depend on the order of parsing either, so the result is deterministic.
+    :param ts_analyzer: the analyzer shared by the extractors
+    :param extractors: the extractors
+    :param max_workers: the number of the worker processes, which only applies to the process backend,
+                        the number of the symbolic workers of the analyzer if None
+    """
+    if len(extractors) == 0:
+        return
+    if max_workers is None:
+        max_workers = ts_analyzer.max_symbolic_workers_num
+    elif max_workers > 1 and ts_analyzer.symbolic_backend != "process":
+        raise ValueError("Extraction workers need the process backend of the analyzer")
+    function_ids = sorted(
+        (
+            function_id
+            for function_id, function in ts_analyzer.function_env.items()
+            if not DFBScanExtractor.is_excluded(function)
+        ),
+        key=lambda function_id: (
+            ts_analyzer.function_env[function_id].file_path,
+            ts_analyzer.function_env[function_id].start_line_number,
+            ts_analyzer.function_env[function_id].end_line_number,
+            function_id,
+        ),
+    )
+    shards: Dict[str, List[int]] = {}
+    for function_id in function_ids:
+        shards.setdefault(ts_analyzer.function_env[function_id].file_path, []).append(function_id)
+
+    function_results: List[List[Tuple[List[Value], List[Value]]]] = []
+    pbar = tqdm(total=len(function_ids), desc="Extracting sources and sinks")
+    if max_workers <= 1 or ts_analyzer.symbolic_backend != "process":
+        for function_id in function_ids:
+            function = ts_analyzer.function_env[function_id]
+            function_results.append(
+                [
+                    (extractor.extract_sources(function), extractor.extract_sinks(function))
+                    for extractor in extractors
+                ]
+            )
+            pbar.update(1)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_extraction_worker,
+            initargs=(type(ts_analyzer), ts_analyzer.language_name, extractors),
+        ) as executor:
+            # Results are collected in the order of the files
+            for (file_path, _), file_results in map_in_processes(
+                executor,
+                _extract_file_in_worker,
+                ((file_path, ts_analyzer.code_in_files[file_path]) for file_path in shards),
+                max_workers * 4,
+            ):
+                if len(file_results) != len(shards[file_path]):
+                    raise RuntimeError(f"Inconsistent functions of {file_path} in the worker process")
+                function_results.extend(file_results)
+                pbar.update(len(file_results))
+    pbar.close()
+
+    for results in function_results:
+        for extractor, (sources, sinks) in zip(extractors, results):
+            extractor.sources.extend(sources)
+            extractor.sinks.extend(sinks)
+    return
+
+
+# Utility functions for the process backend
+
+_extraction_worker_analyzer: Optional[TSAnalyzer] = None
+_extraction_worker_extractors: List[DFBScanExtractor] = []
+
+
+def _init_extraction_worker(
+    analyzer_class: type, language_name: str, extractors: List[DFBScanExtractor]
+) -> None:
+    """
+    Initialize a worker process with its own analyzer, which the extractors are attached to.
+    """
+    global _extraction_worker_analyzer, _extraction_worker_extractors
+    analyzer = analyzer_class.__new__(analyzer_class)
+    TSAnalyzer._init_analysis_state(analyzer, {}, language_name, 1)
+    for extractor in extractors:
+        extractor.ts_analyzer = analyzer
+    _extraction_worker_analyzer = analyzer
+    _extraction_worker_extractors = extractors
+    return
+
+
+def _extract_file_in_worker(
+    file_path: str, source_code: str
+) -> List[List[Tuple[List[Value], List[Value]]]]:
+    """
+    Extract the sources and sinks of the functions in a single file in a worker process.
+    The analysis results are reset afterwards so that the worker keeps no trees alive.
+    :return: the sources and sinks of each extractor for each function, in the order of the function locations
+    """
+    analyzer = _extraction_worker_analyzer
+    try:
+        analyzer.code_in_files[file_path] = source_code
+        analyzer._parse_single_file(file_path, source_code)
+        function_ids = sorted(
+            analyzer.get_function_ids_in_file(file_path),
+            key=lambda function_id: (
+                analyzer.functionRawDataDic[function_id][1],
+                analyzer.functionRawDataDic[function_id][2],
+                function_id,
+            ),
+        )
+        results = []
+        for function_id in function_ids:
+            _, function = analyzer._analyze_single_function(
+                function_id, analyzer.functionRawDataDic[function_id]
+            )
+            analyzer.function_env[function_id] = function
+            results.append(
+                [
+                    (extractor.extract_sources(function), extractor.extract_sinks(function))
+                    for extractor in _extraction_worker_extractors
+                ]
+            )
+        return results
+    finally:
+        TSAnalyzer._init_analysis_state(analyzer, {}, analyzer.language_name, 1)
@@ -0,0 +1,153 @@
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import tree_sitter
+
+from src.tstool.analyzer.ts_analyzer import TSAnalyzer, load_query
+from src.tstool.dfbscan_extractor.dfbscan_extractor import DFBScanExtractor
+from src.memory.syntactic.function import Function
+from src.memory.syntactic.value import Value, ValueLabel
+
+SPEC_DIR = Path(__file__).resolve().parent / "specs"
+
+# The capture naming the node of a source or sink value
+VALUE_CAPTURE = "value"
+
+
+def compile_rules(rules: List[Dict], name_sets: Dict[str, List[str]]) -> str:
+    """
+    Compile the source or sink rules of a spec into the text of one tree-sitter query,
+    where the i-th pattern of the query is the i-th rule.
+    A rule is a JSON object with the fields:
+    - pattern: an S-expression capturing the node of the value as @value
+    - names (optional): {"capture": c, "in" or "not_in": a list of names or "$set"},
+      which requires the text of @c to be (or not to be) one of the names
+    - regex (optional): {"capture": c, "match" or "not_match": a regular expression}
+    - label (optional): the name of the ValueLabel of the values, e.g., PARA
+    :param rules: the rules
+    :param name_sets: the named sets of names, e.g., {"mem_allocations": ["malloc", ...]}
+    :return: the query text
+    """
+    patterns = []
+    for rule in rules:
+        pattern = rule.get("pattern")
+        if not isinstance(pattern, str) or f"@{VALUE_CAPTURE}" not in pattern:
+            raise ValueError(f"A rule must have a pattern capturing @{VALUE_CAPTURE}: {rule}")
+        predicates = []
+        names = rule.get("names")
+        if names is not None:
+            operator = "#match?" if "in" in names else "#not-match?"
+            values = names.get("in", names.get("not_in"))
+            if isinstance(values, str) and values.startswith("$"):
+                if values[1:] not in name_sets:
+                    raise ValueError(f"Undefined name set: {values}")
+                values = name_sets[values[1:]]
+            regex = "^(" + "|".join(re.escape(value) for value in sorted(values)) + ")$"
+            predicates.append(f"({operator} @{names['capture']} {json.dumps(regex)})")
+        regex_rule = rule.get("regex")
+        if regex_rule is not None:
+            operator = "#match?" if "match" in regex_rule else "#not-match?"
+            regex = regex_rule.get("match", regex_rule.get("not_match"))
+            predicates.append(f"({operator} @{regex_rule['capture']} {json.dumps(regex)})")
+        patterns.append(f"({pattern} {' '.join(predicates)})" if predicates else pattern)
+    return "\n".join(patterns)
+
+
+class SpecExtractor(DFBScanExtractor):
+    """
+    An extractor defined by a declarative JSON spec instead of Python code.
+    The source rules and the sink rules of the spec are compiled into two tree-sitter
+    queries, so the nodes of each function are matched by the query engine in a single
+    run per query, and no Python traversal is needed for a new checker.
+    See compile_rules for the format of the rules. A spec has the fields:
+    - language, bug_type: the language and the bug type of the checker, used to find the spec
+    - name_sets (optional): the named sets of names referenced by the rules
+    - sources, sinks: the source rules and the sink rules
+    """
+
+    def __init__(self, ts_analyzer: TSAnalyzer, spec: Dict):
+        super().__init__(ts_analyzer)
+        self.spec = spec
+        self.language = ts_analyzer.language_name
+        self.bug_type = spec.get("bug_type", "")
+        self.__compile_spec()
+        return
+
+    def __getstate__(self) -> Dict:
+        # The queries cannot be pickled, and are compiled again from the spec
+        state = super().__getstate__()
+        state["source_query"] = None
+        state["sink_query"] = None
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self.__compile_spec()
+        return
+
+    def __compile_spec(self) -> None:
+        name_sets = self.spec.get("name_sets", {})
+        self.source_query, self.source_labels = self.__compile(
+            self.spec.get("sources", []), name_sets, ValueLabel.SRC
+        )
+        self.sink_query, self.sink_labels = self.__compile(
+            self.spec.get("sinks", []), name_sets, ValueLabel.SINK
+        )
+        return
+
+    @classmethod
+    def from_file(cls, ts_analyzer: TSAnalyzer, spec_path: str) -> "SpecExtractor":
+        with open(spec_path, "r") as spec_file:
+            return cls(ts_analyzer, json.load(spec_file))
+
+    @staticmethod
+    def find_spec_path(language: str, bug_type: str) -> Optional[Path]:
+        """
+        Find the spec shipped for a language and a bug type, e.g., specs/Java_NPD.json.
+        """
+        spec_path = SPEC_DIR / f"{language}_{bug_type}.json"
+        return spec_path if spec_path.exists() else None
+
+    def __compile(
+        self, rules: List[Dict], name_sets: Dict[str, List[str]], default_label: ValueLabel
+    ) -> Tuple[Optional[tree_sitter.Query], List[ValueLabel]]:
+        if len(rules) == 0:
+            return None, []
+        labels = [
+            ValueLabel[rule["label"]] if "label" in rule else default_label for rule in rules
+        ]
+        return load_query(self.language, compile_rules(rules, name_sets)), labels
+
+    def __extract(
+        self, function: Function, query: Optional[tree_sitter.Query], labels: List[ValueLabel]
+    ) -> List[Value]:
+        if query is None:
+            return []
+        source_code = self.ts_analyzer.code_in_files[function.file_path]
+        values = []
+        visited = set()
+        for pattern_index, captures in query.matches(function.parse_tree_root_node):
+            node = captures.get(VALUE_CAPTURE)
+            if node is None:
+                continue
+            key = (node.start_byte, node.end_byte, pattern_index)
+            if key in visited:
+                continue
+            visited.add(key)
+            values.append(
+                Value(
+                    source_code[node.start_byte : node.end_byte],
+                    self.ts_analyzer.get_line_number(function.file_path, node.start_byte),
+                    labels[pattern_index],
+                    function.file_path,
+                )
+            )
+        return values
+
+    def extract_sources(self, function: Function) -> List[Value]:
+        return self.__extract(function, self.source_query, self.source_labels)
+
+    def extract_sinks(self, function: Function) -> List[Value]:
+        return self.__extract(function, self.sink_query, self.sink_labels)